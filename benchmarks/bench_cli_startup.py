@@ -0,0 +1,74 @@
+"""
+Benchmark of the startup of the resmind command line. It runs several commands in a
+new interpreter with `-X importtime`, prints their time and checks that the trivial
+ones (the help and the cleaning of the LaTeX files) do not import pandas, numpy or
+scholarly. Importing `query_generator` is measured as the reference of an eager
+import of the heavy dependencies.
+
+Usage: python benchmarks/bench_cli_startup.py
+"""
+
+# Packages to import
+import sys
+import time
+import tempfile
+import subprocess
+from pathlib import Path
+
+
+# Constants
+CORE_PATH = Path(__file__).resolve().parents[1] / "core"
+CLI_PATH = CORE_PATH / "cli.py"
+HEAVY_MODULES = {"pandas", "numpy", "scholarly"}
+REPETITIONS = 5
+
+
+# Functions
+def imported_modules(command: list[str]) -> tuple[float, set[str]]:
+    """
+    Runs a command in a new interpreter and gets the top level modules it imported.
+
+    :param command: The arguments of the interpreter.
+    :return: The best time of the command and the modules imported.
+    """
+    best, modules = None, set()
+    for _ in range(REPETITIONS):
+        start = time.perf_counter()
+        process = subprocess.run([sys.executable, "-X", "importtime"] + command,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        modules = {line.split("|")[-1].strip().split(".")[0] for line in process.stderr.splitlines()
+                   if line.startswith("import time:") and "|" in line}
+    return best, modules
+
+
+def main():
+    """
+    Main function which runs the benchmark.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        Path(folder, ".gitignore").write_text("*.aux\n")
+        Path(folder, "main.aux").write_text("")
+
+        commands = [
+            ("resmind --help", [str(CLI_PATH), "--help"], True),
+            ("resmind clean --help", [str(CLI_PATH), "clean", "--help"], True),
+            ("resmind clean --dry-run", [str(CLI_PATH), "clean", "--dry-run", "--project", folder,
+                                         "--gitignore", str(Path(folder, ".gitignore"))], True),
+            ("import query_generator", ["-c", f"import sys; sys.path.insert(0, {str(CORE_PATH / 'search')!r}); "
+                                              "import query_generator"], False),
+        ]
+
+        print(f"{'command':<26} {'seconds':>8}  heavy modules")
+        for name, command, light in commands:
+            elapsed, modules = imported_modules(command)
+            heavy = sorted(HEAVY_MODULES & modules)
+            print(f"{name:<26} {elapsed:>8.3f}  {', '.join(heavy) or '-'}")
+            if light:
+                assert not heavy, f"'{name}' must not import {', '.join(heavy)}"
+
+
+# Execute the main function
+if __name__ == "__main__":
+    main()
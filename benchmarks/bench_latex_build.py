@@ -0,0 +1,98 @@
+"""
+Benchmark of the incremental LaTeX build driver with a stub engine, so it runs where
+no TeX distribution is installed. The stub engine writes the citations and labels of
+the document to the .aux file (and the \\bibcite entries once the .bbl exists), and
+the stub bibtex writes the .bbl, which reproduces the convergence of pdflatex.
+
+It counts the runs of the engine and bibtex of each scenario, compared with the full
+pdflatex, bibtex, pdflatex x 2 sequence.
+
+Usage: python benchmarks/bench_latex_build.py
+"""
+
+# Packages to import
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "core" / "latex"))
+
+from build_driver import LatexBuildDriver
+
+
+# Constants
+STUB_ENGINE = r'''
+import re, sys
+from pathlib import Path
+tex = Path(sys.argv[1])
+text = tex.read_text()
+aux = [r"\citation{%s}" % key for key in re.findall(r"\\cite\{(.+?)\}", text)]
+aux += [r"\bibdata{%s}" % name for name in re.findall(r"\\bibliography\{(.+?)\}", text)]
+bbl = tex.with_suffix(".bbl")
+if bbl.exists():
+    aux += [r"\bibcite{%s}{%d}" % (key, num) for num, key in enumerate(bbl.read_text().split(), 1)]
+aux += [r"\newlabel{%s}{{%d}}" % (label, num) for num, label in enumerate(re.findall(r"\\label\{(.+?)\}", text), 1)]
+tex.with_suffix(".aux").write_text("\n".join(aux) + "\n")
+tex.with_suffix(".pdf").write_text(text)
+with open(tex.with_name("runs.log"), "a") as log:
+    log.write("engine\n")
+'''
+STUB_BIBTEX = r'''
+import re, sys
+from pathlib import Path
+aux = Path(sys.argv[1] + ".aux").read_text()
+Path(sys.argv[1] + ".bbl").write_text("\n".join(re.findall(r"\\citation\{(.+?)\}", aux)))
+with open("runs.log", "a") as log:
+    log.write("bibtex\n")
+'''
+DOCUMENT = r"""\documentclass{article}
+\begin{document}
+\section{Intro}\label{sec:intro} %s \cite{smith2020} \cite{doe2021}
+\bibliography{refs}
+\end{document}
+"""
+SCENARIOS = [
+    ("first build", lambda folder: None),
+    ("nothing changed", lambda folder: None),
+    ("text changed", lambda folder: folder.joinpath("main.tex").write_text(DOCUMENT % "More text.")),
+    ("citation added", lambda folder: folder.joinpath("main.tex").write_text(
+        DOCUMENT % r"More text \cite{roe2022}.")),
+    ("figure changed", lambda folder: folder.joinpath("figure.png").write_bytes(b"new figure")),
+]
+FULL_SEQUENCE = 4
+
+
+# Functions
+def main():
+    """
+    Main function which runs the scenarios and prints the commands run by each build.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        folder = Path(folder)
+        folder.joinpath("engine.py").write_text(STUB_ENGINE)
+        folder.joinpath("bibtex.py").write_text(STUB_BIBTEX)
+        folder.joinpath("main.tex").write_text(DOCUMENT % "")
+        folder.joinpath("refs.bib").write_text("@article{smith2020, title={A}}")
+        folder.joinpath("figure.png").write_bytes(b"figure")
+
+        driver = LatexBuildDriver(folder / "main.tex", engine=[sys.executable, "engine.py"],
+                                  bibtex=[sys.executable, "bibtex.py"])
+        total = 0
+        print(f"{'scenario':<16} {'engine':>7} {'bibtex':>7}")
+        for name, change in SCENARIOS:
+            change(folder)
+            log = folder.joinpath("runs.log")
+            log.write_text("")
+            summary = driver.build()
+            assert summary is not None, f"The build of '{name}' failed"
+
+            commands = log.read_text().split()
+            total += len(commands)
+            print(f"{name:<16} {commands.count('engine'):>7} {commands.count('bibtex'):>7}")
+
+        print(f"{total} commands instead of {FULL_SEQUENCE * len(SCENARIOS)} with the full sequence")
+
+
+# Execute the main function
+if __name__ == "__main__":
+    main()
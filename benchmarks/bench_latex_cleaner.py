@@ -0,0 +1,104 @@
+"""
+Benchmark of the LaTeX cleaner on a synthetic project with tens of thousands of build
+artifacts. It compares the previous matching (fnmatch of every file against every
+pattern, walking into every directory) with the compiled matcher and the pruned walk,
+then measures the deletion of the plan with one thread and with a pool of threads.
+
+Usage: python benchmarks/bench_latex_cleaner.py
+"""
+
+# Packages to import
+import os
+import sys
+import time
+import fnmatch
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "core" / "latex"))
+
+from compilator_cleaner import iter_ignored_paths
+from gitignore_matcher import GitIgnoreMatcher
+from cleanup_plan import DeletionPlan
+
+
+# Constants
+CHAPTERS = 200
+ARTIFACTS_PER_CHAPTER = 100
+MINTED_FILES = 20000
+PATTERNS = ["*.aux", "*.log", "*.toc", "*.out", "*.bbl", "*.blg", "*.fls", "*.fdb_latexmk",
+            "*.synctex.gz", "_minted-*/", "build/", "!keep.aux"]
+EXTENSIONS = [".aux", ".log", ".toc", ".out", ".bbl", ".blg", ".fls", ".fdb_latexmk", ".tex", ".bib"]
+WORKERS = [1, 8]
+
+
+# Functions
+def create_project(project_path: Path) -> int:
+    """
+    Creates the synthetic project.
+
+    :param project_path: The folder of the project.
+    :return: The number of source files (the ones that must be kept).
+    """
+    sources = 0
+    for chapter in range(CHAPTERS):
+        folder = project_path / f"chapter{chapter}"
+        folder.mkdir(parents=True)
+        for num in range(ARTIFACTS_PER_CHAPTER):
+            extension = EXTENSIONS[num % len(EXTENSIONS)]
+            folder.joinpath(f"part{num}{extension}").write_bytes(b"x" * 64)
+            sources += extension in (".tex", ".bib")
+
+    for name in ("_minted-thesis", "build"):
+        folder = project_path / name
+        folder.mkdir()
+        for num in range(MINTED_FILES // 2):
+            folder.joinpath(f"file{num}.pygtex").write_bytes(b"x" * 64)
+    return sources
+
+
+def legacy_matches(project_path: str) -> int:
+    """
+    Counts the files matched by the previous implementation of the cleaner.
+
+    :param project_path: The folder of the project.
+    :return: The number of files matched.
+    """
+    patterns = [pattern for pattern in PATTERNS if not pattern.startswith("!")]
+    total = 0
+    for root, dirs, files in os.walk(project_path):
+        for file in files:
+            file_path = os.path.join(root, file)
+            total += any(fnmatch.fnmatch(file_path, os.path.join(project_path, pattern)) for pattern in patterns)
+    return total
+
+
+def main():
+    """
+    Main function which runs the benchmark.
+    """
+    matcher = GitIgnoreMatcher(PATTERNS)
+    for workers in WORKERS:
+        with tempfile.TemporaryDirectory() as folder:
+            sources = create_project(Path(folder))
+
+            start = time.perf_counter()
+            legacy_matches(folder + "/")
+            legacy = time.perf_counter() - start
+
+            start = time.perf_counter()
+            plan = DeletionPlan.from_paths(iter_ignored_paths(folder, matcher))
+            planning = time.perf_counter() - start
+
+            result = plan.execute(workers=workers)
+            remaining = sum(len(files) for _, _, files in os.walk(folder))
+            assert remaining == sources, "Only the source files must be kept"
+            assert not result["errors"], "All the files must be deleted"
+
+            print(f"workers={workers}: legacy walk {legacy:.2f} s, plan {planning:.2f} s "
+                  f"({plan.summary()}), deletion {result['seconds']:.2f} s")
+
+
+# Execute the main function
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark of `LocalCorpusBackend`. It builds the inverted index of a synthetic corpus
+of records and scores a file of generated queries with the same structure as the ones
+of `QueryGenerator`, one query at a time and with `QueryPlan`, printing the time of
+each phase.
+
+Usage: python benchmarks/bench_local_corpus.py [total_records] [total_queries]
+"""
+
+# Packages to import
+import sys
+import time
+import random
+from itertools import islice, product
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "core" / "search"))
+
+from search_backends import LocalCorpusBackend
+from query_planner import QueryPlan
+
+
+# Constants
+TOTAL_RECORDS = 300_000
+TOTAL_QUERIES = 20_000
+VOCABULARY_SIZE = 20_000
+WORDS_PER_RECORD = 60
+TERMS_PER_SLOT = 8
+SEED = 7
+
+
+# Functions
+def build_records(total: int, vocabulary: list[str], rng: np.random.Generator) -> list[dict]:
+    """
+    Builds the synthetic records, with a skewed distribution of words (the first
+    words of the vocabulary are much more frequent, as in real abstracts).
+
+    :param total: The total of records.
+    :param vocabulary: The words of the records.
+    :param rng: The random generator.
+    :return: The records.
+    """
+    weights = 1 / np.arange(1, len(vocabulary) + 1)
+    words = np.asarray(vocabulary)[rng.choice(len(vocabulary), size=(total, WORDS_PER_RECORD),
+                                              p=weights / weights.sum())].tolist()
+    return [{"title": " ".join(row[:8]), "abstract": " ".join(row[8:-4]), "keywords": row[-4:]}
+            for row in words]
+
+
+def build_queries(total: int, vocabulary: list[str], rng: random.Random) -> list[str]:
+    """
+    Builds the queries like `QueryGenerator` does: every combination of the terms of
+    each slot of the structure (a AND b) AND (c OR d) AND (e), in order, so the
+    queries share their first clauses.
+
+    :param total: The total of queries.
+    :param vocabulary: The words of the queries.
+    :param rng: The random generator.
+    :return: The queries.
+    """
+    common = vocabulary[:300]
+    slots = [rng.sample(common, TERMS_PER_SLOT) for _ in range(5)]
+    slots[3] = [f"{term} {rng.choice(common)}" for term in slots[3]]
+    return [f"({a} AND {b}) AND ({c} OR {d}) AND ({e})"
+            for a, b, c, d, e in islice(product(*slots), total)]
+
+
+def main():
+    """
+    Main function which runs the benchmark.
+    """
+    total_records = int(sys.argv[1]) if len(sys.argv) > 1 else TOTAL_RECORDS
+    total_queries = int(sys.argv[2]) if len(sys.argv) > 2 else TOTAL_QUERIES
+
+    vocabulary = [f"word{i}" for i in range(VOCABULARY_SIZE)]
+    records = build_records(total_records, vocabulary, np.random.default_rng(SEED))
+    queries = build_queries(total_queries, vocabulary, random.Random(SEED))
+
+    start = time.perf_counter()
+    backend = LocalCorpusBackend(records)
+    index_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    totals = [backend.count(query) for query in queries]
+    query_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    plan = QueryPlan(queries)
+    plan_totals = plan.evaluate(backend)
+    plan_time = time.perf_counter() - start
+    assert plan_totals == totals, "The planner results differ from the per-query results"
+
+    print(f"records: {total_records}  index: {index_time:.2f}s")
+    print(f"queries: {total_queries}  per query: {query_time:.2f}s  ({total_queries / query_time:.0f} queries/s)")
+    print(f"planner: {plan_time:.2f}s  ({total_queries / plan_time:.0f} queries/s)  "
+          f"operations: {plan.evaluations} of {plan.total_nodes} nodes")
+    print(f"total studies: {sum(totals)}")
+
+# Execute the main function
+if __name__ == "__main__":
+    main()
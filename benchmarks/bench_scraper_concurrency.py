@@ -0,0 +1,66 @@
+"""
+Benchmark of the concurrent mode of `ScrapperService`. The queries are counted by a
+fake local backend that injects a fixed latency per request, so the service can be
+measured without Google Scholar. It prints the time of the sequential and concurrent
+runs and checks that the rate limit is respected.
+
+Usage: python benchmarks/bench_scraper_concurrency.py
+"""
+
+# Packages to import
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "core" / "search"))
+
+from scrapper_googlescholar import ScrapperService
+from search_backends import FunctionBackend
+
+
+# Constants
+LATENCY = 0.05
+TOTAL_QUERIES = 200
+REQUESTS_PER_SECOND = 100
+WORKERS = [1, 4, 16]
+
+
+# Functions
+def fake_search(query: str) -> int:
+    """
+    Fake backend: waits the latency of a request and returns a count derived from
+    the query.
+
+    :param query: The query to search.
+    :return: The total of studies of the query.
+    """
+    time.sleep(LATENCY)
+    return len(query)
+
+
+def main():
+    """
+    Main function which runs the benchmark for each number of workers.
+    """
+    queries = [f"(term {i} AND other {i}) AND (alternative {i % 7})" for i in range(TOTAL_QUERIES)]
+    expected = {num: len(query) for num, query in enumerate(queries)}
+
+    print(f"{'workers':>8} {'seconds':>10} {'queries/s':>10}")
+    for workers in WORKERS:
+        service = ScrapperService(workers=workers, requests_per_second=REQUESTS_PER_SECOND,
+                                  backend=FunctionBackend(f"fake-{workers}", fake_search))
+
+        start = time.perf_counter()
+        results = service.check_queries(queries, deduplicate=False, limit=None)
+        elapsed = time.perf_counter() - start
+
+        assert results == expected, "The concurrent results differ from the expected ones"
+        # The first burst is free, the rest of the requests must wait for the limiter
+        minimum = (TOTAL_QUERIES - service.rate_limiter.capacity) / REQUESTS_PER_SECOND
+        assert elapsed >= minimum * 0.95, "The rate limit has been exceeded"
+        print(f"{workers:>8} {elapsed:>10.3f} {TOTAL_QUERIES / elapsed:>10.1f}")
+
+
+# Execute the main function
+if __name__ == "__main__":
+    main()
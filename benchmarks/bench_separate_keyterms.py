@@ -0,0 +1,66 @@
+"""
+Benchmark of `QueryGenerator.build_separated_keyterms`. It builds synthetic reviews
+of increasing size (concepts x keyterms) and prints the time per keyterm, which
+should stay roughly constant as the review grows (linear scaling).
+
+Usage: python benchmarks/bench_separate_keyterms.py
+"""
+
+# Packages to import
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "core" / "search"))
+
+from query_generator import QueryGenerator
+
+
+# Constants
+KEYTERMS_PER_CONCEPT = 10
+THESAURUS_PER_KEYTERM = 5
+SIZES = [50, 100, 200, 400, 800]
+
+
+# Functions
+def build_review(total_concepts: int) -> tuple[list[dict], list[dict], list[dict]]:
+    """
+    Builds the concepts, keyterms and thesaurus of a synthetic review.
+
+    :param total_concepts: The total of concepts of the review.
+    :return: The concepts, keyterms and thesaurus.
+    """
+    concepts = [{"id": str(c), "importance": str(c % 3 + 1)} for c in range(total_concepts)]
+    keyterms = []
+    thesaurus = []
+    for c in range(total_concepts):
+        for k in range(KEYTERMS_PER_CONCEPT):
+            keyterm = f"term {c} {k}"
+            keyterms.append({"concept": str(c), "keyterm": keyterm})
+            thesaurus.append({
+                "concept": str(c),
+                "keyterm": keyterm,
+                "divided": "0",
+                "thesaurus": {f"synonym {c} {k} {t}" for t in range(THESAURUS_PER_KEYTERM)}
+            })
+    return concepts, keyterms, thesaurus
+
+
+def main():
+    """
+    Main function which runs the benchmark for each size.
+    """
+    print(f"{'concepts':>10} {'keyterms':>10} {'seconds':>10} {'us/keyterm':>12}")
+    for total_concepts in SIZES:
+        concepts, keyterms, thesaurus = build_review(total_concepts)
+
+        start = time.perf_counter()
+        QueryGenerator.build_separated_keyterms(concepts, keyterms, thesaurus)
+        elapsed = time.perf_counter() - start
+
+        print(f"{total_concepts:>10} {len(keyterms):>10} {elapsed:>10.4f} {elapsed / len(keyterms) * 1e6:>12.2f}")
+
+
+# Execute the main function
+if __name__ == "__main__":
+    main()
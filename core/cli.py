@@ -0,0 +1,168 @@
+"""
+This script defines the command line interface of resmind:
+    resmind generate    Generates the search queries of the review.
+    resmind separate    Separates the keyterms of the review by concept and importance.
+    resmind scrape      Searches the queries (check, harvest or overlap).
+    resmind clean       Removes the files of the LaTeX compiler ignored by the .gitignore file.
+    resmind build       Builds the LaTeX document if any of its inputs changed.
+
+The modules of each subcommand (and their dependencies, e.g. pandas or scholarly) are
+only imported when the subcommand runs, so the trivial commands start fast. As when
+running the scripts, the paths of the files are relative to the working directory.
+"""
+
+# Packages to import
+import os
+import sys
+import argparse
+from pathlib import Path
+
+
+# Constants
+CORE_PATH = Path(__file__).resolve().parent
+
+
+# Functions
+def add_module_path(package: str) -> None:
+    """
+    Adds the folder of a package of core to the import path (its modules import
+    each other as top level modules).
+
+    :param package: The name of the package (e.g. "search").
+    """
+    path = str(CORE_PATH.joinpath(package))
+    if not os.path.isdir(path):
+        sys.exit(f"resmind: the package '{package}' is not installed next to {Path(__file__).name} "
+                 f"({path}), reinstall resmind.")
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def run_generate(args: argparse.Namespace) -> bool:
+    add_module_path("search")
+    from query_generator import main as generator_main
+
+    return generator_main("estimate_queries" if args.estimate else "generate_queries", stream=args.stream,
+                          max_queries=args.max_queries, workers=args.workers)
+
+
+def run_separate(args: argparse.Namespace) -> bool:
+    add_module_path("search")
+    from query_generator import main as generator_main
+
+    return generator_main("create_files")
+
+
+def run_scrape(args: argparse.Namespace) -> bool:
+    add_module_path("search")
+    from query_generator import QueryGenerator
+    from scrapper_googlescholar import ScrapperService
+    from search_backends import LocalCorpusBackend, ScholarlyBackend
+    from result_cache import ResultCache
+    from query_pruning import QueryPruner
+
+    origin = args.origin if args.origin is not None else QueryGenerator.TRIAL_SEARCHES_QUERIES_FOLDER
+    backend = LocalCorpusBackend.from_files(args.corpus) if args.corpus else ScholarlyBackend()
+    cache = ResultCache(ScrapperService.RESULTS_CACHE_FILE_PATH) if not args.no_cache else None
+    scrapper_service = ScrapperService(workers=args.workers, requests_per_second=args.requests_per_second,
+                                       backend=backend, cache=cache, pruner=QueryPruner(),
+                                       max_retries=args.max_retries)
+
+    match args.action:
+        case "check":
+            return scrapper_service.check_all_queries(origin, args.target, resume=not args.restart,
+                                                     limit=args.limit)
+        case "harvest":
+            return scrapper_service.harvest_queries(origin, args.target) is not None
+        case "overlap":
+            return scrapper_service.analyze_overlap(args.target) is not None
+
+
+def run_clean(args: argparse.Namespace) -> bool:
+    add_module_path("latex")
+    import compilator_cleaner
+
+    project_path = args.project if args.project is not None else compilator_cleaner.get_project_path()
+    git_ignore_path = args.gitignore if args.gitignore is not None else compilator_cleaner.GIT_IGNORE_FILE_PATH
+    if args.watch:
+        compilator_cleaner.watch_ignored_files(project_path, git_ignore_path, workers=args.workers)
+        return True
+    return compilator_cleaner.clean_ignored_files(project_path, git_ignore_path, dry_run=args.dry_run,
+                                                  workers=args.workers) is not None
+
+
+def run_build(args: argparse.Namespace) -> bool:
+    add_module_path("latex")
+    from build_driver import MAIN_FILE_PATH, GIT_IGNORE_FILE_PATH, LatexBuildDriver
+
+    driver = LatexBuildDriver(args.main_file or MAIN_FILE_PATH, engine=args.engine.split() if args.engine else None,
+                              bibtex=args.bibtex.split() if args.bibtex else None,
+                              git_ignore_path=args.gitignore or GIT_IGNORE_FILE_PATH)
+    return driver.build(force=args.force) is not None
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Creates the parser of the arguments of the command line.
+
+    :return: The parser.
+    """
+    parser = argparse.ArgumentParser(prog="resmind", description="Automation of the research processes.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate = subparsers.add_parser("generate", help="Generate the search queries of the review.")
+    generate.add_argument("--stream", action="store_true", help="Store the queries in JSON Lines format.")
+    generate.add_argument("--max-queries", type=int, default=None, help="Maximum queries of each importance.")
+    generate.add_argument("--workers", type=int, default=1, help="Processes used to generate the queries.")
+    generate.add_argument("--estimate", action="store_true", help="Only estimate the number of queries.")
+    generate.set_defaults(function=run_generate)
+
+    separate = subparsers.add_parser("separate", help="Separate the keyterms by concept and importance.")
+    separate.set_defaults(function=run_separate)
+
+    scrape = subparsers.add_parser("scrape", help="Search the queries.")
+    scrape.add_argument("action", choices=["check", "harvest", "overlap"],
+                        help="Count the studies, harvest their records or analyze their overlap.")
+    scrape.add_argument("--origin", default=None, help="Folder of the queries files.")
+    scrape.add_argument("--target", default="./files/json/results/", help="Folder of the results.")
+    scrape.add_argument("--corpus", nargs="+", default=None, help="Local corpus files (BibTeX/JSON) to search.")
+    scrape.add_argument("--workers", type=int, default=1, help="Queries searched concurrently.")
+    scrape.add_argument("--requests-per-second", type=float, default=None, help="Rate limit of the backend.")
+    scrape.add_argument("--max-retries", type=int, default=0, help="Retries of a failed search.")
+    scrape.add_argument("--no-cache", action="store_true", help="Do not use the cache of the results.")
+    scrape.add_argument("--restart", action="store_true", help="Search again the queries of the journal.")
+    scrape.add_argument("--limit", type=int, default=None, help="Queries checked of each file (all by default).")
+    scrape.set_defaults(function=run_scrape)
+
+    clean = subparsers.add_parser("clean", help="Remove the files of the LaTeX compiler.")
+    clean.add_argument("--project", default=None, help="Folder of the project.")
+    clean.add_argument("--gitignore", default=None, help="The .gitignore file with the patterns.")
+    clean.add_argument("--dry-run", action="store_true", help="Only show what would be deleted.")
+    clean.add_argument("--watch", action="store_true", help="Keep removing the files created later.")
+    clean.add_argument("--workers", type=int, default=8, help="Threads that delete the files.")
+    clean.set_defaults(function=run_clean)
+
+    build = subparsers.add_parser("build", help="Build the LaTeX document if its inputs changed.")
+    build.add_argument("--main-file", default=None, help="The main .tex file.")
+    build.add_argument("--gitignore", default=None, help="The .gitignore file of the document.")
+    build.add_argument("--engine", default=None, help="Command of the engine (e.g. 'lualatex -halt-on-error').")
+    build.add_argument("--bibtex", default=None, help="Command of bibtex (e.g. 'biber').")
+    build.add_argument("--force", action="store_true", help="Build even if nothing changed.")
+    build.set_defaults(function=run_build)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Main function which runs the subcommand of the command line.
+
+    :param argv: The arguments, the ones of the command line by default.
+    :return: The exit code.
+    """
+    args = create_parser().parse_args(argv)
+    return 0 if args.function(args) else 1
+
+
+# Execute the main function
+if __name__ == "__main__":
+    sys.exit(main())
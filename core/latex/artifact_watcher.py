@@ -0,0 +1,191 @@
+"""
+Functionality created to detect the files created in the directories of the project after the compilation, so the
+cleaner only has to check what the compiler wrote instead of walking the whole project again. The directories are
+watched with inotify where it is available (Linux, through ctypes), otherwise their modification time is polled and
+only the directories that changed are read again.
+"""
+
+import os
+import time
+import select
+import ctypes
+import ctypes.util
+import logging
+import struct
+
+log = logging.getLogger(__name__)
+
+
+# Constants
+POLL_INTERVAL = 0.5
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct("iIII")
+READ_SIZE = 64 * 1024
+
+
+# Functions
+def create_watcher() -> "InotifyWatcher | PollingWatcher":
+    """
+    This function will return an inotify watcher if the system supports it, otherwise a polling watcher.
+
+    :return: The watcher.
+    """
+    try:
+        return InotifyWatcher()
+    except OSError as e:
+        log.info(f"inotify is not available ({e}), the directories will be polled")
+        return PollingWatcher()
+
+
+# Classes
+class InotifyWatcher:
+    """
+    This class is created to watch the creation of files (or the files moved) inside several directories using
+    inotify. The directories are not watched recursively, each one has to be added.
+    """
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify not supported")
+
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        self._directories: dict[int, str] = {}
+
+    def add_directory(self, path: str) -> None:
+        """
+        Starts watching a directory.
+
+        :param path: The path of the directory.
+        """
+        descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(path), IN_CREATE | IN_MOVED_TO)
+        if descriptor < 0:
+            log.warning(f"Not possible to watch the directory {path}: {os.strerror(ctypes.get_errno())}")
+            return
+        self._directories[descriptor] = path
+
+    def read(self, timeout: float | None = None) -> list[str] | None:
+        """
+        Waits for the creation of files in the watched directories.
+
+        :param timeout: The maximum seconds to wait, None to wait until a file is created.
+        :return: The paths created (empty only if the timeout expired), None if some events have been lost (the
+        directories must be scanned).
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            remaining = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                return []
+
+            # A spurious wakeup (or only events of removed watches) keeps waiting until the deadline
+            try:
+                data = os.read(self._fd, READ_SIZE)
+            except BlockingIOError:
+                continue
+
+            paths = []
+            position = 0
+            while position + EVENT_HEADER.size <= len(data):
+                descriptor, mask, _, length = EVENT_HEADER.unpack_from(data, position)
+                name = data[position + EVENT_HEADER.size:position + EVENT_HEADER.size + length].rstrip(b"\0")
+                position += EVENT_HEADER.size + length
+
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                if mask & IN_IGNORED:
+                    self._directories.pop(descriptor, None)
+                elif descriptor in self._directories and name:
+                    paths.append(os.path.join(self._directories[descriptor], os.fsdecode(name)))
+            if paths:
+                return paths
+
+    def close(self) -> None:
+        """
+        Stops watching the directories.
+        """
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """
+    This class is created to detect the files created inside several directories comparing the modification time
+    of each directory, so only the directories that changed are read again.
+    """
+
+    def __init__(self, interval: float = POLL_INTERVAL):
+        """
+        Constructor of the class.
+
+        :param interval: The seconds between two checks of the directories.
+        """
+        self.interval = interval
+        self._directories: dict[str, tuple[int, set[str]]] = {}
+
+    def add_directory(self, path: str) -> None:
+        """
+        Starts watching a directory.
+
+        :param path: The path of the directory.
+        """
+        try:
+            self._directories[path] = (os.stat(path).st_mtime_ns, set(os.listdir(path)))
+        except OSError as e:
+            log.warning(f"Not possible to watch the directory {path}: {e}")
+
+    def _check(self) -> list[str]:
+        """
+        Gets the entries created in the directories whose modification time changed.
+        """
+        paths = []
+        for path, (modified, names) in list(self._directories.items()):
+            try:
+                current = os.stat(path).st_mtime_ns
+                if current == modified:
+                    continue
+                current_names = set(os.listdir(path))
+            except OSError:
+                del self._directories[path]
+                continue
+
+            paths.extend(os.path.join(path, name) for name in sorted(current_names - names))
+            self._directories[path] = (current, current_names)
+        return paths
+
+    def read(self, timeout: float | None = None) -> list[str] | None:
+        """
+        Waits for the creation of files in the watched directories.
+
+        :param timeout: The maximum seconds to wait, None to wait until a file is created.
+        :return: The paths created.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            paths = self._check()
+            if paths:
+                return paths
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return []
+            time.sleep(self.interval if remaining is None else min(self.interval, remaining))
+
+    def close(self) -> None:
+        """
+        Stops watching the directories.
+        """
+        self._directories.clear()
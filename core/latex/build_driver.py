@@ -0,0 +1,300 @@
+"""
+Functionality created to compile the LaTeX documents only when it is needed. The driver hashes the inputs of the
+document (.tex, .bib, .sty, .cls, .bst and the figures) and skips the build when none of them changed since the last
+successful one. Otherwise it runs the engine, runs bibtex only when the citations (or the bibliography) changed, and
+runs the engine again only until the .aux/.toc files converge (the usual pdflatex, bibtex, pdflatex x 2 sequence in
+the worst case).
+
+The commands of the engine and of bibtex are configurable, so the driver can use latexmk, lualatex, biber... or a
+stub engine where no TeX distribution is installed.
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import logging
+import subprocess
+from pathlib import Path
+from typing import Iterator
+
+from gitignore_matcher import GitIgnoreMatcher
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+
+# Constants
+MAIN_FILE_PATH = "./src/docs/paper/main.tex"
+GIT_IGNORE_FILE_PATH = "./src/docs/paper/.gitignore"
+DEFAULT_ENGINE = ["pdflatex", "-interaction=nonstopmode", "-halt-on-error"]
+DEFAULT_BIBTEX = ["bibtex"]
+BUILD_STATE_FILE_NAME = ".build-state.json"
+INPUT_EXTENSIONS = {".tex", ".bib", ".sty", ".cls", ".bst", ".png", ".jpg", ".jpeg", ".pdf", ".eps", ".svg"}
+BIBLIOGRAPHY_EXTENSIONS = {".bib", ".bst"}
+CONVERGENCE_EXTENSIONS = [".toc", ".lof", ".lot"]
+PRUNED_DIRECTORIES = {".git"}
+MAX_RUNS = 5
+CITATION_PATTERN = re.compile(r"^\\(citation|bibdata|bibstyle|abx@aux@cite)\{.*\}\s*$", re.MULTILINE)
+AUX_INPUT_PATTERN = re.compile(r"^\\@input\{(.+?)\}", re.MULTILINE)
+
+
+# Functions
+def hash_file(file_path: Path | str) -> str:
+    """
+    This function will return the hash of the content of a file.
+
+    :param file_path: The path of the file.
+    :return: The hash of the file.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_digests(inputs: dict, extensions: set[str] | None = None) -> dict[str, str]:
+    """
+    This function will return the hash of each input (without its size and modification time), optionally only
+    of the inputs with some extensions.
+
+    :param inputs: The inputs (path: [size, modification time, hash]).
+    :param extensions: The extensions of the inputs, None for all of them.
+    :return: The hash of each input.
+    """
+    return {path: value[2] for path, value in inputs.items()
+            if extensions is None or os.path.splitext(path)[1].lower() in extensions}
+
+
+# Classes
+class LatexBuildDriver:
+    """
+    This class is created to build a LaTeX document incrementally. The state of the last successful build (the hash
+    of each input and of the citations) is stored next to the document.
+    """
+
+    def __init__(self, main_file: Path | str, engine: list[str] | None = None, bibtex: list[str] | None = None,
+                 git_ignore_path: Path | str | None = None, max_runs: int = MAX_RUNS):
+        """
+        Constructor of the class.
+
+        :param main_file: The path of the main .tex file. Its folder is the folder of the document.
+        :param engine: The command of the engine (the main file is appended to it).
+        :param bibtex: The command of bibtex (the name of the job is appended to it).
+        :param git_ignore_path: The .gitignore file of the document, whose ignored files (the build artifacts)
+        are not inputs.
+        :param max_runs: The maximum number of runs of the engine in a build.
+        """
+        self.log = logging.getLogger(__name__)
+        self.main_file = Path(main_file).resolve()
+        self.folder = self.main_file.parent
+        self.jobname = self.main_file.stem
+        self.engine = list(engine) if engine is not None else DEFAULT_ENGINE
+        self.bibtex = list(bibtex) if bibtex is not None else DEFAULT_BIBTEX
+        self.max_runs = max(1, max_runs)
+        self.matcher = GitIgnoreMatcher.from_file(git_ignore_path) \
+            if git_ignore_path is not None and os.path.exists(git_ignore_path) else None
+        self.state_path = self.folder.joinpath(BUILD_STATE_FILE_NAME)
+
+    @property
+    def output_path(self) -> Path:
+        return self.folder.joinpath(f"{self.jobname}.pdf")
+
+    def load_state(self) -> dict:
+        """
+        Gets the state of the last successful build.
+
+        :return: The state, empty if there is none.
+        """
+        try:
+            with open(self.state_path, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def save_state(self, state: dict) -> None:
+        """
+        Stores the state of a successful build.
+
+        :param state: The state.
+        """
+        with open(self.state_path, "w") as file:
+            json.dump(state, file, indent=4)
+
+    def iter_inputs(self) -> Iterator[tuple[str, os.DirEntry]]:
+        """
+        Walks the folder of the document and returns its inputs: the files with an input extension that are not
+        the output of the build nor ignored by the .gitignore file.
+
+        :return: The path of each input relative to the folder, and its entry.
+        """
+        folders = [(str(self.folder), "")]
+        while folders:
+            folder, relative_path = folders.pop()
+            try:
+                entries = os.scandir(folder)
+            except OSError:
+                continue
+
+            with entries:
+                for entry in entries:
+                    path = relative_path + entry.name
+                    is_dir = entry.is_dir()
+                    if self.matcher is not None and self.matcher.match(path, is_dir):
+                        continue
+                    if is_dir:
+                        if entry.name not in PRUNED_DIRECTORIES:
+                            folders.append((entry.path, path + "/"))
+                    elif os.path.splitext(entry.name)[1].lower() in INPUT_EXTENSIONS and path != self.output_path.name:
+                        yield path, entry
+
+    def hash_inputs(self, previous: dict) -> dict:
+        """
+        Gets the hash of each input. The inputs whose size and modification time did not change since the last
+        build are not read again.
+
+        :param previous: The inputs of the last build (path: [size, modification time, hash]).
+        :return: The inputs of the document (path: [size, modification time, hash]).
+        """
+        inputs = {}
+        for path, entry in self.iter_inputs():
+            stat = entry.stat()
+            known = previous.get(path)
+            if known is not None and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+                inputs[path] = known
+            else:
+                inputs[path] = [stat.st_size, stat.st_mtime_ns, hash_file(entry.path)]
+        return inputs
+
+    def read_aux(self) -> list[Path]:
+        """
+        Gets the .aux files of the job: the main one and the ones it includes (\\include).
+
+        :return: The paths of the .aux files.
+        """
+        pending = [self.folder.joinpath(f"{self.jobname}.aux")]
+        aux_files = []
+        while pending:
+            aux_path = pending.pop()
+            if aux_path in aux_files or not aux_path.exists():
+                continue
+            aux_files.append(aux_path)
+            text = aux_path.read_text(errors="replace")
+            pending.extend(self.folder.joinpath(name) for name in AUX_INPUT_PATTERN.findall(text))
+        return aux_files
+
+    def hash_auxiliary(self) -> str | None:
+        """
+        Gets the hash of the auxiliary files that the engine reads in the next run (.aux, .toc, .lof, .lot).
+
+        :return: The hash, None if there are no auxiliary files.
+        """
+        paths = self.read_aux() + [self.folder.joinpath(f"{self.jobname}{extension}")
+                                   for extension in CONVERGENCE_EXTENSIONS]
+        digest = hashlib.blake2b(digest_size=16)
+        found = False
+        for path in paths:
+            if path.exists():
+                found = True
+                digest.update(path.name.encode("utf-8") + b"\0" + hash_file(path).encode("ascii"))
+        return digest.hexdigest() if found else None
+
+    def hash_citations(self) -> str | None:
+        """
+        Gets the hash of the citations, bibliography files and style of the .aux files (what bibtex reads).
+
+        :return: The hash, None if the document has no bibliography.
+        """
+        lines = []
+        for aux_path in self.read_aux():
+            lines.extend(match.group(0) for match in CITATION_PATTERN.finditer(aux_path.read_text(errors="replace")))
+        if not any(line.startswith(("\\bibdata", "\\abx@aux")) for line in lines):
+            return None
+        return hashlib.blake2b("\n".join(lines).encode("utf-8"), digest_size=16).hexdigest()
+
+    def run(self, command: list[str]) -> bool:
+        """
+        Runs a command of the build in the folder of the document.
+
+        :param command: The command.
+        :return: True if the command finished correctly.
+        """
+        process = subprocess.run(command, cwd=self.folder, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        if process.returncode != 0:
+            output = process.stdout.decode(errors="replace").strip().splitlines()
+            self.log.error(f"{' '.join(command)} failed:\n" + "\n".join(output[-20:]))
+            return False
+        return True
+
+    def build(self, force: bool = False) -> dict | None:
+        """
+        Builds the document if any of its inputs changed since the last successful build.
+
+        :param force: If True, the document is built even if nothing changed.
+        :return: The summary of the build (skipped, runs of the engine, bibtex run), None if it failed.
+        """
+        state = self.load_state()
+        inputs = self.hash_inputs(state.get("inputs", {}))
+        summary = {"skipped": False, "runs": 0, "bibtex": False}
+
+        if not force and self.output_path.exists() and get_digests(inputs) == get_digests(state.get("inputs", {})):
+            self.log.info(f"{self.output_path.name} is up to date")
+            summary["skipped"] = True
+            self.save_state({**state, "inputs": inputs})
+            return summary
+
+        try:
+            # First run of the engine, which reads the auxiliary files of the last build
+            previous = self.hash_auxiliary()
+            if not self.run(self.engine + [self.main_file.name]):
+                return None
+            summary["runs"] += 1
+            current = self.hash_auxiliary()
+
+            # Run bibtex only if the citations or the bibliography changed
+            citations = self.hash_citations()
+            bibliography = get_digests(inputs, BIBLIOGRAPHY_EXTENSIONS)
+            bbl_path = self.folder.joinpath(f"{self.jobname}.bbl")
+            if citations is not None and (citations != state.get("citations") or not bbl_path.exists()
+                                          or bibliography != state.get("bibliography")):
+                bbl = hash_file(bbl_path) if bbl_path.exists() else None
+                if not self.run(self.bibtex + [self.jobname]):
+                    return None
+                summary["bibtex"] = True
+                if not bbl_path.exists() or hash_file(bbl_path) != bbl:
+                    previous = None
+
+            # Run the engine again until the auxiliary files do not change
+            while current != previous and summary["runs"] < self.max_runs:
+                if not self.run(self.engine + [self.main_file.name]):
+                    return None
+                summary["runs"] += 1
+                previous, current = current, self.hash_auxiliary()
+
+            if current != previous:
+                self.log.warning(f"The auxiliary files did not converge after {summary['runs']} runs")
+
+            self.save_state({"inputs": inputs, "citations": citations,
+                             "bibliography": bibliography})
+            self.log.info(f"{self.output_path.name} built with {summary['runs']} runs"
+                          f"{' and bibtex' if summary['bibtex'] else ''}")
+            return summary
+        except Exception as e:
+            self.log.error(f"Error: {e}")
+            return None
+
+
+def main(force: bool = False):
+    """
+    Main function which will build the document if any of its inputs changed.
+
+    :param force: If True, the document is built even if nothing changed.
+    """
+    LatexBuildDriver(MAIN_FILE_PATH, git_ignore_path=GIT_IGNORE_FILE_PATH).build(force=force)
+
+
+# Execute the main function
+if __name__ == "__main__":
+    main(force="--force" in sys.argv)
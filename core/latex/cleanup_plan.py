@@ -0,0 +1,221 @@
+"""
+Functionality created to delete the files ignored by the .gitignore file in two phases. First the plan is built with
+all the files and directories that will be deleted and the bytes that will be freed (so it can be shown as a dry run),
+then it is executed deleting the files in batches across a pool of threads, which hides the latency of each deletion
+on network filesystems.
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+log = logging.getLogger(__name__)
+
+
+# Constants
+DEFAULT_WORKERS = 8
+BATCH_SIZE = 256
+
+
+# Functions
+def format_size(total_bytes: int) -> str:
+    """
+    This function will return a size in a readable unit (e.g. 1.5 MB).
+
+    :param total_bytes: The size in bytes.
+    :return: The readable size.
+    """
+    size = float(total_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def get_directory_usage(directory_path: str) -> tuple[int, int]:
+    """
+    This function will return the number of files of a directory (and its subdirectories) and their size.
+
+    :param directory_path: The path of the directory.
+    :return: The number of files and their size in bytes.
+    """
+    total_files, total_bytes = 0, 0
+    folders = [directory_path]
+    while folders:
+        try:
+            entries = os.scandir(folders.pop())
+        except OSError:
+            continue
+
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        folders.append(entry.path)
+                    else:
+                        total_files += 1
+                        total_bytes += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    return total_files, total_bytes
+
+
+def delete_files(paths: list[str]) -> tuple[int, list[str]]:
+    """
+    This function will delete a batch of files.
+
+    :param paths: The paths of the files.
+    :return: The number of files deleted and the errors.
+    """
+    deleted, errors = 0, []
+    for path in paths:
+        try:
+            os.remove(path)
+            deleted += 1
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            errors.append(f"{path}: {e}")
+    return deleted, errors
+
+
+def delete_directory(path: str) -> tuple[int, list[str]]:
+    """
+    This function will delete a directory with all its content.
+
+    :param path: The path of the directory.
+    :return: The number of directories deleted (0 or 1) and the errors.
+    """
+    errors = []
+    if sys.version_info >= (3, 12):
+        shutil.rmtree(path, onexc=lambda function, failed_path, error: errors.append(f"{failed_path}: {error}"))
+    else:
+        shutil.rmtree(path, onerror=lambda function, failed_path, info: errors.append(f"{failed_path}: {info[1]}"))
+    return (0 if errors else 1), errors
+
+
+def format_entries(files: int, directories: int, total_files: int, total_bytes: int) -> str:
+    """
+    This function will describe the entries of a plan, so the dry run and the deletion report the same quantities.
+
+    :param files: The number of files (outside the directories).
+    :param directories: The number of directories.
+    :param total_files: The number of files in total, including the content of the directories.
+    :param total_bytes: The bytes.
+    :return: The description.
+    """
+    return (f"{files} files and {directories} directories ({total_files} files in total), "
+            f"{format_size(total_bytes)}")
+
+
+# Classes
+class DeletionPlan:
+    """
+    This class is created to store the files and directories that will be deleted, with the number of files and the
+    bytes that will be freed (including the content of the directories).
+    """
+
+    def __init__(self):
+        self.files: list[str] = []
+        self.directories: list[str] = []
+        self.directory_files: dict[str, int] = {}
+        self.total_files = 0
+        self.total_bytes = 0
+
+    @classmethod
+    def from_paths(cls, paths: Iterable[tuple[str, bool]], plan: "DeletionPlan | None" = None) -> "DeletionPlan":
+        """
+        Creates the plan of several paths.
+
+        :param paths: The paths and whether each one is a directory.
+        :param plan: The plan where the paths are added, None to create a new one.
+        :return: The plan.
+        """
+        plan = plan if plan is not None else cls()
+        for path, is_dir in paths:
+            if is_dir:
+                plan.add_directory(path)
+            else:
+                plan.add_file(path)
+        return plan
+
+    def __len__(self) -> int:
+        return len(self.files) + len(self.directories)
+
+    def add_file(self, path: str) -> None:
+        """
+        Adds a file to the plan.
+
+        :param path: The path of the file.
+        """
+        try:
+            self.total_bytes += os.lstat(path).st_size
+        except OSError:
+            return
+        self.files.append(path)
+        self.total_files += 1
+
+    def add_directory(self, path: str) -> None:
+        """
+        Adds a directory (and all its content) to the plan.
+
+        :param path: The path of the directory.
+        """
+        total_files, total_bytes = get_directory_usage(path)
+        self.directories.append(path)
+        self.directory_files[path] = total_files
+        self.total_files += total_files
+        self.total_bytes += total_bytes
+
+    def summary(self) -> str:
+        """
+        Gets the description of the plan.
+
+        :return: The number of entries (files and directories), of files in total and the bytes that will be freed.
+        """
+        return format_entries(len(self.files), len(self.directories), self.total_files, self.total_bytes)
+
+    def describe(self) -> list[str]:
+        """
+        Gets the paths of the plan, the directories first (ending with a separator) and then the files.
+
+        :return: The paths that will be deleted.
+        """
+        return [os.path.join(path, "") for path in sorted(self.directories)] + sorted(self.files)
+
+    def execute(self, workers: int = DEFAULT_WORKERS, batch_size: int = BATCH_SIZE) -> dict:
+        """
+        Deletes the files (in batches) and the directories of the plan using a pool of threads.
+
+        :param workers: The number of threads.
+        :param batch_size: The number of files deleted by each task.
+        :return: The number of files and directories deleted, of files in total (including the content of the
+        directories), the seconds spent and the errors.
+        """
+        start = time.perf_counter()
+        tasks = [(delete_files, self.files[position:position + batch_size])
+                 for position in range(0, len(self.files), batch_size)]
+        tasks += [(delete_directory, path) for path in self.directories]
+
+        result = {"files": 0, "directories": 0, "total_files": 0, "errors": [], "seconds": 0.0}
+        if tasks:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(tasks)))) as executor:
+                futures = [(function, argument, executor.submit(function, argument)) for function, argument in tasks]
+                for function, argument, future in futures:
+                    deleted, errors = future.result()
+                    if function is delete_files:
+                        result["files"] += deleted
+                        result["total_files"] += deleted
+                    else:
+                        result["directories"] += deleted
+                        result["total_files"] += self.directory_files[argument] if deleted else 0
+                    result["errors"].extend(errors)
+
+        for error in result["errors"]:
+            log.debug(f"Not possible to delete {error}")
+        result["seconds"] = time.perf_counter() - start
+        return result
@@ -3,13 +3,25 @@ Functionality created to clean all the files created by the LaTeX compiler. This
 in the main.py file, in which the user can choose to clean the files or not.
 
 The function will take all the file extensions that defined in .gitignore file and ignored by the git, and will remove them
-from the directory. 
+from the directory. The patterns follow the semantics of git (see gitignore_matcher.py), and the ignored directories
+(e.g. _minted-*/ or build/) are removed at once instead of being traversed file by file.
+
+The cleaning is done in two phases: the plan of the files to delete is built first (see cleanup_plan.py), so it can be
+reviewed with a dry run, and then the files are deleted in batches by a pool of threads.
+
+In watch mode the project is cleaned once, and then only the files created since the last pass are checked (see
+artifact_watcher.py), so the cost of each cleaning depends on what the compiler wrote and not on the project size.
 """
 
 import subprocess
 import os
-import fnmatch
+import sys
 import logging
+from typing import Iterator
+
+from gitignore_matcher import GitIgnoreMatcher, parse_gitignore
+from cleanup_plan import DEFAULT_WORKERS, DeletionPlan, format_entries
+from artifact_watcher import create_watcher
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,16 +30,21 @@ log = logging.getLogger(__name__)
 
 # Constants
 GIT_IGNORE_FILE_PATH = "./src/docs/paper/.gitignore"
+PRUNED_DIRECTORIES = {".git"}
+WATCH_SETTLE_TIME = 1.0
 
 
 # Functions
-def clean_ignored_files(project_path: str, git_ignore_path: str):
+def clean_ignored_files(project_path: str, git_ignore_path: str, dry_run: bool = False,
+                        workers: int = DEFAULT_WORKERS) -> DeletionPlan | None:
     """
     This function will remove all the files that are defined in the .gitignore file. 
 
     :param project_path: The path of the project.
     :param git_ignore_path: The path of the .gitignore file.
-    :return: None
+    :param dry_run: If True, the files and directories that would be deleted are only listed.
+    :param workers: The number of threads that delete the files.
+    :return: The plan of the files deleted, None if an error took place.
     """
 
     try:
@@ -38,31 +55,163 @@ def clean_ignored_files(project_path: str, git_ignore_path: str):
         if not os.path.exists(git_ignore_path):
             raise FileNotFoundError(f"No se encontró el archivo .gitignore en {git_ignore_path}")
         
-        # Get the patterns that are defined in the .gitignore file
-        patterns = get_gitignore_patterns(git_ignore_path)
-
-        # Iterate over the folder / files structure and remove the files that match the patterns
-        for root, dirs, files in os.walk(project_path):
-            for file in files:
-
-                file_path = os.path.join(root, file)
-                
-                if any(fnmatch.fnmatch(file_path, os.path.join(project_path, pattern)) for pattern in patterns):
-
-                    try:
-                        os.remove(file_path)
-                        print(f"File Deleted: {file_path}")
-                    except Exception as e:
-                        print(f"Not possible to delete the file {file_path}")
-                        print(e)
+        # Compile the patterns that are defined in the .gitignore file
+        matcher = GitIgnoreMatcher.from_file(git_ignore_path)
+
+        # Plan the files (and directories) that match the patterns
+        plan = DeletionPlan.from_paths(iter_ignored_paths(project_path, matcher))
+        if dry_run:
+            for path in plan.describe():
+                print(f"Would delete {path}")
+            print(f"Dry run: {plan.summary()} would be deleted.")
+            return plan
+
+        # Remove them in batches
+        result = plan.execute(workers=workers)
+        entries = format_entries(result["files"], result["directories"], result["total_files"], plan.total_bytes)
+        print(f"Deleted {entries} freed in {result['seconds']:.2f} s"
+              + (f" ({len(result['errors'])} not possible to delete)" if result["errors"] else ""))
+        return plan
         
     except subprocess.CalledProcessError as e:
         print(e)
     except Exception as e:
         print("Took place an unexpected error:")
         print(e)
-        print("Took place an unexpected error:")
-        print(e)
+
+
+def iter_ignored_paths(project_path: str, matcher: GitIgnoreMatcher,
+                       relative_path: str = "") -> Iterator[tuple[str, bool]]:
+    """
+    This function will walk the project and return the paths that are ignored by the matcher. The ignored
+    directories are returned as a whole and are not traversed, as well as the .git directory.
+
+    :param project_path: The path of the project.
+    :param matcher: The matcher of the .gitignore patterns.
+    :param relative_path: The directory of the project that is walked (all the project by default).
+    :return: The ignored paths and whether each one is a directory.
+    """
+    relative_path = relative_path.strip("/")
+    folders = [(os.path.join(project_path, relative_path), relative_path + "/" if relative_path else "")]
+    while folders:
+        folder, relative_path = folders.pop()
+        try:
+            entries = os.scandir(folder)
+        except OSError as e:
+            log.warning(f"Not possible to read the directory {folder}: {e}")
+            continue
+
+        with entries:
+            for entry in entries:
+                path = relative_path + entry.name
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if is_dir and entry.name in PRUNED_DIRECTORIES:
+                    continue
+
+                if matcher.match(path, is_dir):
+                    yield entry.path, is_dir
+                elif is_dir:
+                    folders.append((entry.path, path + "/"))
+
+
+def iter_watched_directories(project_path: str, matcher: GitIgnoreMatcher,
+                             relative_path: str = "") -> Iterator[str]:
+    """
+    This function will walk the project and return the directories that are not ignored (the ones where the
+    compiler can create new files), including the one where the walk starts.
+
+    :param project_path: The path of the project.
+    :param matcher: The matcher of the .gitignore patterns.
+    :param relative_path: The directory of the project that is walked (all the project by default).
+    :return: The paths of the directories.
+    """
+    relative_path = relative_path.strip("/")
+    folders = [(os.path.join(project_path, relative_path), relative_path + "/" if relative_path else "")]
+    while folders:
+        folder, relative_path = folders.pop()
+        yield folder
+        try:
+            entries = os.scandir(folder)
+        except OSError:
+            continue
+
+        with entries:
+            for entry in entries:
+                path = relative_path + entry.name
+                if entry.is_dir(follow_symlinks=False) and entry.name not in PRUNED_DIRECTORIES \
+                        and not matcher.match(path, is_dir=True):
+                    folders.append((entry.path, path + "/"))
+
+
+def watch_ignored_files(project_path: str, git_ignore_path: str, settle_time: float = WATCH_SETTLE_TIME,
+                        workers: int = DEFAULT_WORKERS, timeout: float | None = None) -> int:
+    """
+    This function will remove all the files that are defined in the .gitignore file, and then it will keep
+    removing the ones created later. After the creation of a file, it waits until no file has been created
+    for `settle_time` seconds (the end of the compilation) before cleaning.
+
+    :param project_path: The path of the project.
+    :param git_ignore_path: The path of the .gitignore file.
+    :param settle_time: The seconds without new files before cleaning.
+    :param workers: The number of threads that delete the files.
+    :param timeout: The seconds without new files after which the watch ends, None to watch until interrupted.
+    :return: The number of cleaning passes after the first one.
+    """
+    if clean_ignored_files(project_path, git_ignore_path, workers=workers) is None:
+        return 0
+
+    matcher = GitIgnoreMatcher.from_file(git_ignore_path)
+    watcher = create_watcher()
+    for folder in iter_watched_directories(project_path, matcher):
+        watcher.add_directory(folder)
+
+    print(f"Watching the files created in {project_path} ({type(watcher).__name__}).")
+    passes = 0
+    try:
+        while True:
+            # Wait for the first file and then until the compiler stops writing
+            changes = watcher.read(timeout)
+            if changes == []:
+                return passes
+            while changes is not None:
+                more = watcher.read(settle_time)
+                if more is None:
+                    changes = None
+                elif not more:
+                    break
+                else:
+                    changes.extend(more)
+
+            plan = DeletionPlan()
+            if changes is None:
+                # Some events have been lost, so the whole project is checked again
+                plan = DeletionPlan.from_paths(iter_ignored_paths(project_path, matcher))
+                for folder in iter_watched_directories(project_path, matcher):
+                    watcher.add_directory(folder)
+            else:
+                for path in dict.fromkeys(changes):
+                    if not os.path.lexists(path):
+                        continue
+                    relative_path = os.path.relpath(path, project_path).replace(os.sep, "/")
+                    is_dir = os.path.isdir(path) and not os.path.islink(path)
+                    if matcher.is_ignored(relative_path, is_dir):
+                        plan = DeletionPlan.from_paths([(path, is_dir)], plan)
+                    elif is_dir and os.path.basename(path) not in PRUNED_DIRECTORIES:
+                        # A new directory can already contain files, and new files can be created in it
+                        for folder in iter_watched_directories(project_path, matcher, relative_path):
+                            watcher.add_directory(folder)
+                        plan = DeletionPlan.from_paths(iter_ignored_paths(project_path, matcher, relative_path), plan)
+
+            passes += 1
+            if len(plan):
+                result = plan.execute(workers=workers)
+                entries = format_entries(result["files"], result["directories"], result["total_files"],
+                                         plan.total_bytes)
+                print(f"Deleted {entries} freed in {result['seconds']:.2f} s")
+    except KeyboardInterrupt:
+        return passes
+    finally:
+        watcher.close()
 
 
 def get_gitignore_patterns(gitignore_path: str):
@@ -74,10 +223,7 @@ def get_gitignore_patterns(gitignore_path: str):
         :return: The patterns that are defined in the .gitignore file.
         """
         
-        with open(gitignore_path, "r") as file:
-            patterns = [line.strip() for line in file if line.strip() and not line.startswith("#")]
-        
-        return patterns
+        return parse_gitignore(gitignore_path)
 
 
 def get_current_directory():
@@ -99,15 +245,21 @@ def get_project_path():
     return os.path.join(get_current_directory(), "../../")
 
 
-def main():
+def main(dry_run: bool = False, watch: bool = False):
     """
     Main function which will clean the files that are defined in the .gitignore file
     searching in the project path.
+
+    :param dry_run: If True, the files that would be deleted are only counted.
+    :param watch: If True, the files created after the first cleaning are removed until interrupted.
     """
     print("Cleaning the files that are defined in the .gitignore file.")
-    clean_ignored_files(get_project_path(), GIT_IGNORE_FILE_PATH)
+    if watch and not dry_run:
+        watch_ignored_files(get_project_path(), GIT_IGNORE_FILE_PATH)
+    else:
+        clean_ignored_files(get_project_path(), GIT_IGNORE_FILE_PATH, dry_run=dry_run)
 
 
 # Execute the main function
 if __name__ == "__main__":
-    main()
+    main(dry_run="--dry-run" in sys.argv, watch="--watch" in sys.argv)
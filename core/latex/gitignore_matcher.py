@@ -0,0 +1,199 @@
+"""
+Functionality created to decide which files of the project are ignored by a .gitignore file, following the
+semantics of git:
+    - The patterns without a slash (e.g. "*.aux") match at any level, the rest are relative to the project.
+    - A trailing slash (e.g. "build/") only matches directories.
+    - "**" matches any number of directories ("**/figures", "build/**", "a/**/b").
+    - A leading "!" re-includes the paths ignored by a previous pattern (the last matching pattern wins),
+      except the paths inside an ignored directory.
+
+All the patterns are compiled once into a single regular expression (one for the files and one for the
+directories), so checking a path does not depend on the number of patterns.
+"""
+
+import os
+import re
+
+
+# Functions
+def parse_gitignore(gitignore_path: str) -> list[str]:
+    """
+    This function will read a .gitignore file and return its patterns, without the comments, the blank
+    lines and the trailing spaces that are not escaped.
+
+    :param gitignore_path: The path of the .gitignore file.
+    :return: The patterns of the file.
+    """
+    patterns = []
+    with open(gitignore_path, "r") as file:
+        for line in file:
+            line = line.rstrip("\n").rstrip("\r")
+            if not line.strip() or line.startswith("#"):
+                continue
+            stripped = line.rstrip(" ")
+            if stripped.endswith("\\") and len(stripped) < len(line):
+                stripped += " "
+            patterns.append(stripped)
+    return patterns
+
+
+def translate_segment(segment: str) -> str:
+    """
+    This function will translate a segment of a pattern (the text between two slashes) into a regular
+    expression, in which the wildcards do not match a slash.
+
+    :param segment: The segment of the pattern.
+    :return: The regular expression.
+    """
+    regex = []
+    position = 0
+    while position < len(segment):
+        character = segment[position]
+        position += 1
+
+        if character == "*":
+            while position < len(segment) and segment[position] == "*":
+                position += 1
+            regex.append("[^/]*")
+        elif character == "?":
+            regex.append("[^/]")
+        elif character == "\\" and position < len(segment):
+            regex.append(re.escape(segment[position]))
+            position += 1
+        elif character == "[":
+            end = position
+            if end < len(segment) and segment[end] in "!^":
+                end += 1
+            if end < len(segment) and segment[end] == "]":
+                end += 1
+            while end < len(segment) and segment[end] != "]":
+                end += 1
+            if end >= len(segment):
+                regex.append("\\[")
+                continue
+
+            content = segment[position:end].replace("\\", "\\\\")
+            if content[0] in "!^":
+                content = "^" + content[1:]
+            regex.append(f"(?!/)[{content}]")
+            position = end + 1
+        else:
+            regex.append(re.escape(character))
+    return "".join(regex)
+
+
+def translate_pattern(pattern: str) -> tuple[str, bool, bool] | None:
+    """
+    This function will translate a gitignore pattern into a regular expression that matches the paths
+    (relative to the project, separated by "/") that the pattern ignores.
+
+    :param pattern: The pattern.
+    :return: The regular expression, whether the pattern is a negation and whether it only matches
+    directories. None if the pattern does not match anything.
+    """
+    negated = pattern.startswith("!")
+    if negated:
+        pattern = pattern[1:]
+    elif pattern.startswith("\\!") or pattern.startswith("\\#"):
+        pattern = pattern[1:]
+
+    directory_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    if not pattern:
+        return None
+
+    anchored = "/" in pattern
+    segments = pattern.lstrip("/").split("/")
+
+    regex = "" if anchored else "(?:.*/)?"
+    separator = False
+    for position, segment in enumerate(segments):
+        if segment == "**":
+            if position == len(segments) - 1:
+                regex += "/.*" if separator else ".*"
+            elif separator:
+                regex += "(?:/.*)?"
+            else:
+                regex += "(?:.*/)?"
+            continue
+
+        regex += ("/" if separator else "") + translate_segment(segment)
+        separator = True
+    return regex, negated, directory_only
+
+
+# Classes
+class GitIgnoreMatcher:
+    """
+    This class is created to check if the paths of a project are ignored by a list of gitignore patterns.
+    The paths are relative to the project and their parts are separated by "/".
+    """
+
+    def __init__(self, patterns: list[str]):
+        """
+        Constructor of the class. Compiles the patterns into two regular expressions in which the last
+        pattern is tried first, so the first alternative that matches is the one that decides.
+
+        :param patterns: The gitignore patterns, in the order of the file.
+        """
+        self.patterns = patterns
+        self._negated: list[bool] = []
+        file_alternatives, directory_alternatives = [], []
+
+        for pattern in reversed(patterns):
+            translated = translate_pattern(pattern)
+            if translated is None:
+                continue
+
+            regex, negated, directory_only = translated
+            group = f"(?P<p{len(self._negated)}>{regex})"
+            self._negated.append(negated)
+            directory_alternatives.append(group)
+            if not directory_only:
+                file_alternatives.append(group)
+
+        self._files = re.compile("|".join(file_alternatives)) if file_alternatives else None
+        self._directories = re.compile("|".join(directory_alternatives)) if directory_alternatives else None
+
+    @classmethod
+    def from_file(cls, gitignore_path: str) -> "GitIgnoreMatcher":
+        """
+        Creates the matcher of the patterns of a .gitignore file.
+
+        :param gitignore_path: The path of the .gitignore file.
+        :return: The matcher.
+        """
+        return cls(parse_gitignore(gitignore_path))
+
+    def match(self, path: str, is_dir: bool = False) -> bool:
+        """
+        Checks if a path is ignored by the patterns, without checking its parent directories (a walk that
+        prunes the ignored directories never reaches their content).
+
+        :param path: The path, relative to the project.
+        :param is_dir: True if the path is a directory.
+        :return: True if the path is ignored.
+        """
+        regex = self._directories if is_dir else self._files
+        if regex is None:
+            return False
+
+        match = regex.fullmatch(path)
+        if match is None:
+            return False
+        return not self._negated[int(match.lastgroup[1:])]
+
+    def is_ignored(self, path: str, is_dir: bool = False) -> bool:
+        """
+        Checks if a path is ignored by the patterns, either directly or because one of its parent
+        directories is ignored.
+
+        :param path: The path, relative to the project.
+        :param is_dir: True if the path is a directory.
+        :return: True if the path is ignored.
+        """
+        parts = path.replace(os.sep, "/").strip("/").split("/")
+        for position in range(1, len(parts)):
+            if self.match("/".join(parts[:position]), is_dir=True):
+                return True
+        return self.match("/".join(parts), is_dir)
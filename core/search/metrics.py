@@ -0,0 +1,295 @@
+"""
+This script defines the metrics of the generation of the queries and of the scrapper:
+counters, gauges, timers and histograms (e.g. latency of the backend), grouped in a
+registry for each component. At the end of each run the registry is exported as a
+JSON snapshot and as a Prometheus text file, so the runs can be compared.
+
+The metrics are cheap to update, but they should still be updated in bulk (e.g. once
+per file instead of once per query) inside the hot loops.
+"""
+
+# Packages to import
+import json
+import time
+import threading
+from bisect import bisect_left
+from pathlib import Path
+
+
+# Constants
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+# Classes
+class Counter:
+    """
+    This class is created to count events (the value can only increase).
+    """
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        """
+        Increases the counter.
+
+        :param amount: The amount to add.
+        """
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> float:
+        return self.value
+
+
+class Gauge:
+    """
+    This class is created to store a value that can go up and down (e.g. a rate).
+    """
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value: float) -> None:
+        """
+        Sets the value of the gauge.
+
+        :param value: The value.
+        """
+        self.value = value
+
+    def snapshot(self) -> float:
+        return self.value
+
+
+class Histogram:
+    """
+    This class is created to store the distribution of a value (e.g. a latency) in
+    cumulative buckets, with its total and sum.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Constructor of the class.
+
+        :param buckets: The upper bounds of the buckets.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """
+        Registers a value.
+
+        :param value: The value.
+        """
+        with self._lock:
+            self.counts[bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+
+    def time(self) -> "Timer":
+        """
+        Gets a context manager that observes the seconds spent inside it.
+        """
+        return Timer(self)
+
+    def cumulative_counts(self) -> list[int]:
+        """
+        Gets the number of values lower or equal than each bound (and the total).
+        """
+        total, cumulative = 0, []
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "buckets": {str(bound): count for bound, count in zip(self.buckets + ("+Inf",), self.cumulative_counts())},
+        }
+
+
+class Timer:
+    """
+    This class is created to measure the seconds spent in a block of code, storing
+    them in a histogram.
+    """
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+        self.elapsed = 0.0
+
+    def __enter__(self) -> "Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.elapsed = time.perf_counter() - self._start
+        self.histogram.observe(self.elapsed)
+
+
+class MetricsRegistry:
+    """
+    This class is created to group the metrics of a component. Each metric is
+    identified by its name and its labels (e.g. the importance of the queries).
+    """
+
+    def __init__(self, component: str):
+        """
+        Constructor of the class.
+
+        :param component: The name of the component, used as prefix of the metrics.
+        """
+        self.component = component
+        self._metrics: dict[tuple[str, tuple], Counter | Gauge | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind: type, name: str, labels: dict, **kwargs) -> any:
+        """
+        Gets a metric, creating it the first time.
+        """
+        key = (name, tuple(sorted((label, str(value)) for label, value in labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(key, kind(**kwargs))
+        return metric
+
+    def counter(self, name: str, **labels) -> Counter:
+        return self._get(Counter, name, labels)
+
+    def gauge(self, name: str, **labels) -> Gauge:
+        return self._get(Gauge, name, labels)
+
+    def histogram(self, name: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **labels) -> Histogram:
+        return self._get(Histogram, name, labels, buckets=buckets)
+
+    def timer(self, name: str, **labels) -> Timer:
+        """
+        Gets a context manager that observes the seconds spent inside it in the
+        histogram `name`.
+        """
+        return self.histogram(name, **labels).time()
+
+    def reset(self) -> None:
+        """
+        Removes all the metrics (at the start of a run).
+        """
+        with self._lock:
+            self._metrics.clear()
+
+    def _full_name(self, name: str) -> str:
+        return f"{self.component}_{name}"
+
+    def snapshot(self) -> dict:
+        """
+        Gets the value of every metric.
+
+        :return: The metrics by name (and labels, if any).
+        """
+        snapshot = {}
+        for (name, labels), metric in sorted(self._metrics.items(), key=lambda item: item[0]):
+            key = self._full_name(name)
+            if labels:
+                key += "{" + ",".join(f"{label}={value}" for label, value in labels) + "}"
+            snapshot[key] = metric.snapshot()
+        return snapshot
+
+    def to_prometheus(self) -> str:
+        """
+        Gets the metrics in the text format of Prometheus.
+
+        :return: The text of the metrics.
+        """
+        lines = []
+        typed = set()
+        for (name, labels), metric in sorted(self._metrics.items(), key=lambda item: item[0]):
+            full_name = self._full_name(name)
+            kind = {Counter: "counter", Gauge: "gauge", Histogram: "histogram"}[type(metric)]
+            if full_name not in typed:
+                lines.append(f"# TYPE {full_name} {kind}")
+                typed.add(full_name)
+
+            if isinstance(metric, Histogram):
+                bounds = [str(bound) for bound in metric.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, metric.cumulative_counts()):
+                    lines.append(f"{full_name}_bucket{_labels(labels + (('le', bound),))} {count}")
+                lines.append(f"{full_name}_sum{_labels(labels)} {metric.sum}")
+                lines.append(f"{full_name}_count{_labels(labels)} {metric.count}")
+            else:
+                lines.append(f"{full_name}{_labels(labels)} {metric.value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, folder_path: Path | str) -> tuple[Path, Path]:
+        """
+        Stores the metrics in `<component>-metrics.json` and `<component>-metrics.prom`.
+
+        :param folder_path: The folder where the metrics are stored.
+        :return: The paths of the JSON and Prometheus files.
+        """
+        folder_path = Path(folder_path)
+        folder_path.mkdir(parents=True, exist_ok=True)
+
+        json_path = folder_path.joinpath(f"{self.component}-metrics.json")
+        with open(json_path, "w") as file:
+            json.dump({"component": self.component, "timestamp": time.time(), "metrics": self.snapshot()},
+                      file, indent=4)
+
+        prometheus_path = folder_path.joinpath(f"{self.component}-metrics.prom")
+        with open(prometheus_path, "w") as file:
+            file.write(self.to_prometheus())
+        return json_path, prometheus_path
+
+
+# Registries of the components
+_REGISTRIES: dict[str, MetricsRegistry] = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+
+# Functions
+def _labels(labels: tuple) -> str:
+    """
+    Gets the labels of a metric in the Prometheus format.
+    """
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{label}="{value}"' for label, value in labels) + "}"
+
+
+def get_registry(component: str) -> MetricsRegistry:
+    """
+    Gets the registry of the metrics of a component, creating it the first time.
+
+    :param component: The name of the component (e.g. "generator", "scrapper").
+    :return: The registry.
+    """
+    with _REGISTRIES_LOCK:
+        if component not in _REGISTRIES:
+            _REGISTRIES[component] = MetricsRegistry(component)
+        return _REGISTRIES[component]
+
+
+def count_items(iterable: any, counter: Counter) -> any:
+    """
+    Iterates over an iterable counting its items, and adds the total to a counter
+    when the iteration finishes (so the hot loop does not update the counter).
+
+    :param iterable: The iterable.
+    :param counter: The counter.
+    :return: The items of the iterable.
+    """
+    total = 0
+    try:
+        for item in iterable:
+            total += 1
+            yield item
+    finally:
+        counter.inc(total)
@@ -0,0 +1,134 @@
+"""
+This script defines the parallel generation of the search queries. The queries of
+each importance are split into chunks of positions of its query space (see
+`QuerySpace`), which are rendered by a pool of processes and written in order, so
+the files are identical to the ones generated sequentially.
+"""
+
+# Packages to import
+import os
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+from query_space import QuerySpace
+from query_stream import write_queries_jsonl
+
+
+# Constants
+DEFAULT_PARALLEL_CHUNK_SIZE = 50_000
+
+# Query spaces + structures of the levels, set in each worker process
+_levels: list[tuple[QuerySpace, str]] = []
+
+
+# Functions
+def get_total_workers(workers: int | None) -> int:
+    """
+    Gets the number of worker processes to use.
+
+    :param workers: The number of workers requested (0 or None to use all the cores).
+    :return: The number of workers.
+    """
+    if not workers or workers < 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def _init_worker(levels: list[tuple[QuerySpace, str]]) -> None:
+    """
+    Initializes a worker process with the query spaces of the levels, so they are
+    sent once per process instead of once per chunk.
+
+    :param levels: The query space and structure of each level.
+    """
+    global _levels
+    _levels = levels
+
+
+def _render_chunk(task: tuple[int, int, int]) -> list[str]:
+    """
+    Renders the queries of a chunk of positions of a level.
+
+    :param task: The level, the first position and the last position (excluded).
+    :return: The queries of the chunk.
+    """
+    # Imported here to avoid a circular import with query_generator
+    from query_generator import QueryGenerator
+
+    level, start, stop = task
+    query_space, structure = _levels[level]
+    return [QueryGenerator.format_query(structure, items) for items in query_space.iter_range(start, stop)]
+
+
+def _ordered_map(executor: ProcessPoolExecutor, tasks: list[tuple[int, int, int]], window: int) -> any:
+    """
+    Submits the tasks to the executor keeping at most `window` of them in flight,
+    and yields their results in the order of the tasks.
+
+    :param executor: The pool of processes.
+    :param tasks: The tasks to execute.
+    :param window: The maximum number of tasks in flight.
+    :return: A generator with the results of the tasks.
+    """
+    pending = deque()
+    tasks = iter(tasks)
+
+    for task in islice(tasks, window):
+        pending.append(executor.submit(_render_chunk, task))
+
+    while pending:
+        result = pending.popleft().result()
+        for task in islice(tasks, 1):
+            pending.append(executor.submit(_render_chunk, task))
+        yield result
+
+
+def write_levels_parallel(levels: list[tuple[str, QuerySpace, str]], workers: int | None = None,
+                          stream: bool = False, chunk_size: int = DEFAULT_PARALLEL_CHUNK_SIZE) -> list[int]:
+    """
+    Renders the queries of several levels with a pool of processes and stores them
+    in their files. Every level is split into chunks of `chunk_size` positions, and
+    the chunks of all the levels share the same pool.
+
+    :param levels: The file created with the query structure, the query space and
+    the structure of each level.
+    :param workers: The number of worker processes (0 or None to use all the cores).
+    :param stream: If True, the queries are written in JSON Lines format.
+    :param chunk_size: The number of queries rendered by each task.
+    :return: The total of queries stored for each level.
+    """
+    workers = get_total_workers(workers)
+
+    chunks_by_level = []
+    tasks = []
+    for level, (_, query_space, _) in enumerate(levels):
+        starts = range(0, query_space.size(), chunk_size)
+        chunks_by_level.append(len(starts))
+        tasks.extend((level, start, start + chunk_size) for start in starts)
+
+    totals = []
+    spaces = [(query_space, structure) for _, query_space, structure in levels]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(spaces,)) as executor:
+        results = _ordered_map(executor, tasks, window=workers * 2)
+
+        for (file_path, _, _), total_chunks in zip(levels, chunks_by_level):
+            queries = (query for chunk in islice(results, total_chunks) for query in chunk)
+
+            with open(file_path, "r") as file:
+                data = json.load(file)
+
+            if stream:
+                data.pop("data", None)
+                totals.append(write_queries_jsonl(Path(file_path).with_suffix(".jsonl"), data, queries))
+                os.remove(file_path)
+                continue
+
+            data["data"] = list(queries)
+            with open(file_path, "w") as file:
+                json.dump(data, file, indent=4)
+            totals.append(len(data["data"]))
+
+    return totals
@@ -0,0 +1,235 @@
+"""
+This script defines the canonical form of the Boolean search queries generated by
+`QueryGenerator`, e.g. "(LLM AND software) AND (test OR agent)". Two queries that only
+differ in the order of the operands of an AND / OR, in repeated operands or in
+redundant parentheses have the same canonical form (and hash), so they are only sent
+once to the search engine.
+
+The queries are parsed into nodes made of tuples, so they can be hashed and compared:
+    ("TERM", "software")
+    ("TERM", '"fault detection"')   (a phrase keeps its quotes, it is not the same search)
+    ("AND", (node_1, node_2, ...))
+    ("OR", (node_1, node_2, ...))
+"""
+
+# Packages to import
+import re
+import hashlib
+
+
+# Constants
+TERM = "TERM"
+AND = "AND"
+OR = "OR"
+
+TOKEN_PATTERN = re.compile(r'\(|\)|"[^"]*"|[^\s()"]+')
+
+
+# Functions
+def tokenize(query: str) -> list[str]:
+    """
+    Splits a query into parentheses, quoted phrases and words.
+
+    :param query: The query to split.
+    :return: The tokens of the query.
+    """
+    return TOKEN_PATTERN.findall(query)
+
+
+def parse_query(query: str) -> tuple:
+    """
+    Parses a query into its tree of nodes. AND has higher precedence than OR, and the
+    consecutive words between operators form a single term.
+
+    :param query: The query to parse.
+    :return: The root node of the query.
+    """
+    tokens = tokenize(query)
+    node, position = _parse_or(tokens, 0)
+    if position != len(tokens):
+        raise ValueError(f"Unexpected token '{tokens[position]}' in the query: {query}")
+    return node
+
+
+def _parse_or(tokens: list[str], position: int) -> tuple[tuple, int]:
+    """
+    Parses the operands of an OR, starting at a position of the tokens.
+
+    :return: The node and the position after it.
+    """
+    operands = []
+    node, position = _parse_and(tokens, position)
+    operands.append(node)
+    while position < len(tokens) and tokens[position] == OR:
+        node, position = _parse_and(tokens, position + 1)
+        operands.append(node)
+    return (operands[0] if len(operands) == 1 else (OR, tuple(operands))), position
+
+
+def _parse_and(tokens: list[str], position: int) -> tuple[tuple, int]:
+    """
+    Parses the operands of an AND, starting at a position of the tokens.
+
+    :return: The node and the position after it.
+    """
+    operands = []
+    node, position = _parse_atom(tokens, position)
+    operands.append(node)
+    while position < len(tokens) and tokens[position] == AND:
+        node, position = _parse_atom(tokens, position + 1)
+        operands.append(node)
+    return (operands[0] if len(operands) == 1 else (AND, tuple(operands))), position
+
+
+def _parse_atom(tokens: list[str], position: int) -> tuple[tuple, int]:
+    """
+    Parses a term or a query between parentheses, starting at a position of the tokens.
+
+    :return: The node and the position after it.
+    """
+    if position >= len(tokens):
+        raise ValueError("Unexpected end of the query.")
+
+    if tokens[position] == "(":
+        node, position = _parse_or(tokens, position + 1)
+        if position >= len(tokens) or tokens[position] != ")":
+            raise ValueError("Unbalanced parentheses in the query.")
+        return node, position + 1
+
+    words = []
+    while position < len(tokens) and tokens[position] not in ("(", ")", AND, OR):
+        token = tokens[position]
+        if token.startswith('"'):
+            # Quoted phrases keep their quotes (an exact phrase is a different search)
+            token = '"' + " ".join(token[1:-1].split()) + '"'
+        words.append(token)
+        position += 1
+
+    if not words:
+        raise ValueError(f"Expected a term but found '{tokens[position]}'.")
+    return (TERM, " ".join(words)), position
+
+
+def canonicalize(node: tuple) -> tuple:
+    """
+    Gets the canonical form of a node: terms case folded, nested operators of the
+    same type flattened, duplicated operands removed, operands sorted and operators
+    with a single operand replaced by it.
+
+    :param node: The node to normalize.
+    :return: The canonical node.
+    """
+    if node[0] == TERM:
+        return (TERM, node[1].casefold())
+
+    operands = set()
+    for operand in node[1]:
+        operand = canonicalize(operand)
+        if operand[0] == node[0]:
+            operands.update(operand[1])
+        else:
+            operands.add(operand)
+
+    if len(operands) == 1:
+        return operands.pop()
+    return (node[0], tuple(sorted(operands, key=to_query)))
+
+
+def to_query(node: tuple) -> str:
+    """
+    Gets the text of a node, with parentheses around the nested operators.
+
+    :param node: The node.
+    :return: The query.
+    """
+    if node[0] == TERM:
+        if '"' not in node[1] and (set(node[1].split()) & {AND, OR} or set(node[1]) & {"(", ")"}):
+            return f'"{node[1]}"'
+        return node[1]
+
+    parts = []
+    for operand in node[1]:
+        text = to_query(operand)
+        parts.append(text if operand[0] == TERM else f"({text})")
+    return f" {node[0]} ".join(parts)
+
+
+def canonical_query(query: str) -> str:
+    """
+    Gets the canonical text of a query.
+
+    :param query: The query.
+    :return: The canonical query.
+    """
+    return to_query(canonicalize(parse_query(query)))
+
+
+def normalize_query(query: str) -> str:
+    """
+    Gets the key of a query that can not be parsed (e.g. a keyterm with parentheses,
+    "Large Language Model (LLM)"): the query with the whitespace collapsed and case
+    folded.
+
+    :param query: The query.
+    :return: The normalized query.
+    """
+    return " ".join(query.split()).casefold()
+
+
+def canonical_hash(query: str) -> str:
+    """
+    Gets the hash of the canonical form of a query.
+
+    :param query: The query.
+    :return: The hash of the canonical query.
+    """
+    return hashlib.blake2b(canonical_query(query).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def deduplicate_queries(queries: any) -> tuple[list[tuple[int, str]], int]:
+    """
+    Removes the queries that are logically equivalent to a previous one.
+
+    :param queries: The queries.
+    :return: The unique queries (with their position) and the total of queries removed.
+    """
+    deduplicator = QueryDeduplicator()
+    unique = [(position, query) for position, query in enumerate(queries)
+              if deduplicator.add(query, position) is None]
+    return unique, deduplicator.saved
+
+
+# Classes
+class QueryDeduplicator:
+    """
+    This class is created to detect the queries that are logically equivalent to a
+    query already seen, and to count the requests saved by skipping them.
+    """
+
+    def __init__(self):
+        """
+        Constructor of the class.
+        """
+        self.seen: dict[str, int] = {}
+        self.total = 0
+        self.saved = 0
+
+    def add(self, query: str, position: int) -> int | None:
+        """
+        Registers a query.
+
+        :param query: The query.
+        :param position: The position of the query in its file.
+        :return: The position of the first equivalent query, None if the query is new.
+        """
+        self.total += 1
+        try:
+            key = canonical_hash(query)
+        except ValueError:
+            key = normalize_query(query)
+        if key in self.seen:
+            self.saved += 1
+            return self.seen[key]
+
+        self.seen[key] = position
+        return None
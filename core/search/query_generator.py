@@ -8,10 +8,22 @@ import os
 import sys
 
 import json
+import time
 import logging
 import pandas as pd
 from collections import Counter 
 from itertools import product
+from pathlib import Path
+
+from query_stream import sorted_unique, sorted_unique_rows, write_queries_jsonl, DEFAULT_CHUNK_SIZE
+from thesaurus_index import ThesaurusIndex
+from query_space import QuerySpace
+from query_manifest import QueryManifest, content_hash, write_json_if_changed
+from parallel_generation import write_levels_parallel
+from query_template import QueryTemplate
+from review_config import ReviewConfig, load_json
+from term_interner import TermInterner
+from metrics import MetricsRegistry, get_registry, count_items
 
 
 # Classes
@@ -29,6 +41,8 @@ class QueryGenerator:
     SOURCE_INFO_FILE_PATH = "./files/json/source-information.json" # "./files/json/source-information.json"
     SEARCH_RULES_FILE_PATH = "./files/json/search-rules.json"   # "./files/json/search-rules.json"
     TRIAL_SEARCHES_QUERIES_FOLDER = "./files/json/trial-search-queries/" # "./files/json/trial-search-queries/"
+    QUERIES_MANIFEST_FILE_PATH = "./files/json/queries-manifest.json"
+    METRICS_FOLDER_PATH = "./files/metrics/"
     JSON_FOLDER_PATH = "./files/json/"
 
     def __init__(self):
@@ -38,6 +52,57 @@ class QueryGenerator:
         logging.basicConfig(level=logging.INFO)     
         self.log = logging.getLogger(__name__)
 
+    @staticmethod
+    def get_review_config() -> ReviewConfig:
+        """
+        Gets the configuration of the review stored in the JSON folder. The files
+        are parsed once and cached until they are modified.
+
+        :return: The configuration of the review.
+        """
+        return ReviewConfig(QueryGenerator.JSON_FOLDER_PATH)
+
+    @staticmethod
+    def get_metrics() -> MetricsRegistry:
+        """
+        Gets the metrics of the generation of the queries (see `metrics`).
+
+        :return: The registry of the metrics.
+        """
+        return get_registry("generator")
+
+
+    @staticmethod
+    def record_queries_written(file_path: any, total: int) -> None:
+        """
+        Registers the queries stored in a file and the bytes of the file.
+
+        :param file_path: The path of the file.
+        :param total: The total of queries stored.
+        """
+        metrics = QueryGenerator.get_metrics()
+        metrics.counter("queries_written_total").inc(total)
+        if os.path.exists(file_path):
+            metrics.counter("bytes_written_total").inc(os.path.getsize(file_path))
+
+
+    @staticmethod
+    def export_metrics(start: float) -> None:
+        """
+        Registers the duration and throughput of a run and exports its metrics.
+
+        :param start: The time (perf_counter) when the run started.
+        """
+        metrics = QueryGenerator.get_metrics()
+        elapsed = time.perf_counter() - start
+        metrics.gauge("run_seconds").set(elapsed)
+        if elapsed > 0:
+            metrics.gauge("queries_per_second").set(metrics.counter("queries_written_total").value / elapsed)
+            metrics.gauge("combinations_per_second").set(
+                metrics.counter("combinations_expanded_total").value / elapsed)
+        metrics.export(QueryGenerator.METRICS_FOLDER_PATH)
+
+
     @staticmethod
     def get_concepts(file_path: str) -> pd.Series:
         """
@@ -46,8 +111,7 @@ class QueryGenerator:
         :param context: The context of the search.
         :return: The context of the search.
         """
-        df = pd.DataFrame(pd.read_json(file_path))
-        context = df["key-concepts"]
+        context = pd.Series(load_json(file_path)["key-concepts"])
         return context
 
     @staticmethod
@@ -59,8 +123,7 @@ class QueryGenerator:
         :return: The keyterms and thesaurus, in different lists.
         """
         # Gets keyterms
-        df = pd.DataFrame(pd.read_json(file_path))
-        keyterms = df["keyterms"].copy()
+        keyterms = pd.Series(load_json(file_path)["keyterms"])
 
         all_keyterms = list()
         for keyterm in keyterms:
@@ -81,8 +144,7 @@ class QueryGenerator:
         :param file_path: The path of the file that contains the separated keyterms.
         :return: The separated keyterms. 
         """
-        df = pd.DataFrame(pd.read_json(file_path))
-        separated_keyterms = df["data"].copy()
+        separated_keyterms = pd.Series(load_json(file_path)["data"])
         return separated_keyterms
     
 
@@ -94,7 +156,7 @@ class QueryGenerator:
         :param keyterms: The keyterms of the search.
         :param importance: The importance of the keyterms.
         """
-        keyt = pd.DataFrame(keyterms.tolist().copy())
+        keyt = pd.DataFrame(list(keyterms))
         return keyt[keyt["importance"] == importance]
 
 
@@ -158,13 +220,13 @@ class QueryGenerator:
                 "concept": thes["concept"],
                 "keyterm": thes["keyterm"],
                 "divided": thes["divided"],
-                "thesaurus": list(thes["thesaurus"])
+                "thesaurus": sorted(thes["thesaurus"])
             }
             basic_structure["data"].append(new_thes)
 
+        # Only rewrite the file if the thesaurus has changed
         path_file = f"{QueryGenerator.JSON_FOLDER_PATH}/thesaurus.json"
-        with open(path_file, "w") as file:
-            json.dump(basic_structure, file, indent=4)
+        write_json_if_changed(path_file, basic_structure)
 
         return thesaurus, set(all_thesuari_terms)
     
@@ -178,8 +240,7 @@ class QueryGenerator:
         :param file_path: The path of the file that contains the thesaurus.
         :return: The thesaurus of the search + all the thesaurus terms.
         """
-        df = pd.DataFrame(pd.read_json(file_path))
-        thesaurus = df["data"].copy()
+        thesaurus = pd.Series(load_json(file_path)["data"])
 
         all_thesaurus_terms = list()
         for thes in thesaurus:
@@ -192,9 +253,12 @@ class QueryGenerator:
         Check if the keyterm has a thesaurus. 
         
         :param keyterm: The keyterm to check.
-        :param thesaurus: The thesaurus of the search.
+        :param thesaurus: The thesaurus of the search (or its ThesaurusIndex).
         :return: True if the keyterm has a thesaurus, False otherwise.
         """
+        if isinstance(thesaurus, ThesaurusIndex):
+            return keyterm in thesaurus
+
         for thes in thesaurus:
             if thes["keyterm"] == keyterm:
                 return True
@@ -206,11 +270,16 @@ class QueryGenerator:
         Gets the thesaurus from a keyterm. 
 
         :param keyterm: The keyterm to get the thesaurus.
+        :param thesaurus: The thesaurus of the search (or its ThesaurusIndex).
         :return: The thesaurus of the keyterm.
         """
+        if isinstance(thesaurus, ThesaurusIndex):
+            return thesaurus.get(keyterm)
+
         for thes in thesaurus:
             if thes["keyterm"] == keyterm:
-                self.log.info(f"Thesaurus: {thes['thesaurus']}")
+                if self.log.isEnabledFor(logging.DEBUG):
+                    self.log.debug(f"Thesaurus: {thes['thesaurus']}")
                 return thes["thesaurus"]
         return None
     
@@ -223,9 +292,7 @@ class QueryGenerator:
         :param file_path: The path of the file that contains the sources.
         :return: The sources of the studies.
         """
-        # with open(file_path, "r") as file:
-        df = pd.DataFrame(pd.read_json(file_path))
-        sources = df["sources"].copy()
+        sources = pd.Series(load_json(file_path)["sources"])
         return sources
     
 
@@ -238,8 +305,7 @@ class QueryGenerator:
         :param file_path: The path of the file that contains the rules.
         :return: The rules of the sources of information.
         """
-        df = pd.DataFrame(pd.read_json(file_path))
-        rules = df["rules_search"].copy()
+        rules = pd.Series(load_json(file_path)["rules_search"])
         return rules
 
 
@@ -272,45 +338,8 @@ class QueryGenerator:
         false otherwise.
         """
         try:
-
-            conc = pd.DataFrame(concepts.tolist().copy())
-            keyt = pd.DataFrame(keyterms.tolist().copy())
-            thes = thesaurus.copy()
-
-            total_concepts = str(len(conc))
-            total_importance = str(len(set(conc["importance"])) if "importance" in conc else 0)  
-
-            basic_structure = {
-                "total_concepts": total_concepts,
-                "total_importance": total_importance,
-                "data": []
-            }
-
-            for _, row1 in conc.iterrows():
-                all_keyterms = list()
-                all_thesaurus = list()    
-                
-                for _, row2 in keyt.iterrows():
-                    if row1["id"] == row2["concept"]:
-                        term = row2["keyterm"]
-                        self.log.info(f"Term: {term}")
-                        all_keyterms.append(term)
-                         
-                for thesaur in thes:
-                    if thesaur["concept"] == row1["id"]:
-                        all_thesaurus.extend(thesaur["thesaurus"])
-
-                self.log.info(f"Keyterms: {all_keyterms}")
-                self.log.info(f"The: {all_thesaurus}")
-
-                new_concept = {
-                    "concept": row1["id"],
-                    "importance": row1["importance"],
-                    "keyterms": all_keyterms,
-                    "thesaurus": all_thesaurus
-                }
-
-                basic_structure["data"].append(new_concept)
+            basic_structure = QueryGenerator.build_separated_keyterms(concepts, keyterms, thesaurus)
+            self.log.info(f"Separated keyterms of {basic_structure['total_concepts']} concepts")
 
             # Create or overwriter JSON file
             path_file = f"{QueryGenerator.JSON_FOLDER_PATH}/separated_keyterms.json"
@@ -324,56 +353,372 @@ class QueryGenerator:
             return False
 
 
+    @staticmethod
+    def build_separated_keyterms(concepts: pd.Series, keyterms: pd.Series,
+                                 thesaurus: list[dict[str, str, set[str]]]) -> dict:
+        """
+        Builds the structure of the separated keyterms file. The keyterms and the
+        thesaurus terms are grouped by concept and joined to the concepts on the
+        concept id, so the cost grows linearly with the number of keyterms.
+
+        :param concepts: The concepts of the search.
+        :param keyterms: The keyterms of the search.
+        :param thesaurus: The thesaurus of the search.
+        :return: The separated keyterms (total_concepts, total_importance, data).
+        """
+        conc = pd.DataFrame(list(concepts))
+        keyt = pd.DataFrame(list(keyterms), columns=["concept", "keyterm"])
+        thes = pd.DataFrame(list(thesaurus), columns=["concept", "thesaurus"])
+
+        total_concepts = str(len(conc))
+        total_importance = str(len(set(conc["importance"])) if "importance" in conc else 0)
+
+        # Group the keyterms + thesaurus terms of each concept (keeping their order)
+        keyterms_by_concept = keyt.groupby("concept", sort=False)["keyterm"].agg(list).rename("keyterms")
+        thesaurus_by_concept = (thes.explode("thesaurus").dropna(subset=["thesaurus"])
+                                .groupby("concept", sort=False)["thesaurus"].agg(list))
+
+        separated = (conc[["id", "importance"]]
+                     .merge(keyterms_by_concept, how="left", left_on="id", right_index=True)
+                     .merge(thesaurus_by_concept, how="left", left_on="id", right_index=True))
+
+        data = [
+            {
+                "concept": concept,
+                "importance": importance,
+                "keyterms": all_keyterms if isinstance(all_keyterms, list) else [],
+                "thesaurus": all_thesaurus if isinstance(all_thesaurus, list) else []
+            }
+            for concept, importance, all_keyterms, all_thesaurus in zip(
+                separated["id"].tolist(), separated["importance"].tolist(),
+                separated["keyterms"].tolist(), separated["thesaurus"].tolist())
+        ]
+
+        return {
+            "total_concepts": total_concepts,
+            "total_importance": total_importance,
+            "data": data
+        }
+
+
     @staticmethod
     def generate_search_queries(concepts: pd.Series, separated_keyterms: pd.Series, 
-                                thesaurus: pd.Series) -> bool:
+                                thesaurus: pd.Series, stream: bool = False, max_queries: int | None = None,
+                                seed: int | None = None, incremental: bool = False, workers: int = 1) -> bool:
         """
         Generates random search queries based on the keyterms, thesaurus, and sources (rules of each). 
         
         :param keyterms: The keyterms of the search.
         :param thesaurus: The thesaurus of the search.
         :param sources: The sources of the search.
+        :param stream: If True, the queries are expanded lazily and written in JSON Lines
+        format (queries_<importance>.jsonl), keeping the memory bounded.
+        :param max_queries: The maximum number of queries of each importance. The levels
+        with more queries are sampled uniformly instead of being expanded.
+        :param seed: The seed used to sample the queries.
+        :param incremental: If True, only the importances whose inputs have changed since
+        the last run are generated again (see `update_search_queries`).
+        :param workers: The number of processes used to generate the queries (1 to
+        generate them sequentially, 0 to use all the cores). The output is the same.
         :return: True if the queries have been generated & stored successfully, False otherwise.
         """
+        if incremental:
+            return QueryGenerator.update_search_queries(concepts, separated_keyterms, thesaurus, stream=stream,
+                                                        max_queries=max_queries, seed=seed, workers=workers)
+
         folder_path = QueryGenerator.TRIAL_SEARCHES_QUERIES_FOLDER
+        metrics = QueryGenerator.get_metrics()
+        metrics.reset()
+        start = time.perf_counter()
         
         try:
             queryGenerator = QueryGenerator()
 
-            # Generate the queries based on the structure
-            importance: int = 3  # The importance should be the maximum importance of the concepts and passed as argument
-            for x in range(1, importance + 1):
+            # Index the thesaurus once for the whole generation
+            thesaurus = ThesaurusIndex.build(thesaurus)
+
+            query_spaces = QueryGenerator.estimate_query_space(separated_keyterms, thesaurus)
+            queryGenerator.log.info(f"Total queries by importance: {query_spaces}")
+
+            # Remove the queries of the previous generation
+            queryGenerator.clear_query_files(folder_path)
+
+            # Generate the queries of each importance based on its structure
+            parallel_levels = []
+            for x in QueryGenerator.get_importances(concepts):
+                level_start = time.perf_counter()
                 structure = queryGenerator.create_query_structure(concepts, x)   
-                response = queryGenerator.create_query_files(folder_path, structure, x)
-                if response:
-                    queryGenerator.log.info(f"Created file: {folder_path}")
+                file_path = queryGenerator.create_query_file(folder_path, structure, x)
+                queryGenerator.log.info(f"Created file: {file_path}")
+
+                if max_queries is not None and query_spaces.get(x, 0) > max_queries:
+                    query_space = QueryGenerator.get_query_space(separated_keyterms, thesaurus, x)
+                    response = queryGenerator.sample_search_queries(file_path, query_space, max_queries,
+                                                                    seed=seed, stream=stream)
+                elif workers != 1:
+                    # Generated at once by the pool of processes
+                    query_space = QueryGenerator.get_query_space(separated_keyterms, thesaurus, x)
+                    parallel_levels.append((file_path, query_space, structure))
+                    continue
                 else:
-                    queryGenerator.log.error(f"An error occurred while creating the queries files.")
-
-            # Generate search queries 
-            total_query_files = len(os.listdir(folder_path))
-            for x in range(1, total_query_files + 1):
-                file_path = f"{folder_path}queries_{x}.json"
-                response = queryGenerator.add_terms_to_query_structure(file_path, separated_keyterms, thesaurus, x)
+                    response = queryGenerator.add_terms_to_query_structure(file_path, separated_keyterms, thesaurus, x,
+                                                                           stream=stream)
+                metrics.histogram("level_seconds").observe(time.perf_counter() - level_start)
                 if response:
                     queryGenerator.log.info(f"Queries have been generated and stored in {file_path}") 
                 else:
                     logging.error(f"An error occurred while generating the queries.")
-                    
 
+            if parallel_levels:
+                totals = write_levels_parallel(parallel_levels, workers=workers, stream=stream)
+                for (file_path, _, _), total in zip(parallel_levels, totals):
+                    QueryGenerator.record_queries_written(Path(file_path).with_suffix(".jsonl") if stream else file_path,
+                                                          total)
+                    queryGenerator.log.info(f"{total} queries have been generated and stored in {file_path}")
+
+            QueryGenerator.export_metrics(start)
             return True
         except Exception as e:
             logging.error(f"An error occurred while generating the search queries: {e}")
             return False                                                                                                                                                    
 
 
+    @staticmethod
+    def get_keyterms_slots(separated_keyterms: pd.Series, importance: int) -> list[list[str]]:
+        """
+        Gets the keyterms of each concept (slot of the query structure) used by the
+        queries of an importance: the concepts of the same or lower importance, in
+        order of importance.
+
+        :param separated_keyterms: The separated keyterms.
+        :param importance: The importance of the queries.
+        :return: The keyterms of each slot.
+        """
+        concepts = list(separated_keyterms)
+        levels = QueryGenerator.get_importances(concepts)
+
+        slots = []
+        for level in levels:
+            if level > int(importance):
+                break
+            slots.extend(list(concept["keyterms"]) for concept in concepts
+                         if int(concept["importance"]) == level)
+        return slots
+
+
+    @staticmethod
+    def get_query_space(separated_keyterms: pd.Series, thesaurus: any, importance: int) -> QuerySpace:
+        """
+        Gets the space of queries of an importance, which allows to count and sample
+        the queries without generating them.
+
+        :param separated_keyterms: The separated keyterms.
+        :param thesaurus: The thesaurus of the search (or its ThesaurusIndex).
+        :param importance: The importance of the queries.
+        :return: The space of queries.
+        """
+        slots = QueryGenerator.get_keyterms_slots(separated_keyterms, importance)
+        return QuerySpace(slots, thesaurus)
+
+
+    @staticmethod
+    def estimate_query_space(separated_keyterms: pd.Series, thesaurus: any,
+                             importances: list[int] | None = None) -> dict[int, int]:
+        """
+        Computes the exact number of distinct queries that each importance produces,
+        without building them.
+
+        :param separated_keyterms: The separated keyterms.
+        :param thesaurus: The thesaurus of the search (or its ThesaurusIndex).
+        :param importances: The importances to compute, all of them by default.
+        :return: The total of queries by importance.
+        """
+        thesaurus = ThesaurusIndex.build(thesaurus)
+        if importances is None:
+            importances = QueryGenerator.get_importances(separated_keyterms)
+
+        return {
+            importance: QueryGenerator.get_query_space(separated_keyterms, thesaurus, importance).size()
+            for importance in importances
+        }
+
+
+    def sample_search_queries(self, file_path: any, query_space: QuerySpace, total: int,
+                              seed: int | None = None, stream: bool = False) -> bool:
+        """
+        Stores at most `total` distinct queries drawn uniformly from the space of
+        queries, decoding random positions of the space instead of expanding it.
+
+        :param file_path: The path of the JSON file created with the query structure.
+        :param query_space: The space of queries of the importance.
+        :param total: The maximum number of queries.
+        :param seed: The seed of the random generator.
+        :param stream: If True, the queries are written in JSON Lines format.
+        :return: True if the queries have been stored successfully, False otherwise.
+        """
+        try:
+            with open(file_path, "r") as file:
+                data = json.load(file)
+
+            structure = data["info"][0]["structure"]
+            combinations = query_space.sample(total, seed=seed)
+            formatted_combinations = [self.format_query(structure, items) for items in combinations]
+
+            self.log.info(f"Sampled {len(formatted_combinations)} of {query_space.size()} queries")
+
+            if stream:
+                data.pop("data", None)
+                jsonl_path = Path(file_path).with_suffix(".jsonl")
+                write_queries_jsonl(jsonl_path, data, formatted_combinations)
+                os.remove(file_path)
+                QueryGenerator.record_queries_written(jsonl_path, len(formatted_combinations))
+                return True
+
+            data["data"] = formatted_combinations
+            with open(file_path, "w") as file:
+                json.dump(data, file, indent=4)
+            QueryGenerator.record_queries_written(file_path, len(formatted_combinations))
+            return True
+        except Exception as e:
+            self.log.error(f"An error occurred while sampling the search queries: {e}")
+            return False
+
+
+    @staticmethod
+    def update_search_queries(concepts: pd.Series, separated_keyterms: pd.Series, thesaurus: pd.Series,
+                              stream: bool = False, max_queries: int | None = None,
+                              seed: int | None = None, workers: int = 1) -> bool:
+        """
+        Generates the search queries incrementally. The hashes of the inputs of each
+        importance are compared with the ones recorded in the manifest, and only the
+        importances whose inputs have changed (or whose file is missing) are expanded
+        again. The files of the other importances are kept untouched.
+
+        :param concepts: The concepts of the search.
+        :param separated_keyterms: The separated keyterms.
+        :param thesaurus: The thesaurus of the search.
+        :param stream: If True, the queries are written in JSON Lines format.
+        :param max_queries: The maximum number of queries of each importance (sampled).
+        :param seed: The seed used to sample the queries.
+        :param workers: The number of processes used to generate the queries.
+        :return: True if the queries are up to date, False otherwise.
+        """
+        folder_path = QueryGenerator.TRIAL_SEARCHES_QUERIES_FOLDER
+        metrics = QueryGenerator.get_metrics()
+        metrics.reset()
+        start = time.perf_counter()
+
+        try:
+            queryGenerator = QueryGenerator()
+            thesaurus = ThesaurusIndex.build(thesaurus)
+            manifest = QueryManifest(QueryGenerator.QUERIES_MANIFEST_FILE_PATH)
+            options = {"stream": stream, "max_queries": max_queries, "seed": seed}
+
+            success = True
+            parallel_levels = []
+            importances = QueryGenerator.get_importances(concepts)
+
+            # Remove the queries of the importances that are no longer defined
+            for x in manifest.retain(importances):
+                queryGenerator.log.info(f"Queries of importance {x} are no longer defined")
+            queryGenerator.remove_stale_query_files(folder_path, importances)
+
+            for x in importances:
+                structure = queryGenerator.create_query_structure(concepts, x)
+                inputs = QueryGenerator.get_level_inputs(concepts, separated_keyterms, thesaurus, x,
+                                                         structure, options)
+
+                if manifest.is_current(x, inputs):
+                    queryGenerator.log.info(f"Queries of importance {x} are up to date")
+                    metrics.counter("levels_skipped_total").inc()
+                    continue
+
+                level_start = time.perf_counter()
+                file_path = queryGenerator.create_query_file(folder_path, structure, x)
+                query_space = QueryGenerator.get_query_space(separated_keyterms, thesaurus, x)
+                if max_queries is not None and query_space.size() > max_queries:
+                    response = queryGenerator.sample_search_queries(file_path, query_space, max_queries,
+                                                                    seed=seed, stream=stream)
+                elif workers != 1:
+                    parallel_levels.append((file_path, query_space, structure, x, inputs))
+                    continue
+                else:
+                    response = queryGenerator.add_terms_to_query_structure(file_path, separated_keyterms, thesaurus, x,
+                                                                           stream=stream)
+
+                metrics.histogram("level_seconds").observe(time.perf_counter() - level_start)
+                if response:
+                    manifest.update(x, inputs, Path(file_path).with_suffix(".jsonl") if stream else file_path)
+                    queryGenerator.log.info(f"Queries of importance {x} have been generated again")
+                else:
+                    queryGenerator.log.error(f"An error occurred while generating the queries of importance {x}.")
+                    success = False
+
+            if parallel_levels:
+                totals = write_levels_parallel([level[:3] for level in parallel_levels], workers=workers, stream=stream)
+                for (file_path, _, _, x, inputs), total in zip(parallel_levels, totals):
+                    QueryGenerator.record_queries_written(Path(file_path).with_suffix(".jsonl") if stream else file_path,
+                                                          total)
+                    manifest.update(x, inputs, Path(file_path).with_suffix(".jsonl") if stream else file_path)
+                    queryGenerator.log.info(f"Queries of importance {x} have been generated again")
+
+            manifest.save()
+            QueryGenerator.export_metrics(start)
+            return success
+        except Exception as e:
+            logging.error(f"An error occurred while updating the search queries: {e}")
+            return False
+
+
+    @staticmethod
+    def get_level_inputs(concepts: pd.Series, separated_keyterms: pd.Series, thesaurus: any,
+                         importance: int, structure: str, options: dict | None = None) -> dict[str, str]:
+        """
+        Gets the hashes of the part of each input file that the queries of an
+        importance depend on: the concepts up to the importance (and the structure),
+        their key terms, their separated keyterms and the thesaurus of those keyterms.
+
+        :param concepts: The concepts of the search.
+        :param separated_keyterms: The separated keyterms.
+        :param thesaurus: The thesaurus of the search (or its ThesaurusIndex).
+        :param importance: The importance of the queries.
+        :param structure: The structure of the queries.
+        :param options: The options used to generate the queries.
+        :return: The hash of each input.
+        """
+        thesaurus = ThesaurusIndex.build(thesaurus)
+
+        level_concepts = [concept for concept in concepts if int(concept["importance"]) <= int(importance)]
+        concept_ids = {str(concept["id"]) for concept in level_concepts}
+
+        key_terms = []
+        if os.path.exists(QueryGenerator.KEY_TERMS_FILE_PATH):
+            key_terms = [keyterm for keyterm in load_json(QueryGenerator.KEY_TERMS_FILE_PATH).get("keyterms", [])
+                         if str(keyterm.get("concept")) in concept_ids]
+
+        slots = QueryGenerator.get_keyterms_slots(separated_keyterms, importance)
+        expansions = {}
+        for keyterms in slots:
+            for keyterm in keyterms:
+                expansion = thesaurus.expand(keyterm)
+                expansions[keyterm] = sorted(expansion) if expansion is not None else None
+
+        return {
+            "key-concepts": content_hash({"structure": structure, "concepts": level_concepts}),
+            "key-terms": content_hash(key_terms),
+            "separated_keyterms": content_hash(slots),
+            "thesaurus": content_hash(expansions),
+            "options": content_hash(options or {})
+        }
+
+
     def create_query_structure(self, concepts: pd.Series, target_importance: any) -> str:
         """
         Based on the keyterms, total concepts, and actual concept, this function 
         creates the query structure.
         
         :param concepts: The concepts of the search.
-        :param target_importance: The target importance of the search.
+        :param target_importance: The target importance of the search (any depth).
         :return: The query structure.
 
         Example:
@@ -384,50 +729,37 @@ class QueryGenerator:
         The query structure will be: (concept1_1) AND (concept2_1 OR concept2_2) 
             AND (concept3_1 OR concept3_2 OR concept3_3)
         """
-        conc = pd.DataFrame(concepts.tolist().copy())
-        total_concepts = conc['importance']
-
         try:
 
             # Get the importance counts
-            importance_counts = dict(Counter(total_concepts.tolist()))
+            importance_counts = dict(Counter(int(concept["importance"]) for concept in concepts))
 
             # Check if the target importance is in the concepts
-            if str(target_importance) not in importance_counts:
+            if int(target_importance) not in importance_counts:
                 raise ValueError(f"The importance {target_importance} is not in the concepts.")
 
             # Group the concepts by importance
             grouped_concepts = {}
             counter = 1
-            for importance, count in sorted(importance_counts.items(), 
-                                            key=lambda x: int(x[0])):
-                grouped_concepts[int(importance)] = [f"concept_{counter + i}" for 
-                                                     i in range(count)]
+            for importance, count in sorted(importance_counts.items()):
+                grouped_concepts[importance] = [f"concept_{counter + i}" for 
+                                                i in range(count)]
                 counter += count
 
-
+            # The concepts of the first importance are all required (AND), the
+            # ones of each following importance are alternatives (OR)
             final_structure = ""
-            for current_importance in range(1, target_importance + 1):
-                structure = ""
-                match current_importance:
-                    case 1:
-                        fields = grouped_concepts.get(1, [])
-                        structure = " AND ".join(fields)
-                        final_structure = f"({structure})"
-                        
-                    case 2:
-                        fields = grouped_concepts.get(2, [])
-                        structure = " OR ".join(fields)
-                        final_structure += f" AND ({structure})"
-
-                    case 3:
-                        fields = grouped_concepts.get(3, [])
-                        structure = " OR ".join(fields)
-                        final_structure += f" AND ({structure})"
-
-                    case _:
-                        self.log.error("The target importance is not valid.")
-                        return ""
+            for current_importance, fields in grouped_concepts.items():
+                if current_importance > int(target_importance):
+                    break
+
+                if not final_structure:
+                    structure = " AND ".join(fields)
+                    final_structure = f"({structure})"
+                    continue
+
+                structure = " OR ".join(fields)
+                final_structure += f" AND ({structure})"
             
             return final_structure
         except Exception as e:
@@ -435,64 +767,90 @@ class QueryGenerator:
             return ""
     
 
-    def create_query_files(self, folder_path: any, structure: str, importance: str) -> bool:
+    @staticmethod
+    def get_importances(concepts: pd.Series) -> list[int]:
         """
-        Creates the files with the query structurem in order to store 
-        the queries at a later date.
+        Gets all the importances defined in the concepts, in ascending order.
+
+        :param concepts: The concepts of the search.
+        :return: The importances of the concepts.
+        """
+        return sorted({int(concept["importance"]) for concept in concepts})
+
+
+    def clear_query_files(self, folder_path: any) -> None:
+        """
+        Removes the files with queries (queries_<importance>.json / .jsonl) of the
+        folder, creating the folder if it does not exist.
+
+        :param folder_path: The path of the folder that stores the queries.
+        """
+        folder_path = Path(folder_path)
+        folder_path.mkdir(parents=True, exist_ok=True)
+
+        for file_path in folder_path.glob("queries_*.json*"):
+            file_path.unlink()
+
+
+    def remove_stale_query_files(self, folder_path: any, importances: list[int]) -> None:
+        """
+        Removes the files with queries (queries_<importance>.json / .jsonl) of the
+        importances that are not defined anymore.
+
+        :param folder_path: The path of the folder that stores the queries.
+        :param importances: The importances defined in the concepts.
+        """
+        folder_path = Path(folder_path)
+        if not folder_path.exists():
+            return
+
+        current = {str(importance) for importance in importances}
+        for file_path in folder_path.glob("queries_*.json*"):
+            if file_path.suffix in (".json", ".jsonl") and file_path.stem.split("_", 1)[1] not in current:
+                file_path.unlink()
+                self.log.info(f"Stale queries file removed: {file_path}")
+
+
+    def create_query_file(self, folder_path: any, structure: str, importance: int) -> str:
+        """
+        Creates (or replaces) the file with the query structure of an importance,
+        named after the importance and without removing the files of the others.
 
         :param folder_path: The path of the folder to store the queries.
         :param structure: The structure of the queries.
-        :return: True if the files have been created successfully, False otherwise.
+        :param importance: The importance of the queries.
+        :return: The path of the file.
         """
-        if not os.path.exists(folder_path):
-            raise FileNotFoundError(f"The folder {folder_path} does not exist.")
-        
         if not structure:
             raise ValueError("The structure of the queries is not valid.")
-        
-        # Check how many files are in the folder
-        total_queries_files = len(os.listdir(folder_path))
-        if total_queries_files >= 3:
-            for file_name in os.listdir(folder_path):
-                    file_path = os.path.join(folder_path, file_name)
-                    os.remove(file_path)
-
-            total_queries_files = 0
-        
-        try:
 
-            # Create the structure of the JSON file + store it
-            basic_structure = {
-                "_comment": "This file contains the queries that have been generated based on the corresponding importance.",
-                "info": [
-                    {
-                        "total_concepts": 0,
-                        "structure": structure,
-                        "importance": importance
-                    }
-                ],
-                "data": []
-            }
+        Path(folder_path).mkdir(parents=True, exist_ok=True)
+        path_file = Path(folder_path).joinpath(f"queries_{importance}.json")
 
-            self.log.info(f"Total queries files: {total_queries_files}")
+        # Remove the queries stored in the other format
+        path_file.with_suffix(".jsonl").unlink(missing_ok=True)
 
-            # Write + Save the file
-            path_file = f"{folder_path}queries_{total_queries_files + 1}.json"
-            self.log.info(f"Path file: {path_file}")
-            with open(path_file, "w") as file:
-                json.dump(basic_structure, file, indent=4)
+        basic_structure = {
+            "_comment": "This file contains the queries that have been generated based on the corresponding importance.",
+            "info": [
+                {
+                    "total_concepts": 0,
+                    "structure": structure,
+                    "importance": importance
+                }
+            ],
+            "data": []
+        }
 
-            self.log.info(f"Total queries files: {len(os.listdir(folder_path))}") 
-            return True
-        except Exception as e:
-            self.log.error(f"An error occurred while creating the files with the query structure: {e}")
-            return False
+        with open(path_file, "w") as file:
+            json.dump(basic_structure, file, indent=4)
+        return str(path_file)
 
 
     # META PROGRAMMING - Interesting to use in the future (create a function which changes
     # its own behavior and structure based on the arguments passed)
     def add_terms_to_query_structure(self, file_path: any, separated_keyterms: pd.Series, 
-                                     thesaurus: pd.Series, importance: int) -> bool:
+                                     thesaurus: pd.Series, importance: int, stream: bool = False) -> bool:
         """
         Adds the terms to the query structure. This function will replace the 
         generic terms in the structure (concept1_1, concept2_1, etc) with the
@@ -500,11 +858,10 @@ class QueryGenerator:
 
         :param separated_keyterms: The separated keyterms.
         :param structure: The structure of the queries.
+        :param stream: If True, the combinations are never materialized in memory.
         :return: True if the terms have been added successfully, False otherwise.
         """
         try:
-            separated_keyterms = pd.DataFrame(separated_keyterms.tolist().copy())
-
             with open(file_path, "r") as file:
                 file_data = json.load(file)
 
@@ -512,77 +869,28 @@ class QueryGenerator:
             importance = str(file_data["info"][0]["importance"])
             self.log.info(f"Structure: {importance}")
 
-            match importance:
-
-                case "1":
-                    
-                    # Extract all keyterms / concepts with same importance
-                    imp1_all_key = separated_keyterms[separated_keyterms["importance"] == "1"]
-                      
-                    # Use of itertools.product to get all possible combinations
-                    keyterms = imp1_all_key["keyterms"].tolist().copy()
-                    all_combinations = self.generate_combinations(list(keyterms))
-                    all_combinations = [list(x) for x in all_combinations]
-           
-                    all_combinations_copy = all_combinations.copy()
-
-                    # Execute logic
-                    response = self.generate_combinations_thesaurus(file_path, all_combinations, all_combinations_copy,
-                                                                    thesaurus, structure)
-                    return response
+            # Extract the keyterms of the concepts with the same or lower importance
+            all_keyterms = QueryGenerator.get_keyterms_slots(separated_keyterms, importance)
+            if not all_keyterms:
+                self.log.error("The importance is not valid.")
+                return False
+
+            # Map every term that can appear in the queries to an integer id
+            thesaurus = ThesaurusIndex.build(thesaurus)
+            interner = TermInterner.from_slots(all_keyterms, thesaurus)
+
+            # Use of itertools.product to get all possible combinations (lazily)
+            all_combinations = self.generate_combinations(all_keyterms)
+
+            if stream:
+                return self.stream_combinations_thesaurus(file_path, all_combinations, thesaurus, structure,
+                                                          interner=interner)
+
+            # Execute logic
+            response = self.generate_combinations_thesaurus(file_path, all_combinations, None,
+                                                            thesaurus, structure, interner=interner)
+            return response
 
-            
-                case "2":
-                    
-                    # Extract all keyterms / concepts with same importance
-                    imp1_all_key = separated_keyterms[separated_keyterms["importance"] == "1"]
-                    imp2_all_key = separated_keyterms[separated_keyterms["importance"] == "2"]
-                    
-                      
-                    # Use of itertools.product to get all possible combinations
-                    keyterms1 = imp1_all_key["keyterms"].tolist().copy()
-                    keyterms2 = imp2_all_key["keyterms"].tolist().copy()
-                    all_keyterms = keyterms1 + keyterms2
-                    all_combinations = self.generate_combinations(list(all_keyterms))
-                    all_combinations = [list(x) for x in all_combinations]
-
-                    all_combinations_copy = all_combinations.copy()
-
-                    # Execute logic
-                    response = self.generate_combinations_thesaurus(file_path, all_combinations, all_combinations_copy,
-                                                                    thesaurus, structure)
-                    return response
-                
-
-
-                case "3":
-
-                     # Extract all keyterms / concepts with same importance
-                    imp1_all_key = separated_keyterms[separated_keyterms["importance"] == "1"]
-                    imp2_all_key = separated_keyterms[separated_keyterms["importance"] == "2"]
-                    imp3_all_key = separated_keyterms[separated_keyterms["importance"] == "3"]
-                    
-                      
-                    # Use of itertools.product to get all possible combinations
-                    keyterms1 = imp1_all_key["keyterms"].tolist().copy()
-                    keyterms2 = imp2_all_key["keyterms"].tolist().copy()
-                    keyterms3 = imp3_all_key["keyterms"].tolist().copy()
-                    all_keyterms = keyterms1 + keyterms2 + keyterms3
-                    all_combinations = self.generate_combinations(list(all_keyterms))
-                    all_combinations = [list(x) for x in all_combinations]
-
-                    all_combinations_copy = all_combinations.copy()
-
-                    # Execute logic
-                    response = self.generate_combinations_thesaurus(file_path, all_combinations, all_combinations_copy,
-                                                                    thesaurus, structure)
-                    return response
-
-
-                case _: 
-                    self.log.error("The importance is not valid.")
-                    return False
-            
         except Exception as e:
             self.log.error(f"An error occurred while adding the terms to the query structure: {e}")
             return False
@@ -590,71 +898,45 @@ class QueryGenerator:
 
     def generate_combinations_thesaurus(self, file_path: any, all_combinations: any,
                                         all_combinations_copy: any, thesaurus: pd.Series,
-                                        structure: any) -> bool: 
+                                        structure: any, interner: TermInterner | None = None) -> bool: 
         """
-        Generate all possible combinations adding the thesaurus to the keyterms. 
+        Generate all possible combinations adding the thesaurus to the keyterms. The
+        combinations are stored as compact rows of term ids, deduplicated on those rows
+        and converted to strings only when the queries are written.
 
-        :param all_combinations_copy: The copy of all combinations.
+        :param all_combinations_copy: The combinations to expand with the thesaurus. If
+        None, `all_combinations` is expanded (it can be a lazy iterable).
         :param all_combinations: The all combinations.
+        :param interner: The interner of the terms. If None, it is built from the combinations.
 
         """           
-        # Checkthesaurus f-each keyterm
         try:
-            for items in all_combinations_copy:
-                combinations = []
-
-                transformed_items = [[item_trans] for item_trans in items] # Mirar esto
-                for i, item in enumerate(items):
-
-                    keyterm = item.strip()
-                    if self.check_keyterm_thesaurus(keyterm, thesaurus):
-                        thes = self.get_thesaurus_from_keyterm(keyterm, thesaurus) 
-                        items = list(items)
-                        transformed_items[i] = thes if thes else item
-                        combinations.extend(self.generate_combinations(transformed_items))
-                        continue
-                    
-                    # Separate the keyterm
-                    keyterm = item.split()
-
-                    thes = []
-                    if len(keyterm) > 1:
-                        # Logic of the thesaurus separated keytem
-                        for kt in keyterm:
-                            if not self.check_keyterm_thesaurus(kt, thesaurus):
-                                thes.append([kt])
-                                continue
-
-                            thes.append(self.get_thesaurus_from_keyterm(kt, thesaurus))
-
-                        # All possible combinations of the thesaurus of one keyterm
-                        thes = list(self.generate_combinations(thes))
-                        thes = [" ".join(x) for x in thes]
-
-                        items = list(items)
-                        transformed_items[i] = thes 
-                        combinations.extend(self.generate_combinations(transformed_items)) # Check if it is correct 
-
-                if combinations:
-                    self.log.info(f"Combinations: {combinations}")
-                    for x in combinations:
-                        all_combinations.insert(len(all_combinations) + 1, x)
+            thesaurus = ThesaurusIndex.build(thesaurus)
+            if all_combinations_copy is None:
+                all_combinations, all_combinations_copy = [], all_combinations
+
+            if interner is None:
+                all_combinations_copy = [list(x) for x in all_combinations_copy]
+                interner = TermInterner.from_slots(list(zip(*all_combinations, *all_combinations_copy)), thesaurus)
+
+            # Expand each combination with the thesaurus of its keyterms
+            template = QueryTemplate.compile(structure)
+            buffer = interner.new_buffer()
+            for row in all_combinations:
+                buffer.extend(interner.encode(row))
+            for row in self.iter_combination_ids(all_combinations_copy, thesaurus, interner):
+                buffer.extend(row)
 
             # Remove duplicates 
-            unique_combinations = sorted(set(tuple(x) for x in all_combinations))
-            unique_combinations = [list(x) for x in unique_combinations]
+            unique_combinations = interner.unique_rows(interner.to_rows(buffer, template.total_slots))
+            QueryGenerator.get_metrics().counter("combinations_expanded_total").inc(len(buffer) // template.total_slots)
+            del buffer
 
-            self.log.info(f"Unique combinations: {unique_combinations}")
+            self.log.info(f"Unique combinations: {len(unique_combinations)}")
             self.log.info(f"Structure: {structure}")
 
-             # Replace generic terms with actual terms - Error here
-            formatted_combinations = []
-            for items in unique_combinations:
-                temp = structure
-                for i, item in enumerate(items):
-                    self.log.info(f"Item: {item}, {i}")
-                    temp = temp.replace(f"concept_{i+1}", item)
-                formatted_combinations.append(temp)
+            # Replace generic terms with actual terms
+            formatted_combinations = [template.render(interner.decode(row)) for row in unique_combinations.tolist()]
 
             # Store the combinations in the JSON file
             with open(file_path, "r") as file:
@@ -666,12 +948,129 @@ class QueryGenerator:
             with open(file_path, "w") as file:
                 json.dump(data, file, indent=4)
 
+            QueryGenerator.record_queries_written(file_path, len(formatted_combinations))
             return True
         except Exception as e:
             self.log.error(f"An error occurred while generating the thesaurus combinations: {e}")
             return False
         
 
+    def iter_combinations_thesaurus(self, base_combinations: any, thesaurus: pd.Series) -> any:
+        """
+        Lazily generates the combinations of each base combination followed by the
+        combinations obtained adding the thesaurus to its keyterms. It applies the same
+        expansion as `generate_combinations_thesaurus`, without storing the results.
+
+        :param base_combinations: The combinations of keyterms (iterable, can be lazy).
+        :param thesaurus: The thesaurus of the search (or its ThesaurusIndex).
+        :return: A generator of combinations (tuples of terms), possibly with duplicates.
+        """
+        thesaurus = ThesaurusIndex.build(thesaurus)
+
+        for items in base_combinations:
+            yield tuple(items)
+
+            transformed_items = [[item_trans] for item_trans in items]
+            for i, item in enumerate(items):
+                thes = thesaurus.expand(item)
+                if thes is None:
+                    continue
+
+                transformed_items[i] = thes
+                yield from self.generate_combinations(transformed_items)
+
+
+    def iter_combination_ids(self, base_combinations: any, thesaurus: any, interner: TermInterner) -> any:
+        """
+        Version of `iter_combinations_thesaurus` that generates the combinations as
+        tuples of term ids.
+
+        :param base_combinations: The combinations of keyterms (iterable, can be lazy).
+        :param thesaurus: The thesaurus of the search (or its ThesaurusIndex).
+        :param interner: The interner of the terms.
+        :return: A generator of combinations of ids, possibly with duplicates.
+        """
+        thesaurus = ThesaurusIndex.build(thesaurus)
+        expansion_ids: dict[str, list[int] | None] = {}
+
+        for items in base_combinations:
+            base = interner.encode(items)
+            yield base
+
+            transformed_items = [(term_id,) for term_id in base]
+            for i, item in enumerate(items):
+                if item not in expansion_ids:
+                    thes = thesaurus.expand(item)
+                    expansion_ids[item] = None if thes is None else [interner.id(term) for term in thes]
+
+                thes = expansion_ids[item]
+                if thes is None:
+                    continue
+
+                transformed_items[i] = thes
+                yield from product(*transformed_items)
+
+
+    def stream_combinations_thesaurus(self, file_path: any, base_combinations: any, thesaurus: pd.Series,
+                                      structure: any, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                      interner: TermInterner | None = None) -> bool:
+        """
+        Streaming version of `generate_combinations_thesaurus`. The combinations are
+        expanded lazily, sorted + deduplicated with an external merge sort and written
+        one query per line (JSON Lines) in a `.jsonl` file that replaces the JSON file
+        created with the query structure. The memory used is bounded by `chunk_size`.
+
+        :param file_path: The path of the JSON file created with the query structure.
+        :param base_combinations: The combinations of keyterms (iterable, can be lazy).
+        :param thesaurus: The thesaurus of the search.
+        :param structure: The structure of the queries.
+        :param chunk_size: The maximum number of combinations kept in memory.
+        :param interner: The interner of the terms. If given, the combinations are sorted
+        as compact rows of term ids.
+        :return: True if the queries have been stored successfully, False otherwise.
+        """
+        try:
+            with open(file_path, "r") as file:
+                header = json.load(file)
+            header.pop("data", None)
+
+            template = QueryTemplate.compile(structure)
+            expanded = QueryGenerator.get_metrics().counter("combinations_expanded_total")
+            if interner is not None:
+                combinations = count_items(self.iter_combination_ids(base_combinations, thesaurus, interner), expanded)
+                unique_combinations = sorted_unique_rows(combinations, interner, template.total_slots,
+                                                         chunk_size=chunk_size)
+                formatted_combinations = (template.render(interner.decode(row)) for row in unique_combinations)
+            else:
+                combinations = count_items(self.iter_combinations_thesaurus(base_combinations, thesaurus), expanded)
+                unique_combinations = sorted_unique(combinations, chunk_size=chunk_size)
+                formatted_combinations = (template.render(items) for items in unique_combinations)
+
+            jsonl_path = Path(file_path).with_suffix(".jsonl")
+            total = write_queries_jsonl(jsonl_path, header, formatted_combinations)
+            os.remove(file_path)
+            QueryGenerator.record_queries_written(jsonl_path, total)
+
+            self.log.info(f"{total} queries have been stored in {jsonl_path}")
+            return True
+        except Exception as e:
+            self.log.error(f"An error occurred while streaming the thesaurus combinations: {e}")
+            return False
+
+
+    @staticmethod
+    def format_query(structure: str, items: any) -> str:
+        """
+        Replaces the generic terms of the structure (concept_1, concept_2, etc) with
+        the terms of the combination, using the compiled template of the structure.
+
+        :param structure: The structure of the queries.
+        :param items: The terms of the combination.
+        :return: The query.
+        """
+        return QueryTemplate.compile(structure).render(items)
+
+
     def generate_combinations(self, keyterms: any) -> any:
         """
         Generates all possible combinations of the keyterms.
@@ -684,32 +1083,40 @@ class QueryGenerator:
 
 
 
-def main(func): # func: str
+def main(func, stream: bool = False, max_queries: int | None = None, workers: int = 1): # func: str
     """
     Main function to execute the script. Contains the match statement to execute
     the functions based on the argument passed.
+
+    :param stream: If True, the queries are generated in streaming mode (JSON Lines).
+    :param max_queries: The maximum number of queries of each importance (sampled).
+    :param workers: The number of processes used to generate the queries.
     """
     try:
         match(func):
 
             case "get_data":
-                concepts = QueryGenerator.get_concepts(QueryGenerator.KEY_CONCEPTS_FILE_PATH)
-                keyterms, all_keyterms, thesaurus, all_the = QueryGenerator.get_keyterms(QueryGenerator.KEY_TERMS_FILE_PATH)
-                sources = QueryGenerator.get_sources(QueryGenerator.SOURCE_INFO_FILE_PATH)
-                rules = QueryGenerator.get_rules(QueryGenerator.SEARCH_RULES_FILE_PATH)
-                return concepts, keyterms, all_keyterms, thesaurus, all_the, sources, rules
+                config = QueryGenerator.get_review_config()
+                thesaurus, all_the = QueryGenerator.create_thesaurus(config.keyterms)
+                return (config.concepts, config.keyterms, config.all_keyterms, thesaurus, all_the,
+                        config.sources, config.rules)
 
             case "create_files":
-                concepts = QueryGenerator.get_concepts(QueryGenerator.KEY_CONCEPTS_FILE_PATH)
-                keyterms, _, thesaurus, _ = QueryGenerator.get_keyterms(QueryGenerator.KEY_TERMS_FILE_PATH)
-                return QueryGenerator().separate_keyterms(concepts, keyterms, thesaurus)
+                config = QueryGenerator.get_review_config()
+                thesaurus, _ = QueryGenerator.create_thesaurus(config.keyterms)
+                return QueryGenerator().separate_keyterms(config.concepts, config.keyterms, thesaurus)
 
             case "generate_queries":
-                separated_keyterms = QueryGenerator.get_separated_keyterms(QueryGenerator.SEP_KEY_TERMS_FILE_PATH)
-                thesaurus, _ = QueryGenerator.get_thesaurus(QueryGenerator.THESAURUS_FILE_PATH)
-                concepts = QueryGenerator.get_concepts(QueryGenerator.KEY_CONCEPTS_FILE_PATH)
-                response = QueryGenerator.generate_search_queries(concepts, separated_keyterms, thesaurus)
+                config = QueryGenerator.get_review_config()
+                response = QueryGenerator.generate_search_queries(config.concepts, config.separated_keyterms,
+                                                                  config.thesaurus_index, stream=stream,
+                                                                  max_queries=max_queries, incremental=True,
+                                                                  workers=workers)
                 return response
+
+            case "estimate_queries":
+                config = QueryGenerator.get_review_config()
+                return QueryGenerator.estimate_query_space(config.separated_keyterms, config.thesaurus_index)
             
             case _:
                 print("Invalid function to execute.")
@@ -0,0 +1,130 @@
+"""
+This script defines the journal of the queries already checked by the scrapper. Every
+query is appended as a single JSON line (file, position, query and total of studies)
+as soon as its search finishes, so an interrupted run can be restarted skipping all
+the queries recorded.
+"""
+
+# Packages to import
+import os
+import json
+import threading
+from pathlib import Path
+
+
+# Classes
+class QueryJournal:
+    """
+    This class is created to record the results of the queries in an append-only
+    JSON Lines file. It is thread safe.
+    """
+
+    def __init__(self, path: Path | str, sync: bool = True):
+        """
+        Constructor of the class. The records of the journal are loaded if it exists.
+
+        :param path: The path of the journal.
+        :param sync: If True, every record is synced to disk before continuing.
+        """
+        self.path = Path(path)
+        self.sync = sync
+        self._records: dict[str, dict[int, tuple[str, int]]] = {}
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _load(self) -> None:
+        """
+        Loads the records of the journal. A last line cut by an interruption is
+        discarded (and removed from the file, so the new records start in a new line).
+        """
+        if not self.path.exists():
+            return
+
+        valid_size = 0
+        with open(self.path, "rb") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+
+                self._records.setdefault(record["file"], {})[record["num"]] = (record["query"], record["total"])
+                valid_size += len(line)
+
+        if valid_size != self.path.stat().st_size:
+            with open(self.path, "r+b") as file:
+                file.truncate(valid_size)
+
+    def get(self, source: str) -> dict[int, tuple[str, int]]:
+        """
+        Gets the queries of a file already recorded.
+
+        :param source: The name of the queries file.
+        :return: The query and total of studies of each position recorded.
+        """
+        with self._lock:
+            return dict(self._records.get(source, {}))
+
+    def record(self, source: str, num: int, query: str, total: int) -> None:
+        """
+        Appends the result of a query to the journal.
+
+        :param source: The name of the queries file.
+        :param num: The position of the query in the file.
+        :param query: The query.
+        :param total: The total of studies found by the query.
+        """
+        self.record_many(source, [(num, query, total)])
+
+    def record_many(self, source: str, results: list[tuple[int, str, int]]) -> None:
+        """
+        Appends the results of several queries to the journal, synchronizing the
+        file only once.
+
+        :param source: The name of the queries file.
+        :param results: The position, query and total of studies of each query.
+        """
+        if not results:
+            return
+
+        lines = "".join(json.dumps({"file": source, "num": num, "query": query, "total": total}) + "\n"
+                        for num, query, total in results)
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+            if self.sync:
+                os.fsync(self._file.fileno())
+            records = self._records.setdefault(source, {})
+            for num, query, total in results:
+                records[num] = (query, total)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(records) for records in self._records.values())
+
+    def reset(self) -> None:
+        """
+        Removes all the records of the journal.
+        """
+        with self._lock:
+            self._file.seek(0)
+            self._file.truncate()
+            self._records.clear()
+
+    def close(self) -> None:
+        """
+        Closes the journal.
+        """
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> "QueryJournal":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
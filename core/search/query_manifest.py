@@ -0,0 +1,114 @@
+"""
+This script defines the manifest used to regenerate the search queries incrementally.
+For each importance level it records the content hashes of the inputs the level
+depends on (key concepts, key terms, separated keyterms and thesaurus), so only the
+levels whose inputs changed since the last run have to be expanded again.
+"""
+
+# Packages to import
+import os
+import json
+import hashlib
+from pathlib import Path
+
+
+# Functions
+def content_hash(data: any) -> str:
+    """
+    Gets the hash of a JSON serializable object. The keys are sorted so the hash
+    only depends on the content.
+
+    :param data: The object to hash.
+    :return: The SHA-256 hash of the object.
+    """
+    serialized = json.dumps(data, sort_keys=True, ensure_ascii=False, default=sorted)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def write_json_if_changed(file_path: Path | str, data: any) -> bool:
+    """
+    Writes a JSON file only if its content is different from the one stored.
+
+    :param file_path: The path of the file.
+    :param data: The content of the file.
+    :return: True if the file has been written, False if it was up to date.
+    """
+    serialized = json.dumps(data, indent=4)
+    if os.path.exists(file_path):
+        with open(file_path, "r") as file:
+            if file.read() == serialized:
+                return False
+
+    with open(file_path, "w") as file:
+        file.write(serialized)
+    return True
+
+
+# Classes
+class QueryManifest:
+    """
+    This class is created to store the fingerprint of the inputs of each importance
+    level, together with the file where its queries were stored.
+    """
+
+    def __init__(self, file_path: Path | str):
+        """
+        Constructor of the class. Loads the manifest if it exists.
+
+        :param file_path: The path of the manifest file.
+        """
+        self.file_path = Path(file_path)
+        self.levels: dict[str, dict] = {}
+
+        if self.file_path.exists():
+            with open(self.file_path, "r") as file:
+                self.levels = json.load(file).get("levels", {})
+
+    def is_current(self, importance: int, inputs: dict[str, str]) -> bool:
+        """
+        Checks if the queries of an importance were generated with the same inputs
+        and their file still exists.
+
+        :param importance: The importance of the queries.
+        :param inputs: The hashes of the inputs of the importance.
+        :return: True if the queries are up to date, False otherwise.
+        """
+        level = self.levels.get(str(importance))
+        if not level or level.get("inputs") != inputs:
+            return False
+        return Path(level.get("file", "")).exists()
+
+    def update(self, importance: int, inputs: dict[str, str], file_path: Path | str) -> None:
+        """
+        Records the inputs used to generate the queries of an importance.
+
+        :param importance: The importance of the queries.
+        :param inputs: The hashes of the inputs of the importance.
+        :param file_path: The file where the queries have been stored.
+        """
+        self.levels[str(importance)] = {"inputs": inputs, "file": str(file_path)}
+
+    def retain(self, importances: list[int]) -> list[str]:
+        """
+        Removes the records of the importances that are not defined anymore.
+
+        :param importances: The importances defined in the concepts.
+        :return: The importances removed.
+        """
+        current = {str(importance) for importance in importances}
+        removed = [importance for importance in self.levels if importance not in current]
+        for importance in removed:
+            del self.levels[importance]
+        return removed
+
+    def save(self) -> bool:
+        """
+        Stores the manifest, only if it has changed.
+
+        :return: True if the manifest has been written, False otherwise.
+        """
+        data = {
+            "_comment": "This file contains the hashes of the inputs used to generate the queries of each importance.",
+            "levels": self.levels
+        }
+        return write_json_if_changed(self.file_path, data)
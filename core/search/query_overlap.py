@@ -0,0 +1,220 @@
+"""
+This script defines the analysis of the overlap between the studies found by the
+search queries. Each query gets a MinHash sketch of its set of studies (the harvested
+records or the records of a local corpus), which estimates the Jaccard similarity
+between two queries without intersecting their sets. The sketches are also split in
+bands (locality sensitive hashing) to find the clusters of near-duplicate queries
+without comparing all the pairs, so the redundant queries can be dropped before
+harvesting them.
+"""
+
+# Packages to import
+import json
+from itertools import combinations
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+
+# Constants
+MERSENNE_PRIME = (1 << 31) - 1
+DEFAULT_PERMUTATIONS = 128
+BLOCK_SIZE = 4096
+MAX_BUCKET_PAIRS = 64
+
+
+# Functions
+def load_harvested_sets(file_path: Path | str) -> tuple[list[str], list[np.ndarray]]:
+    """
+    Gets the records of each query of a harvest (see `ScrapperService.harvest_queries`).
+    The queries equivalent to a previous one get its records.
+
+    :param file_path: The path of the harvested queries file.
+    :return: The queries and the sorted ids of the records of each one.
+    """
+    queries, sets = [], []
+    with open(file_path, "r") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            queries.append(data["query"])
+            if "equivalent" in data:
+                sets.append(sets[data["equivalent"]])
+            else:
+                sets.append(np.unique(np.asarray(data.get("records", []), dtype=np.int64)))
+    return queries, sets
+
+
+def evaluate_sets(backend: any, queries: Iterable[str]) -> tuple[list[str], list[np.ndarray]]:
+    """
+    Gets the records of each query evaluated against a local corpus.
+
+    :param backend: The `LocalCorpusBackend` of the corpus.
+    :param queries: The queries.
+    :return: The queries and the sorted ids of the records of each one.
+    """
+    from query_canonical import parse_query, canonicalize
+
+    queries = list(queries)
+    sets = [backend.record_ids(backend.evaluate(canonicalize(parse_query(query)))).astype(np.int64)
+            for query in queries]
+    return queries, sets
+
+
+def jaccard_matrix(signatures: np.ndarray) -> np.ndarray:
+    """
+    Estimates the Jaccard similarity of every pair of queries: the fraction of their
+    MinHash values that are equal. The queries without studies have similarity 0
+    with the rest of the queries.
+
+    :param signatures: The sketches of the queries (one row per query).
+    :return: The matrix of similarities.
+    """
+    total, permutations = signatures.shape
+    matrix = np.zeros((total, total), dtype=np.float32)
+    for start in range(0, total, BLOCK_SIZE):
+        block = signatures[start:start + BLOCK_SIZE]
+        equal = np.zeros((len(block), total), dtype=np.uint16)
+        for column in range(permutations):
+            equal += block[:, column, None] == signatures[None, :, column]
+        matrix[start:start + BLOCK_SIZE] = equal / permutations
+
+    empty = np.all(signatures == MERSENNE_PRIME, axis=1)
+    matrix[empty, :] = 0
+    matrix[:, empty] = 0
+    np.fill_diagonal(matrix, 1)
+    return matrix
+
+
+def lsh_parameters(permutations: int, threshold: float) -> tuple[int, int]:
+    """
+    Gets the number of bands and rows per band whose threshold ((1 / bands) ^ (1 / rows),
+    the similarity where a pair becomes a candidate) is the nearest to the requested one.
+
+    :param permutations: The size of the sketches.
+    :param threshold: The Jaccard similarity from which two queries are near-duplicates.
+    :return: The number of bands and of rows per band.
+    """
+    best = None
+    for rows in range(1, permutations + 1):
+        bands = permutations // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+def lsh_clusters(signatures: np.ndarray, threshold: float = 0.8) -> list[list[int]]:
+    """
+    Gets the clusters of near-duplicate queries. The queries whose sketches are equal
+    in any band are candidates, and the candidates whose estimated similarity is at
+    least `threshold` are joined in the same cluster.
+
+    :param signatures: The sketches of the queries (one row per query).
+    :param threshold: The Jaccard similarity from which two queries are near-duplicates.
+    :return: The clusters with more than one query (sorted positions of the queries).
+    """
+    total, permutations = signatures.shape
+    bands, rows = lsh_parameters(permutations, threshold)
+    parents = np.arange(total)
+
+    def find(position: int) -> int:
+        while parents[position] != position:
+            parents[position] = parents[parents[position]]
+            position = parents[position]
+        return position
+
+    empty = np.all(signatures == MERSENNE_PRIME, axis=1)
+    checked = set()
+    for band in range(bands):
+        # Group the queries with the same values in the band
+        values = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        _, groups = np.unique(values.view(f"V{values.dtype.itemsize * rows}").ravel(), return_inverse=True)
+        order = np.argsort(groups, kind="stable")
+        bounds = np.flatnonzero(np.diff(groups[order])) + 1
+
+        for members in np.split(order, bounds):
+            members = members[~empty[members]]
+            if len(members) < 2:
+                continue
+
+            # Compare every pair of a bucket (or each member with the first one if the
+            # bucket is too large)
+            pairs = combinations(members.tolist(), 2) if len(members) <= MAX_BUCKET_PAIRS else \
+                ((int(members[0]), int(member)) for member in members[1:])
+            for first, member in pairs:
+                if (first, member) in checked or find(first) == find(member):
+                    continue
+                checked.add((first, member))
+                if np.mean(signatures[first] == signatures[member]) >= threshold:
+                    parents[find(member)] = find(first)
+
+    clusters = {}
+    for position in range(total):
+        clusters.setdefault(find(position), []).append(position)
+    return [cluster for cluster in clusters.values() if len(cluster) > 1]
+
+
+def redundant_queries(clusters: list[list[int]], sizes: list[int]) -> list[int]:
+    """
+    Gets the queries that can be dropped: all the queries of each cluster except the
+    one with more studies.
+
+    :param clusters: The clusters of near-duplicate queries.
+    :param sizes: The total of studies of each query.
+    :return: The sorted positions of the redundant queries.
+    """
+    redundant = []
+    for cluster in clusters:
+        keep = max(cluster, key=lambda position: (sizes[position], -position))
+        redundant.extend(position for position in cluster if position != keep)
+    return sorted(redundant)
+
+
+# Classes
+class MinHasher:
+    """
+    This class is created to build the MinHash sketches of sets of record ids, using
+    `permutations` hash functions h(x) = (a * x + b) mod (2^31 - 1).
+    """
+
+    def __init__(self, permutations: int = DEFAULT_PERMUTATIONS, seed: int = 1):
+        """
+        Constructor of the class.
+
+        :param permutations: The number of hash functions (size of the sketches).
+        :param seed: The seed of the hash functions.
+        """
+        rng = np.random.default_rng(seed)
+        self.permutations = permutations
+        self._a = rng.integers(1, MERSENNE_PRIME, size=permutations, dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, size=permutations, dtype=np.uint64)
+
+    def sketch(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Gets the sketch of a set: the minimum value of each hash function.
+
+        :param ids: The ids of the set (smaller than 2^31 - 1).
+        :return: The sketch (all the values are 2^31 - 1 if the set is empty).
+        """
+        signature = np.full(self.permutations, MERSENNE_PRIME, dtype=np.uint64)
+        ids = np.asarray(ids, dtype=np.uint64)
+        for start in range(0, len(ids), BLOCK_SIZE):
+            block = ids[start:start + BLOCK_SIZE]
+            hashes = (self._a[:, None] * block[None, :] + self._b[:, None]) % MERSENNE_PRIME
+            np.minimum(signature, hashes.min(axis=1), out=signature)
+        return signature.astype(np.uint32)
+
+    def sketches(self, sets: Iterable[np.ndarray]) -> np.ndarray:
+        """
+        Gets the sketches of several sets.
+
+        :param sets: The sets of ids.
+        :return: The sketches (one row per set).
+        """
+        rows = [self.sketch(ids) for ids in sets]
+        if not rows:
+            return np.empty((0, self.permutations), dtype=np.uint32)
+        return np.vstack(rows)
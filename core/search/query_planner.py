@@ -0,0 +1,160 @@
+"""
+This script defines the planner used to count the studies of a batch of queries. The
+generated queries share most of their structure (e.g. every query of importance 2 and
+3 starts with the same AND clause of importance 1), so the queries are parsed into
+their trees and split into sub-expressions, which are evaluated only once.
+
+Every AND / OR with several operands is evaluated from left to right, one operand at
+a time, and each partial result is identified by its canonical form (see
+`query_canonical`). Therefore "(a AND b) AND (c OR d)" and
+"(a AND b) AND (c OR d) AND (e)" share the evaluation of their first part, and
+equivalent sub-expressions written in another order are also shared.
+
+The queries that can not be parsed (e.g. a keyterm with parentheses) are not planned,
+they are counted individually by the backend, so they do not fail the whole batch.
+"""
+
+# Packages to import
+from typing import Callable, Iterable
+
+from query_canonical import TERM, AND, parse_query, canonicalize, to_query
+
+
+# Classes
+class QueryPlan:
+    """
+    This class is created to plan the evaluation of a batch of queries. The distinct
+    sub-expressions are stored as operations (a term, or an AND / OR of two previous
+    sub-expressions) in the order they have to be evaluated.
+    """
+
+    def __init__(self, queries: Iterable[str]):
+        """
+        Constructor of the class. Parses the queries and builds the operations.
+
+        :param queries: The queries of the batch.
+        """
+        self.operations: dict[tuple, tuple] = {}
+        self.references: dict[tuple, int] = {}
+        self.roots: list[tuple | None] = []
+        self.unparsed: dict[int, str] = {}
+        self.total_nodes = 0
+
+        for position, query in enumerate(queries):
+            try:
+                self.roots.append(self._add(parse_query(query)))
+            except ValueError:
+                self.roots.append(None)
+                self.unparsed[position] = query
+        self._count_references()
+
+        self.evaluations = 0
+        self.reused = 0
+
+    def _add(self, node: tuple) -> tuple:
+        """
+        Adds the operations needed to evaluate a node.
+
+        :param node: The node of the query.
+        :return: The canonical form of the node, which identifies its operation.
+        """
+        self.total_nodes += 1
+        if node[0] == TERM:
+            key = canonicalize(node)
+            self.operations.setdefault(key, (TERM, key[1]))
+            return key
+
+        operands = [self._add(operand) for operand in node[1]]
+        key = operands[0]
+        for operand in operands[1:]:
+            left, key = key, canonicalize((node[0], (key, operand)))
+            self.operations.setdefault(key, (node[0], (left, operand)))
+        return key
+
+    def _count_references(self) -> None:
+        """
+        Counts how many times the result of each operation is used, and removes the
+        operations that are not needed (e.g. a partial result whose query is
+        equivalent to a sub-expression planned before).
+        """
+        needed = {}
+        pending = [root for root in self.roots if root is not None]
+        for root in pending:
+            self.references[root] = self.references.get(root, 0) + 1
+
+        while pending:
+            key = pending.pop()
+            if key in needed:
+                continue
+
+            needed[key] = self.operations[key]
+            operation, operands = needed[key]
+            if operation != TERM:
+                for operand in operands:
+                    self.references[operand] = self.references.get(operand, 0) + 1
+                    pending.append(operand)
+
+        # Keep the order of the operations (operands before the results)
+        self.operations = {key: operation for key, operation in self.operations.items() if key in needed}
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+    def evaluate(self, backend: any, before_call: Callable[[], None] | None = None) -> list[int]:
+        """
+        Gets the total of studies of each query of the batch. If the backend can
+        evaluate sub-expressions (e.g. `LocalCorpusBackend`), each operation is
+        evaluated once and its result kept only while it is still needed. Otherwise
+        each distinct query is counted once by the backend.
+
+        :param backend: The search backend.
+        :param before_call: Function called before each call to the backend (e.g. to
+        take a token of the rate limiter).
+        :return: The total of studies of each query.
+        """
+        def count(query: str) -> int:
+            if before_call is not None:
+                before_call()
+            self.evaluations += 1
+            return backend.count(query)
+
+        unparsed = {position: count(query) for position, query in self.unparsed.items()}
+        if not getattr(backend, "supports_subexpressions", False):
+            totals = {}
+            for root in self.roots:
+                if root is None:
+                    continue
+                if root not in totals:
+                    totals[root] = count(to_query(root))
+                else:
+                    self.reused += 1
+            return [unparsed[position] if root is None else totals[root] for position, root in enumerate(self.roots)]
+
+        memory = {}
+        remaining = dict(self.references)
+
+        def value(key: tuple) -> any:
+            if key in memory:
+                result = memory[key]
+                self.reused += 1
+            else:
+                operation, operands = self.operations[key]
+                if before_call is not None:
+                    before_call()
+                if operation == TERM:
+                    result = backend.term_postings(operands)
+                elif operation == AND:
+                    result = backend.intersect([value(operands[0]), value(operands[1])])
+                else:
+                    result = backend.union([value(operands[0]), value(operands[1])])
+                self.evaluations += 1
+
+            remaining[key] -= 1
+            if remaining[key]:
+                memory[key] = result
+            else:
+                memory.pop(key, None)
+            return result
+
+        return [unparsed[position] if root is None else backend.size(value(root))
+                for position, root in enumerate(self.roots)]
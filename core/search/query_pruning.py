@@ -0,0 +1,131 @@
+"""
+This script defines the pruning of the queries whose total of studies can be inferred
+without searching them. Adding an AND clause to a query can only reduce its results,
+so if a query made of some clauses (a core) found no studies, every query that
+contains all those clauses will not find any study either.
+
+The cores with few studies are stored by their set of AND clauses (in canonical form,
+see `query_canonical`), which forms a lattice: a query is bounded by every core whose
+clauses are a subset of its own clauses. The cores are indexed by clause, so only the
+cores that share a clause with a query are compared with it.
+"""
+
+# Packages to import
+import threading
+
+from query_canonical import AND, parse_query, canonicalize
+
+
+# Classes
+class QueryPruner:
+    """
+    This class is created to keep the cores with few studies (at most `threshold`)
+    and to infer the total of studies of the queries that extend them. The inferred
+    total is an upper bound of the real one (the exact total when it is 0).
+    """
+
+    def __init__(self, threshold: int = 0):
+        """
+        Constructor of the class.
+
+        :param threshold: The maximum total of studies of the cores kept. Any query
+        that extends one of them is not searched.
+        """
+        self.threshold = threshold
+        self.cores: dict[frozenset, int] = {}
+        self.index: dict[tuple, list[frozenset]] = {}
+        self.inferred: dict[str, set[int]] = {}
+        self.saved = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def clauses(query: str) -> frozenset | None:
+        """
+        Gets the AND clauses of a query, in canonical form.
+
+        :param query: The query.
+        :return: The clauses of the query, None if the query can not be parsed.
+        """
+        try:
+            node = canonicalize(parse_query(query))
+        except ValueError:
+            return None
+        return frozenset(node[1]) if node[0] == AND else frozenset([node])
+
+    def record(self, query: str, total: int) -> None:
+        """
+        Registers the total of studies found by a query, keeping it as a core if it
+        has at most `threshold` studies.
+
+        :param query: The query.
+        :param total: The total of studies found by the query.
+        """
+        if total > self.threshold:
+            return
+
+        clauses = self.clauses(query)
+        if clauses is None:
+            return
+
+        with self._lock:
+            if clauses not in self.cores:
+                for clause in clauses:
+                    self.index.setdefault(clause, []).append(clauses)
+            self.cores[clauses] = min(total, self.cores.get(clauses, total))
+
+    def bound(self, query: str) -> int | None:
+        """
+        Gets the lowest total of studies of the cores extended by a query.
+
+        :param query: The query.
+        :return: The upper bound of the total of studies, None if it is unknown.
+        """
+        if not self.cores:
+            return None
+
+        clauses = self.clauses(query)
+        if clauses is None:
+            return None
+
+        bound = None
+        with self._lock:
+            candidates = {core for clause in clauses for core in self.index.get(clause, ())}
+            for core in candidates:
+                total = self.cores[core]
+                if (bound is None or total < bound) and core <= clauses:
+                    bound = total
+                    if bound == 0:
+                        break
+        return bound
+
+    def infer(self, source: str, num: int, query: str) -> int | None:
+        """
+        Infers the total of studies of a query if it extends a core, registering
+        the query as inferred. The total is exact when it is 0 and only an upper
+        bound otherwise (see `is_exact`).
+
+        :param source: The name of the queries file.
+        :param num: The position of the query in the file.
+        :param query: The query.
+        :return: The inferred total of studies, None if the query has to be searched.
+        """
+        bound = self.bound(query)
+        if bound is None:
+            return None
+
+        with self._lock:
+            self.inferred.setdefault(source, set()).add(num)
+            self.saved += 1
+        return bound
+
+    @staticmethod
+    def is_exact(total: int) -> bool:
+        """
+        Checks if an inferred total of studies is the real one: a query that extends
+        a core without studies can not find any, but the total of a core with some
+        studies is only an upper bound of the queries that extend it.
+
+        :param total: The inferred total of studies.
+        :return: True if the total is exact, False if it is an upper bound.
+        """
+        return total == 0
@@ -0,0 +1,166 @@
+"""
+This script defines the space of search queries of an importance level, so its size
+can be computed and any query can be obtained from its position (rank) without
+expanding all the combinations of keyterms and thesaurus.
+
+A combination (one term per concept) is generated by `QueryGenerator` if it is one of
+the combinations of keyterms, or if for some position `p` of a keyterm with thesaurus:
+the terms before `p` come from the keyterms of their concept once the thesaurus is
+added, the term at `p` comes from the thesaurus of a keyterm, and the terms after `p`
+are keyterms. Each term of a concept is classified by the roles it can play, and the
+combinations are counted with a small automaton over those roles, in lexicographic
+order (the same order of the generated files).
+"""
+
+# Packages to import
+import sys
+import random
+from bisect import bisect_right
+
+from thesaurus_index import ThesaurusIndex
+
+
+# Constants
+KEYTERM = 1     # The term is a keyterm of the concept
+EXPANDED = 2    # The term is a keyterm of the concept once the thesaurus is added
+THESAURUS = 4   # The term comes from the thesaurus of a keyterm of the concept
+
+PREFIX = 1      # State: all the previous terms are expanded terms
+SUFFIX = 2      # State: the thesaurus position has been passed, only keyterms follow
+
+
+# Classes
+class QuerySpace:
+    """
+    This class is created to count, rank and sample the combinations of terms that
+    are generated for an importance level, without building them.
+    """
+
+    def __init__(self, slots: list[list[str]], thesaurus: any):
+        """
+        Constructor of the class.
+
+        :param slots: The keyterms of each concept (slot) of the query structure.
+        :param thesaurus: The thesaurus of the search (or its ThesaurusIndex).
+        """
+        thesaurus = ThesaurusIndex.build(thesaurus)
+
+        self.terms: list[list[str]] = []
+        self._flags: list[list[int]] = []
+        for keyterms in slots:
+            flags: dict[str, int] = {}
+            for keyterm in keyterms:
+                flags[keyterm] = flags.get(keyterm, 0) | KEYTERM
+
+                expansion = thesaurus.expand(keyterm)
+                if expansion is None:
+                    flags[keyterm] |= EXPANDED
+                    continue
+
+                for term in expansion:
+                    flags[term] = flags.get(term, 0) | EXPANDED | THESAURUS
+
+            terms = sorted(flags)
+            self.terms.append(terms)
+            self._flags.append([flags[term] for term in terms])
+
+        # Cumulative counts of the completions of each slot and state
+        total_slots = len(self.terms)
+        suffix = [[0] * 4 for _ in range(total_slots + 1)]
+        for state in range(4):
+            suffix[total_slots][state] = 1 if state & SUFFIX else 0
+
+        self._cumulative: list[list[list[int]]] = [[] for _ in range(total_slots)]
+        for slot in range(total_slots - 1, -1, -1):
+            for state in range(4):
+                cumulative = [0]
+                for flags in self._flags[slot]:
+                    cumulative.append(cumulative[-1] + suffix[slot + 1][self._next_state(state, flags)])
+                self._cumulative[slot].append(cumulative)
+                suffix[slot][state] = cumulative[-1]
+
+        self._size = suffix[0][PREFIX | SUFFIX] if total_slots else 0
+
+    @staticmethod
+    def _next_state(state: int, flags: int) -> int:
+        """
+        Gets the state of the automaton after adding a term to the combination.
+
+        :param state: The current state.
+        :param flags: The roles of the term.
+        :return: The next state.
+        """
+        next_state = 0
+        if state & PREFIX:
+            if flags & EXPANDED:
+                next_state |= PREFIX
+            if flags & THESAURUS:
+                next_state |= SUFFIX
+        if state & SUFFIX and flags & KEYTERM:
+            next_state |= SUFFIX
+        return next_state
+
+    def __len__(self) -> int:
+        return self._size
+
+    def size(self) -> int:
+        """
+        Gets the total of distinct combinations of the space (the length may
+        exceed `sys.maxsize`, so this method should be preferred to `len`).
+
+        :return: The total of combinations.
+        """
+        return self._size
+
+    def unrank(self, rank: int) -> tuple[str, ...]:
+        """
+        Gets the combination at a position of the space (mixed-radix decoding).
+
+        :param rank: The position of the combination, in lexicographic order.
+        :return: The combination of terms.
+        """
+        if not 0 <= rank < self._size:
+            raise IndexError(f"The rank {rank} is out of the query space ({self._size}).")
+
+        state = PREFIX | SUFFIX
+        combination = []
+        for slot, terms in enumerate(self.terms):
+            cumulative = self._cumulative[slot][state]
+            position = bisect_right(cumulative, rank) - 1
+            rank -= cumulative[position]
+            combination.append(terms[position])
+            state = self._next_state(state, self._flags[slot][position])
+        return tuple(combination)
+
+    def iter_range(self, start: int = 0, stop: int | None = None) -> any:
+        """
+        Iterates over the combinations of a range of positions.
+
+        :param start: The first position.
+        :param stop: The position where the iteration stops (excluded).
+        :return: A generator of combinations.
+        """
+        stop = self._size if stop is None else min(stop, self._size)
+        for rank in range(start, stop):
+            yield self.unrank(rank)
+
+    def sample(self, total: int, seed: int | None = None) -> list[tuple[str, ...]]:
+        """
+        Draws distinct combinations uniformly, decoding random positions of the
+        space. The combinations are returned in lexicographic order.
+
+        :param total: The maximum number of combinations to draw.
+        :param seed: The seed of the random generator.
+        :return: The combinations of terms.
+        """
+        rng = random.Random(seed)
+        total = min(total, self._size)
+
+        if total * 2 >= self._size and self._size <= sys.maxsize:
+            ranks = rng.sample(range(self._size), total)
+        else:
+            ranks = set()
+            while len(ranks) < total:
+                ranks.add(rng.randrange(self._size))
+
+        return [self.unrank(rank) for rank in sorted(ranks)]
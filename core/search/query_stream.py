@@ -0,0 +1,239 @@
+"""
+This script defines the helpers used to stream the search queries to disk instead
+of keeping all of them in memory. The combinations are deduplicated and sorted with
+an external merge sort (sorted chunks spilled to temporary files and merged lazily),
+and the queries are written one per line in JSON Lines format.
+"""
+
+# Packages to import
+import os
+import json
+import heapq
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+
+# Constants
+DEFAULT_CHUNK_SIZE = 100_000
+MAX_OPEN_SPILL_FILES = 64
+
+
+# Functions
+def sorted_unique(rows: Iterable[tuple[str, ...]], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  tmp_dir: Path | str | None = None) -> Iterator[tuple[str, ...]]:
+    """
+    Sorts and deduplicates the rows keeping at most `chunk_size` of them in memory.
+    The result is the same as `sorted(set(rows))`, but produced lazily.
+
+    :param rows: The rows (tuples of terms) to sort.
+    :param chunk_size: The maximum number of rows kept in memory at the same time.
+    :param tmp_dir: The folder where the temporary chunks are stored.
+    :return: The sorted unique rows.
+    """
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as spill_dir:
+        spill_files = []
+        chunk = set()
+
+        for row in rows:
+            chunk.add(tuple(row))
+            if len(chunk) >= chunk_size:
+                spill_files.append(_spill_chunk(spill_dir, len(spill_files), sorted(chunk)))
+                chunk = set()
+
+        # Everything fits in memory, no need to merge
+        if not spill_files:
+            yield from sorted(chunk)
+            return
+
+        if chunk:
+            spill_files.append(_spill_chunk(spill_dir, len(spill_files), sorted(chunk)))
+            chunk = set()
+
+        # Reduce the number of files to merge so the open files stay bounded
+        while len(spill_files) > MAX_OPEN_SPILL_FILES:
+            merged = []
+            for start in range(0, len(spill_files), MAX_OPEN_SPILL_FILES):
+                group = spill_files[start:start + MAX_OPEN_SPILL_FILES]
+                path = os.path.join(spill_dir, f"merge_{len(spill_files)}_{start}.jsonl")
+                with open(path, "w") as file:
+                    for row in _merge_spill_files(group):
+                        file.write(json.dumps(row) + "\n")
+                for old_path in group:
+                    os.remove(old_path)
+                merged.append(path)
+            spill_files = merged
+
+        yield from _merge_spill_files(spill_files)
+
+
+def _spill_chunk(spill_dir: str, number: int, rows: list[tuple[str, ...]]) -> str:
+    """
+    Writes a sorted chunk of rows into a temporary file.
+
+    :param spill_dir: The folder where the chunk is stored.
+    :param number: The number of the chunk.
+    :param rows: The sorted rows of the chunk.
+    :return: The path of the file.
+    """
+    path = os.path.join(spill_dir, f"chunk_{number}.jsonl")
+    with open(path, "w") as file:
+        for row in rows:
+            file.write(json.dumps(row) + "\n")
+    return path
+
+
+def _merge_spill_files(paths: list[str]) -> Iterator[tuple[str, ...]]:
+    """
+    Merges several sorted files into a single sorted stream without duplicates.
+
+    :param paths: The paths of the sorted files.
+    :return: The merged rows.
+    """
+    with ExitStack() as stack:
+        readers = []
+        for path in paths:
+            file = stack.enter_context(open(path, "r"))
+            readers.append(tuple(json.loads(line)) for line in file)
+
+        previous = None
+        for row in heapq.merge(*readers):
+            if row != previous:
+                yield row
+                previous = row
+
+
+def sorted_unique_rows(rows: Iterable[tuple[int, ...]], interner: any, width: int,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       tmp_dir: Path | str | None = None) -> Iterator[tuple[int, ...]]:
+    """
+    Version of `sorted_unique` for combinations of term ids (see `TermInterner`).
+    The chunks are stored as compact arrays of ids, deduplicated with NumPy and
+    spilled in binary format.
+
+    :param rows: The rows (tuples of term ids) to sort.
+    :param interner: The interner of the terms of the rows.
+    :param width: The number of ids of each row.
+    :param chunk_size: The maximum number of rows kept in memory at the same time.
+    :param tmp_dir: The folder where the temporary chunks are stored.
+    :return: The sorted unique rows.
+    """
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as spill_dir:
+        spill_files = []
+        buffer = interner.new_buffer()
+        limit = chunk_size * width
+
+        for row in rows:
+            buffer.extend(row)
+            if len(buffer) >= limit:
+                spill_files.append(_spill_rows(spill_dir, len(spill_files),
+                                               interner.unique_rows(interner.to_rows(buffer, width))))
+                buffer = interner.new_buffer()
+
+        unique = interner.unique_rows(interner.to_rows(buffer, width))
+
+        # Everything fits in memory, no need to merge
+        if not spill_files:
+            yield from _iter_rows(unique)
+            return
+
+        if len(unique):
+            spill_files.append(_spill_rows(spill_dir, len(spill_files), unique))
+        del buffer, unique
+
+        readers = [_iter_rows(np.load(path, mmap_mode="r")) for path in spill_files]
+
+        previous = None
+        for row in heapq.merge(*readers):
+            if row != previous:
+                yield row
+                previous = row
+
+
+def _spill_rows(spill_dir: str, number: int, rows: np.ndarray) -> str:
+    """
+    Writes a sorted chunk of rows of ids into a temporary binary file.
+
+    :param spill_dir: The folder where the chunk is stored.
+    :param number: The number of the chunk.
+    :param rows: The sorted rows of the chunk.
+    :return: The path of the file.
+    """
+    path = os.path.join(spill_dir, f"rows_{number}.npy")
+    np.save(path, rows)
+    return path
+
+
+def _iter_rows(rows: np.ndarray, block_size: int = 4096) -> Iterator[tuple[int, ...]]:
+    """
+    Iterates over the rows of an array (which can be memory mapped), converting
+    them by blocks.
+
+    :param rows: The rows of ids.
+    :param block_size: The number of rows converted at once.
+    :return: The rows as tuples of ids.
+    """
+    for start in range(0, len(rows), block_size):
+        for row in rows[start:start + block_size].tolist():
+            yield tuple(row)
+
+
+def write_queries_jsonl(file_path: Path | str, header: dict, queries: Iterable[str]) -> int:
+    """
+    Writes the queries in JSON Lines format. The first line contains the header
+    of the file (comment + info) and each of the following lines a single query.
+
+    :param file_path: The path of the file.
+    :param header: The header of the file.
+    :param queries: The queries to store.
+    :return: The total of queries written.
+    """
+    total = 0
+    with open(file_path, "w") as file:
+        file.write(json.dumps(header) + "\n")
+        for query in queries:
+            file.write(json.dumps(query) + "\n")
+            total += 1
+    return total
+
+
+def iter_query_file(file_path: Path | str) -> Iterator[str]:
+    """
+    Iterates over the queries stored in a file, both in the JSON format (`data`
+    list) or in the JSON Lines format written by `write_queries_jsonl`.
+
+    :param file_path: The path of the file.
+    :return: The queries of the file.
+    """
+    file_path = Path(file_path)
+    if file_path.suffix != ".jsonl":
+        with open(file_path, "r") as file:
+            yield from json.load(file).get("data", [])
+        return
+
+    with open(file_path, "r") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            value = json.loads(line)
+            if isinstance(value, str):
+                yield value
+
+
+def read_query_file_header(file_path: Path | str) -> dict:
+    """
+    Gets the header (comment + info) of a queries file.
+
+    :param file_path: The path of the file.
+    :return: The header of the file.
+    """
+    file_path = Path(file_path)
+    with open(file_path, "r") as file:
+        if file_path.suffix == ".jsonl":
+            return json.loads(file.readline())
+        data = json.load(file)
+    data.pop("data", None)
+    return data
@@ -0,0 +1,69 @@
+"""
+This script defines the compiled version of a query structure. The structure, e.g.
+"(concept_1 AND concept_2) AND (concept_3 OR concept_4)", is split once into its
+literal fragments and the positions of its slots, so each query is rendered with a
+single join instead of replacing every `concept_<n>` in the whole structure.
+"""
+
+# Packages to import
+import re
+from functools import lru_cache
+
+
+# Constants
+SLOT_PATTERN = re.compile(r"concept_(\d+)(?!\d)")
+
+
+# Classes
+class QueryTemplate:
+    """
+    This class is created to render the queries of a query structure. The slots are
+    matched as whole numbers, so `concept_1` is never confused with `concept_10`.
+    """
+
+    def __init__(self, structure: str):
+        """
+        Constructor of the class. Compiles the structure into literal fragments and
+        slots.
+
+        :param structure: The structure of the queries.
+        """
+        self.structure = structure
+        self._parts: list[str] = []
+        self._slots: list[tuple[int, int]] = []
+
+        position = 0
+        for match in SLOT_PATTERN.finditer(structure):
+            self._parts.append(structure[position:match.start()])
+            self._slots.append((len(self._parts), int(match.group(1)) - 1))
+            self._parts.append(match.group(0))
+            position = match.end()
+        self._parts.append(structure[position:])
+
+        self.total_slots = max((slot for _, slot in self._slots), default=-1) + 1
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def compile(structure: str) -> "QueryTemplate":
+        """
+        Gets the compiled template of a structure, compiling it only once.
+
+        :param structure: The structure of the queries.
+        :return: The template of the structure.
+        """
+        return QueryTemplate(structure)
+
+    def render(self, items: any) -> str:
+        """
+        Renders the query of a combination of terms. The slots without a term keep
+        their generic name.
+
+        :param items: The terms of the combination, one for each slot.
+        :return: The query.
+        """
+        parts = self._parts.copy()
+        total_items = len(items)
+        for position, slot in self._slots:
+            if slot < total_items:
+                parts[position] = items[slot]
+        return "".join(parts)
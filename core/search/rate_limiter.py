@@ -0,0 +1,119 @@
+"""
+This script defines the token bucket used to limit the rate of requests sent to each
+search backend (e.g. Google Scholar), so the workers that check the queries
+concurrently never exceed the allowed rate and do not get blocked.
+"""
+
+# Packages to import
+import time
+import threading
+
+
+# Classes
+class TokenBucket:
+    """
+    This class is created to limit the rate of requests. The bucket is refilled with
+    `rate` tokens per second up to `capacity` (the maximum burst), and every request
+    takes a token, waiting until one is available. It is thread safe.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        """
+        Constructor of the class.
+
+        :param rate: The number of requests allowed per second.
+        :param capacity: The maximum number of requests sent at once (rate by default).
+        """
+        if rate <= 0:
+            raise ValueError("The rate of the token bucket must be greater than 0.")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """
+        Adds the tokens generated since the last update.
+        """
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def configure(self, rate: float, capacity: float | None = None) -> None:
+        """
+        Changes the rate and capacity of the bucket, keeping the tokens available
+        (up to the new capacity), so every holder of the bucket shares the new budget.
+
+        :param rate: The number of requests allowed per second.
+        :param capacity: The maximum number of requests sent at once (rate by default).
+        """
+        if rate <= 0:
+            raise ValueError("The rate of the token bucket must be greater than 0.")
+
+        with self._lock:
+            self._refill()
+            self.rate = rate
+            self.capacity = capacity if capacity is not None else max(rate, 1.0)
+            self._tokens = min(self._tokens, self.capacity)
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """
+        Takes tokens from the bucket if they are available, without waiting.
+
+        :param tokens: The number of tokens to take.
+        :return: True if the tokens have been taken, False otherwise.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Takes tokens from the bucket, waiting until they are available.
+
+        :param tokens: The number of tokens to take.
+        :return: The seconds waited.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+
+            time.sleep(wait)
+            waited += wait
+
+
+# Rate limiters shared by all the services that use the same backend
+_BUCKETS: dict[str, TokenBucket] = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+# Functions
+def get_rate_limiter(backend: str, rate: float, capacity: float | None = None) -> TokenBucket:
+    """
+    Gets the token bucket of a backend, creating it the first time. There is a
+    single bucket per backend: if the rate or capacity requested change, the bucket
+    is reconfigured (so the services that already hold it use the new limit too).
+
+    :param backend: The name of the backend.
+    :param rate: The number of requests allowed per second.
+    :param capacity: The maximum number of requests sent at once.
+    :return: The token bucket of the backend.
+    """
+    with _BUCKETS_LOCK:
+        bucket = _BUCKETS.get(backend)
+        if bucket is None:
+            bucket = TokenBucket(rate, capacity)
+            _BUCKETS[backend] = bucket
+        elif bucket.rate != rate or (capacity is not None and bucket.capacity != capacity):
+            bucket.configure(rate, capacity if capacity is not None else bucket.capacity)
+        return bucket
@@ -0,0 +1,223 @@
+"""
+This script defines the helpers used to harvest the records of the studies found by
+the search queries: the prefetch of the results of a query in a background thread
+(bounded, so only a few pages are requested ahead), the stable keys of a record
+(DOI, Scholar cluster id or normalized title) and a compact map of those keys to the
+studies stored, so each study is stored only once across all the queries.
+"""
+
+# Packages to import
+import re
+import queue
+import hashlib
+import threading
+from typing import Callable, Iterator
+
+import numpy as np
+
+
+# Constants
+DOI_PREFIX = re.compile(r"^(https?://(dx\.)?doi\.org/|doi:)", re.IGNORECASE)
+CLUSTER_PATTERN = re.compile(r"cluster=(\d+)")
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+# Functions
+def prefetch(iterator: Iterator, size: int, before_next: Callable[[int], None] | None = None) -> Iterator:
+    """
+    Iterates over an iterator, getting up to `size` items ahead in a background
+    thread. The thread stops when the returned generator is closed.
+
+    :param iterator: The iterator (e.g. the results of a search).
+    :param size: The maximum number of items fetched ahead.
+    :param before_next: Function called with the position of each item before it is
+    fetched (e.g. to take a token of the rate limiter).
+    :return: The items of the iterator.
+    """
+    items = queue.Queue(maxsize=max(1, size))
+    stop = threading.Event()
+    end = object()
+
+    def put(item: any) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        position = 0
+        try:
+            while not stop.is_set():
+                if before_next is not None:
+                    before_next(position)
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                if not put((item, None)):
+                    return
+                position += 1
+        except Exception as e:
+            put((end, e))
+            return
+        put((end, None))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is end:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def normalize_title(title: str) -> str:
+    """
+    Gets the normalized form of a title: case folded words (letters and digits).
+
+    :param title: The title.
+    :return: The normalized title.
+    """
+    return " ".join(WORD_PATTERN.findall(title.casefold()))
+
+
+def record_keys(record: dict) -> list[int]:
+    """
+    Gets the stable keys of a record: its DOI, its Google Scholar cluster id and its
+    normalized title (the ones available), hashed into 64 bit integers.
+
+    :param record: The record (a `scholarly` publication or a corpus record).
+    :return: The keys of the record.
+    """
+    bib = record.get("bib") if isinstance(record.get("bib"), dict) else {}
+    keys = []
+
+    doi = record.get("doi") or bib.get("doi")
+    if doi:
+        keys.append("doi:" + DOI_PREFIX.sub("", str(doi).strip()).casefold())
+
+    cluster = record.get("cluster_id")
+    if not cluster:
+        for field in ("url_related_articles", "citedby_url", "url_add_sclib"):
+            match = CLUSTER_PATTERN.search(str(record.get(field) or ""))
+            if match:
+                cluster = match.group(1)
+                break
+    if cluster:
+        keys.append(f"cluster:{cluster}")
+
+    title = normalize_title(str(record.get("title") or bib.get("title") or ""))
+    if title:
+        keys.append("title:" + title)
+
+    return [int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+            for key in keys]
+
+
+# Classes
+class CompactKeyMap:
+    """
+    This class is created to map 64 bit keys to record ids using 12 bytes per slot
+    (an open addressing table of NumPy arrays) instead of a Python dict of integers.
+    """
+    EMPTY = 0
+    MAX_LOAD = 0.5
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Constructor of the class.
+
+        :param capacity: The initial number of slots (rounded up to a power of 2).
+        """
+        size = 1
+        while size < capacity:
+            size *= 2
+        self._keys = np.zeros(size, dtype=np.uint64)
+        self._values = np.zeros(size, dtype=np.uint32)
+        self._mask = size - 1
+        self._total = 0
+
+    def __len__(self) -> int:
+        return self._total
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Gets the memory used by the table.
+        """
+        return self._keys.nbytes + self._values.nbytes
+
+    @staticmethod
+    def _key(key: int) -> int:
+        key &= 0xFFFFFFFFFFFFFFFF
+        return key if key != CompactKeyMap.EMPTY else 1
+
+    def _slot(self, key: int) -> int:
+        """
+        Gets the slot of a key: the one that stores it or the empty one to store it.
+        """
+        keys = self._keys
+        position = ((key * 0x9E3779B97F4A7C15) >> 32) & self._mask
+        while True:
+            value = int(keys[position])
+            if value == key or value == self.EMPTY:
+                return position
+            position = (position + 1) & self._mask
+
+    def __contains__(self, key: int) -> bool:
+        key = self._key(key)
+        return int(self._keys[self._slot(key)]) == key
+
+    def get(self, key: int) -> int | None:
+        """
+        Gets the record id of a key.
+
+        :param key: The key.
+        :return: The record id, None if the key is not stored.
+        """
+        key = self._key(key)
+        slot = self._slot(key)
+        return int(self._values[slot]) if int(self._keys[slot]) == key else None
+
+    def add(self, key: int, value: int) -> bool:
+        """
+        Stores the record id of a key, if the key is not already stored.
+
+        :param key: The key.
+        :param value: The record id.
+        :return: True if the key is new, False if it was already stored.
+        """
+        key = self._key(key)
+        slot = self._slot(key)
+        if int(self._keys[slot]) == key:
+            return False
+
+        self._keys[slot] = key
+        self._values[slot] = value
+        self._total += 1
+        if self._total > len(self._keys) * self.MAX_LOAD:
+            self._resize()
+        return True
+
+    def _resize(self) -> None:
+        """
+        Doubles the number of slots of the table.
+        """
+        used = self._keys != self.EMPTY
+        keys, values = self._keys[used].tolist(), self._values[used].tolist()
+        self._keys = np.zeros(len(self._keys) * 2, dtype=np.uint64)
+        self._values = np.zeros(len(self._keys), dtype=np.uint32)
+        self._mask = len(self._keys) - 1
+        for key, value in zip(keys, values):
+            slot = self._slot(key)
+            self._keys[slot] = key
+            self._values[slot] = value
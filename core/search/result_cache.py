@@ -0,0 +1,207 @@
+"""
+This script defines the persistent cache of the total of studies found by each search
+query. The results are stored in a SQLite database keyed on the canonical form of the
+query (see `query_canonical`) and the name of the backend, so the queries already
+counted in a previous run are not sent again to the search engine.
+"""
+
+# Packages to import
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+from query_canonical import canonical_query, normalize_query
+
+
+# Constants
+DEFAULT_TTL = 30 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 1_000_000
+TOUCH_BATCH_SIZE = 1_000
+
+
+# Classes
+class ResultCache:
+    """
+    This class is created to store the results of the search queries on disk. The
+    entries expire after `ttl` seconds and, when there are more than `max_entries`,
+    the least recently used ones are removed. It is thread safe.
+
+    The number of entries is counted once when the cache is opened and kept up to
+    date on each insertion and removal, and the access time of the hits is stored in
+    batches (before evicting entries, every `TOUCH_BATCH_SIZE` hits and on `close`),
+    so neither a hit nor an insertion scans the table.
+    """
+
+    def __init__(self, path: Path | str, ttl: float | None = DEFAULT_TTL,
+                 max_entries: int | None = DEFAULT_MAX_ENTRIES):
+        """
+        Constructor of the class.
+
+        :param path: The path of the database (":memory:" to keep it in memory).
+        :param ttl: The seconds an entry is valid, None to never expire.
+        :param max_entries: The maximum number of entries stored, None for no limit.
+        """
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "backend TEXT NOT NULL, query TEXT NOT NULL, total INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL, "
+            "PRIMARY KEY (backend, query))"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+        self._connection.commit()
+        self._entries = self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        self._touched: dict[tuple[str, str], float] = {}
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """
+        Gets the key of a query: its canonical form, or the query with the whitespace
+        collapsed and case folded if it can not be parsed.
+
+        :param query: The query.
+        :return: The normalized query.
+        """
+        try:
+            return canonical_query(query)
+        except ValueError:
+            return normalize_query(query)
+
+    def get(self, query: str, backend: str) -> int | None:
+        """
+        Gets the total of studies of a query if it is stored and has not expired.
+
+        :param query: The query.
+        :param backend: The name of the backend that counted the studies.
+        :return: The total of studies, None if it is not stored.
+        """
+        key = self.normalize(query)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT total, created FROM results WHERE backend = ? AND query = ?", (backend, key)
+            ).fetchone()
+
+            if row is None or (self.ttl is not None and now - row[1] > self.ttl):
+                if row is not None:
+                    self._connection.execute("DELETE FROM results WHERE backend = ? AND query = ?", (backend, key))
+                    self._connection.commit()
+                    self._touched.pop((backend, key), None)
+                    self._entries -= 1
+                self.misses += 1
+                return None
+
+            self._touched[(backend, key)] = now
+            if len(self._touched) >= TOUCH_BATCH_SIZE:
+                self._store_touches()
+                self._connection.commit()
+            self.hits += 1
+            return row[0]
+
+    def _store_touches(self) -> None:
+        """
+        Stores the access time of the hits not stored yet (the lock must be held).
+        """
+        if self._touched:
+            self._connection.executemany(
+                "UPDATE results SET accessed = ? WHERE backend = ? AND query = ?",
+                [(accessed, backend, key) for (backend, key), accessed in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def set(self, query: str, backend: str, total: int) -> None:
+        """
+        Stores the total of studies of a query, removing the least recently used
+        entries if the cache is full.
+
+        :param query: The query.
+        :param backend: The name of the backend that counted the studies.
+        :param total: The total of studies.
+        """
+        key = self.normalize(query)
+        now = time.time()
+        with self._lock:
+            stored = self._connection.execute(
+                "SELECT 1 FROM results WHERE backend = ? AND query = ?", (backend, key)
+            ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results (backend, query, total, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (backend, key, int(total), now, now)
+            )
+            self._touched.pop((backend, key), None)
+            if stored is None:
+                self._entries += 1
+
+            if self.max_entries is not None and self._entries > self.max_entries:
+                self._store_touches()
+                cursor = self._connection.execute(
+                    "DELETE FROM results WHERE rowid IN "
+                    "(SELECT rowid FROM results ORDER BY accessed LIMIT ?)", (self._entries - self.max_entries,)
+                )
+                self._entries -= cursor.rowcount
+                self.evictions += cursor.rowcount
+            self._connection.commit()
+
+    def purge_expired(self) -> int:
+        """
+        Removes the entries that have expired.
+
+        :return: The total of entries removed.
+        """
+        if self.ttl is None:
+            return 0
+
+        with self._lock:
+            cursor = self._connection.execute("DELETE FROM results WHERE created < ?", (time.time() - self.ttl,))
+            self._connection.commit()
+            self._entries -= cursor.rowcount
+            return cursor.rowcount
+
+    def flush(self) -> None:
+        """
+        Stores the access time of the hits not stored yet.
+        """
+        with self._lock:
+            self._store_touches()
+            self._connection.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._entries
+
+    @property
+    def stats(self) -> dict:
+        """
+        Gets the statistics of the cache since it was opened.
+
+        :return: The hits, misses, evictions and hit ratio.
+        """
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / requests if requests else 0.0,
+        }
+
+    def close(self) -> None:
+        """
+        Closes the database, storing the access time of the last hits.
+        """
+        with self._lock:
+            self._store_touches()
+            self._connection.commit()
+            self._connection.close()
@@ -0,0 +1,203 @@
+"""
+This script defines the streaming format of the results of the search queries. The
+results are stored in JSON Lines format: the first line contains the header of the
+file (comment + info) and each of the following lines the result of a single query,
+appended as soon as it is found:
+    {"id": 3, "query": "(LLM AND test)", "total": 120, "inferred": false}
+
+The total of an inferred query is exact when "inferred" is true and only an upper
+bound of the real one when it is "bound" (see `query_pruning`).
+
+When the writer is closed, an index with the byte offset of each query id is stored
+next to the results (`<name>.idx.npy`), so a result can be read without parsing the
+whole file.
+"""
+
+# Packages to import
+import json
+import threading
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+
+# Constants
+INDEX_SUFFIX = ".idx.npy"
+
+
+# Functions
+def get_index_path(path: Path | str) -> Path:
+    """
+    Gets the path of the index of a results file.
+
+    :param path: The path of the results file.
+    :return: The path of the index.
+    """
+    path = Path(path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def build_results_index(path: Path | str) -> np.ndarray:
+    """
+    Builds the index of a results file reading its lines.
+
+    :param path: The path of the results file.
+    :return: The byte offset of each query id (-1 if the id is missing).
+    """
+    offsets = {}
+    with open(path, "rb") as file:
+        file.readline()
+        offset = file.tell()
+        for line in file:
+            if line.endswith(b"\n"):
+                offsets[json.loads(line)["id"]] = offset
+            offset += len(line)
+    return _offsets_to_index(offsets)
+
+
+def _offsets_to_index(offsets: dict[int, int]) -> np.ndarray:
+    """
+    Converts the offsets of the query ids into an array indexed by id.
+
+    :param offsets: The byte offset of each query id.
+    :return: The index.
+    """
+    index = np.full(max(offsets, default=-1) + 1, -1, dtype=np.int64)
+    if offsets:
+        index[list(offsets.keys())] = list(offsets.values())
+    return index
+
+
+# Classes
+class ResultsWriter:
+    """
+    This class is created to append the results of the queries to a results file as
+    soon as they are found. It is thread safe.
+    """
+
+    def __init__(self, path: Path | str, header: dict):
+        """
+        Constructor of the class. Creates the file and writes its header.
+
+        :param path: The path of the results file.
+        :param header: The header of the file.
+        """
+        self.path = Path(path)
+        self.total = 0
+        self.total_studies = 0
+        self._offsets: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+        self._file = open(self.path, "wb")
+        self._file.write(json.dumps(header).encode("utf-8") + b"\n")
+        self._file.flush()
+
+    def write(self, num: int, query: str, total: int, inferred: bool | str = False) -> None:
+        """
+        Appends the result of a query.
+
+        :param num: The id of the query (its position in the queries file).
+        :param query: The query.
+        :param total: The total of studies found by the query.
+        :param inferred: True if the total has been inferred without searching it,
+        "bound" if the inferred total is only an upper bound of the real one.
+        """
+        line = json.dumps({"id": num, "query": query, "total": total, "inferred": inferred})
+        with self._lock:
+            self._offsets[num] = self._file.tell()
+            self._file.write(line.encode("utf-8") + b"\n")
+            self._file.flush()
+            self.total += 1
+            self.total_studies += total
+
+    def close(self) -> None:
+        """
+        Closes the file and stores its index.
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.close()
+            np.save(get_index_path(self.path), _offsets_to_index(self._offsets))
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class ResultsReader:
+    """
+    This class is created to read a results file lazily. The index of the file is
+    loaded (memory mapped) or rebuilt if it is missing or older than the results.
+    """
+
+    def __init__(self, path: Path | str):
+        """
+        Constructor of the class.
+
+        :param path: The path of the results file.
+        """
+        self.path = Path(path)
+        self._index: np.ndarray | None = None
+
+    @property
+    def header(self) -> dict:
+        """
+        Gets the header (comment + info) of the file.
+        """
+        with open(self.path, "rb") as file:
+            return json.loads(file.readline())
+
+    @property
+    def index(self) -> np.ndarray:
+        """
+        Gets the byte offset of each query id (-1 if the id is missing).
+        """
+        if self._index is None:
+            index_path = get_index_path(self.path)
+            if index_path.exists() and index_path.stat().st_mtime >= self.path.stat().st_mtime:
+                self._index = np.load(index_path, mmap_mode="r")
+            else:
+                self._index = build_results_index(self.path)
+        return self._index
+
+    def __iter__(self) -> Iterator[dict]:
+        """
+        Iterates over the results, in the order they were written.
+        """
+        with open(self.path, "rb") as file:
+            file.readline()
+            for line in file:
+                if line.endswith(b"\n"):
+                    yield json.loads(line)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(np.asarray(self.index) >= 0))
+
+    def __contains__(self, num: int) -> bool:
+        return 0 <= num < len(self.index) and self.index[num] >= 0
+
+    def get(self, num: int) -> dict | None:
+        """
+        Gets the result of a query by its id, reading only its line.
+
+        :param num: The id of the query.
+        :return: The result of the query, None if it is not stored.
+        """
+        if num not in self:
+            return None
+
+        with open(self.path, "rb") as file:
+            file.seek(int(self.index[num]))
+            return json.loads(file.readline())
+
+    def totals(self) -> dict[int, int]:
+        """
+        Gets the total of studies of each query.
+
+        :return: The total of studies by query id.
+        """
+        return {result["id"]: result["total"] for result in self}
@@ -0,0 +1,153 @@
+"""
+This script defines the configuration of a systematic review: the key concepts, key
+terms, separated keyterms, thesaurus, sources and search rules stored in the JSON
+files of the review. Each file is parsed once into plain Python structures and cached
+until it is modified (the cache is keyed on the modification time of the file).
+"""
+
+# Packages to import
+import os
+import json
+from pathlib import Path
+from typing import TypedDict
+
+from thesaurus_index import ThesaurusIndex
+
+
+# Types
+class Concept(TypedDict, total=False):
+    id: str
+    importance: str
+
+
+class SeparatedConcept(TypedDict):
+    concept: str
+    importance: str
+    keyterms: list[str]
+    thesaurus: list[str]
+
+
+class ThesaurusEntry(TypedDict):
+    concept: str
+    keyterm: str
+    divided: str
+    thesaurus: list[str]
+
+
+# Cache of the parsed files: path -> ((mtime, size), content)
+_FILES_CACHE: dict[str, tuple[tuple[int, int], any]] = {}
+
+
+# Functions
+def load_json(file_path: Path | str) -> any:
+    """
+    Gets the content of a JSON file, parsing it only if it has been modified since
+    the last time it was loaded. The content is shared, so it must not be modified.
+
+    :param file_path: The path of the file.
+    :return: The content of the file.
+    """
+    path = os.path.abspath(file_path)
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _FILES_CACHE.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with open(path, "r") as file:
+        content = json.load(file)
+
+    _FILES_CACHE[path] = (version, content)
+    return content
+
+
+def clear_cache() -> None:
+    """
+    Removes all the files stored in the cache.
+    """
+    _FILES_CACHE.clear()
+
+
+# Classes
+class ReviewConfig:
+    """
+    This class is created to access all the inputs of a review. Every property loads
+    its file through the cache, so repeated accesses (and repeated configurations of
+    the same review) only parse the files that have changed.
+    """
+    KEY_CONCEPTS_FILE = "key-concepts.json"
+    KEY_TERMS_FILE = "key-terms.json"
+    SEP_KEY_TERMS_FILE = "separated_keyterms.json"
+    THESAURUS_FILE = "thesaurus.json"
+    SOURCE_INFO_FILE = "source-information.json"
+    SEARCH_RULES_FILE = "search-rules.json"
+
+    def __init__(self, json_folder: Path | str):
+        """
+        Constructor of the class.
+
+        :param json_folder: The folder that contains the JSON files of the review.
+        """
+        self.json_folder = Path(json_folder)
+        self._thesaurus_index: tuple[any, ThesaurusIndex] | None = None
+
+    def _load(self, file_name: str, key: str) -> any:
+        """
+        Gets a field of one of the files of the review.
+
+        :param file_name: The name of the file.
+        :param key: The field of the file.
+        :return: The content of the field.
+        """
+        return load_json(self.json_folder.joinpath(file_name))[key]
+
+    @property
+    def concepts(self) -> list[Concept]:
+        return self._load(self.KEY_CONCEPTS_FILE, "key-concepts")
+
+    @property
+    def keyterms(self) -> list[dict]:
+        return self._load(self.KEY_TERMS_FILE, "keyterms")
+
+    @property
+    def all_keyterms(self) -> set[str]:
+        all_keyterms = set()
+        for keyterm in self.keyterms:
+            if isinstance(keyterm["keyterm"], list):
+                all_keyterms.update(keyterm["keyterm"])
+            else:
+                all_keyterms.add(keyterm["keyterm"])
+        return all_keyterms
+
+    @property
+    def separated_keyterms(self) -> list[SeparatedConcept]:
+        return self._load(self.SEP_KEY_TERMS_FILE, "data")
+
+    @property
+    def thesaurus(self) -> list[ThesaurusEntry]:
+        return self._load(self.THESAURUS_FILE, "data")
+
+    @property
+    def all_thesaurus_terms(self) -> set[str]:
+        return {term for thes in self.thesaurus for term in thes["thesaurus"]}
+
+    @property
+    def thesaurus_index(self) -> ThesaurusIndex:
+        """
+        Gets the index of the thesaurus, built again only if the file has changed.
+
+        :return: The index of the thesaurus.
+        """
+        thesaurus = self.thesaurus
+        if self._thesaurus_index is None or self._thesaurus_index[0] is not thesaurus:
+            self._thesaurus_index = (thesaurus, ThesaurusIndex(thesaurus))
+        return self._thesaurus_index[1]
+
+    @property
+    def sources(self) -> list[dict]:
+        return self._load(self.SOURCE_INFO_FILE, "sources")
+
+    @property
+    def rules(self) -> list[dict]:
+        return self._load(self.SEARCH_RULES_FILE, "rules_search")
@@ -2,19 +2,40 @@
 This script defines a scapper service that utilises the `scholarly` library that
 enables to search for articles in Google Scholar. The script defines a class
 which will locate all the functions that are necessary to search for articles.
+The search engine is pluggable (see `search_backends`), so the queries can also be
+counted offline against a local corpus.
 """
 
 # Packages to import
 import os
+import re
 import sys
 
 import json
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from itertools import islice
 from pathlib import Path
+from typing import Callable, Iterator
+import numpy as np
 import pandas as pd
-from scholarly import scholarly as scho
 
-from query_generator import SearchService
+from query_generator import QueryGenerator
+from query_canonical import QueryDeduplicator
+from rate_limiter import TokenBucket, get_rate_limiter
+from result_cache import ResultCache
+from query_journal import QueryJournal
+from search_backends import SearchBackend, ScholarlyBackend, LocalCorpusBackend
+from query_planner import QueryPlan
+from query_pruning import QueryPruner
+from query_stream import iter_query_file, read_query_file_header
+from results_stream import ResultsWriter
+from record_harvest import CompactKeyMap, prefetch, record_keys
+from metrics import MetricsRegistry, get_registry
+from query_overlap import (DEFAULT_PERMUTATIONS, MinHasher, load_harvested_sets, evaluate_sets,
+                           lsh_clusters, redundant_queries, jaccard_matrix)
 
 
 class ScrapperService:
@@ -24,52 +45,107 @@ class ScrapperService:
 
     Library utilised: scholarly
     """
-
-    def __init__(self): 
+    RESULTS_CACHE_FILE_PATH = "./files/cache/results-cache.sqlite"
+    JOURNAL_FILE_NAME = "queries-journal.jsonl"
+    HARVEST_RECORDS_FILE_NAME = "harvest-records.jsonl"
+    HARVEST_QUERIES_FILE_NAME = "harvest-queries.jsonl"
+    MAX_RECORDS_PER_QUERY = 100
+    PREFETCH_SIZE = 20
+    PAGE_SIZE = 10
+    OVERLAP_FILE_NAME = "queries-overlap.json"
+    OVERLAP_MATRIX_FILE_NAME = "queries-overlap.npy"
+    METRICS_FOLDER_PATH = "./files/metrics/"
+    RETRY_DELAY = 1.0
+
+    def __init__(self, workers: int = 1, requests_per_second: float | None = None,
+                 burst: float | None = None, backend: SearchBackend | None = None,
+                 cache: ResultCache | None = None, pruner: QueryPruner | None = None,
+                 max_retries: int = 0): 
         """
         Constructor of the class.
+
+        :param workers: The number of queries searched concurrently.
+        :param requests_per_second: The maximum rate of requests sent to the backend
+        (shared by all the services of the same backend). None to disable the limit.
+        :param burst: The maximum number of requests sent at once.
+        :param backend: The search engine used to count the studies (Google Scholar
+        by default). Its name identifies its rate limiter and its cached results.
+        :param cache: The persistent cache of the results, None to always search.
+        :param pruner: The pruner that skips the queries which extend a query without
+        studies (their total is inferred), None to search all of them.
+        :param max_retries: The number of times a failed search is retried (waiting
+        `RETRY_DELAY` seconds, doubled after each retry).
         """
         logging.basicConfig(level=logging.INFO)
         self.log = logging.getLogger(__name__)
 
+        self.workers = max(1, workers)
+        self.backend = backend if backend is not None else ScholarlyBackend()
+        self.cache = cache
+        self.pruner = pruner
+        self.max_retries = max(0, max_retries)
+        self.metrics: MetricsRegistry = get_registry("scrapper")
+        self.rate_limiter: TokenBucket | None = None
+        if requests_per_second:
+            self.rate_limiter = get_rate_limiter(self.backend.name, requests_per_second, burst)
 
-    def create_results_folder(self, folder_path: Path | str, importance: str) -> str:
-        """
-        Creates a folder to store the results of the search queries.
 
-        :param folder_path: The path of the folder that will be created.
-        :return: bool
+    def export_metrics(self, start: float, bytes_written: int) -> None:
         """
+        Registers the duration and throughput of a run and exports its metrics
+        (see `metrics`).
 
-        if isinstance(folder_path, Path):
-            folder_path.mkdir(parents=True, exist_ok=True) if not folder_path.exists() else None
-            folder_path.joinpath(f"results_imp{importance}.json")
-        
-        if isinstance(folder_path, str):
-            folder_path = Path(folder_path)
-            folder_path.mkdir(parents=True, exist_ok=True) if not folder_path.exists() else None
-            folder_path.joinpath(f"results_imp{importance}.json")
+        :param start: The time (perf_counter) when the run started.
+        :param bytes_written: The bytes of the results stored.
+        """
+        elapsed = time.perf_counter() - start
+        self.metrics.counter("bytes_written_total").inc(bytes_written)
+        self.metrics.gauge("run_seconds").set(elapsed)
+        if elapsed > 0:
+            self.metrics.gauge("queries_per_second").set(self.metrics.counter("queries_total").value / elapsed)
+        if self.cache is not None:
+            self.metrics.gauge("cache_hit_ratio").set(self.cache.stats["hit_ratio"])
+        self.metrics.export(self.METRICS_FOLDER_PATH)
 
-        results = {
-                "_comment": "This file contains the total of studies extracted of the corresponding importance.",
-                "info": {
-                    "importance": importance,
-                    "total_studies": sum(results.values())
-                },
-                "data":[]
-            }
 
-        with open(folder_path, "w") as file:
-            json.dump(results, file, indent=4)
+    def create_results_folder(self, folder_path: Path | str, importance: str) -> Path:
+        """
+        Creates a folder to store the results of the search queries.
 
-        return folder_path
+        :param folder_path: The path of the folder that will be created.
+        :param importance: The importance of the queries whose results are stored.
+        :return: The path of the results file (see `results_stream`).
+        """
+        folder_path = Path(folder_path)
+        folder_path.mkdir(parents=True, exist_ok=True)
+        return folder_path.joinpath(f"results_imp{importance}.jsonl")
 
 
-    def check_all_queries(self, origin_pth: Path | str , target_pth) -> bool:
+    def check_all_queries(self, origin_pth: Path | str , target_pth, resume: bool = True,
+                          limit: int | None = None) -> bool:
         """
         Gets all the files that are in the folder and checks if they have queries
         defined in them. If true, it will extract all the queries and process them,
         saving the total of studies found in another file.
+
+        Every query checked is appended to a journal in the target folder as soon as
+        it finishes, so if the run is interrupted (e.g. the search engine blocks the
+        requests) it can be restarted without searching again the queries recorded.
+
+        The files are processed by importance, so with a pruner the queries of a
+        level that extend a query without studies of a previous level are not
+        searched (their results are marked as inferred).
+
+        The queries are read lazily and each result is appended to the results file
+        of its importance as soon as it is found (see `results_stream`).
+
+        :param origin_pth: The folder of the queries files.
+        :param target_pth: The folder where the results are stored.
+        :param resume: If True, the queries recorded in the journal are skipped.
+        Otherwise the journal is cleared and all the queries are searched again.
+        :param limit: The maximum number of queries checked of each file, None to
+        check all of them.
+        :return: True if all the queries have been checked, False otherwise.
         """
         
         if not isinstance(origin_pth, Path):
@@ -79,44 +155,183 @@ class ScrapperService:
             self.log.error(f"The folder {origin_pth} does not exist.")
             return False
         
-        try:
-            # Create the results folder + add the results file
-            for num, file in enumerate(origin_pth.iterdir()):
-                results_folder = self.create_results_folder(target_pth, num)
+        self.metrics.reset()
+        start = time.perf_counter()
+        bytes_written = 0
 
-                if file.is_file() and file.suffix == ".json":
-                    with open(file) as file:
-                        data = json.load(file)
-                    
-                    queries = pd.Series(data.get("data"))
-                    results = self.check_queries(queries)
+        journal = QueryJournal(Path(target_pth).joinpath(self.JOURNAL_FILE_NAME))
+        if not resume:
+            journal.reset()
+        elif len(journal):
+            self.log.info(f"Resuming the search: {len(journal)} queries already checked")
 
-                    data["data"] = results
-
-                    with open(results_folder, "w") as file:
-                        json.dump(data, file, indent=4)
+        try:
+            # Create the results folder + add the results file
+            for file in sorted(origin_pth.iterdir(), key=self.query_file_order):
+                if not file.is_file() or file.suffix not in (".json", ".jsonl"):
+                    continue
+
+                info = read_query_file_header(file).get("info")
+                info = (info[0] if isinstance(info, list) and info else info) or {}
+                importance = info.get("importance", self.query_file_order(file)[0])
+                results_path = self.create_results_folder(target_pth, importance)
+
+                header = {
+                    "_comment": "This file contains the total of studies extracted of the corresponding importance.",
+                    "info": {
+                        "importance": importance,
+                        "structure": info.get("structure"),
+                        "queries_file": file.name
+                    }
+                }
+                with ResultsWriter(results_path, header) as writer:
+                    results = self.check_queries(iter_query_file(file), limit=limit, journal=journal,
+                                                 source=file.name, writer=writer)
+                bytes_written += results_path.stat().st_size
+                if results is None:
+                    self.log.error(f"The search of {file.name} has been interrupted, run it again to resume it.")
+                    return False
+
+                self.log.info(f"{writer.total} results ({writer.total_studies} studies) stored in {results_path}")
+
+            if self.cache is not None:
+                self.log.info(f"Results cache: {self.cache.stats}")
+            if self.pruner is not None and self.pruner.saved:
+                self.log.info(f"{self.pruner.saved} queries inferred without searching them")
             return True
         except Exception as e:
             self.log.error(f"Error: {e}")
             return False
+        finally:
+            journal.close()
+            if self.cache is not None:
+                self.cache.flush()
+            self.export_metrics(start, bytes_written)
         
 
-    def check_queries(self, queries: pd.Series) -> dict:
+    @staticmethod
+    def query_file_order(file: Path) -> tuple[int, str]:
+        """
+        Gets the key to sort the queries files by importance (queries_2.json goes
+        before queries_10.json).
+
+        :param file: The path of the queries file.
+        :return: The importance and name of the file.
+        """
+        importance = re.search(r"\d+", file.stem)
+        return (int(importance.group()) if importance else 0, file.name)
+
+
+    def check_queries(self, queries: pd.Series, deduplicate: bool = True,
+                      limit: int | None = None, journal: QueryJournal | None = None,
+                      source: str = "", writer: ResultsWriter | None = None) -> dict:
         """
         Gets all the queries defined in a certain .json file, process them in
         order to get all the total results for each query and store them into
         another file.
 
+        The queries that are logically equivalent to a previous one (same canonical
+        form, see `query_canonical`) are not searched again, they reuse its result.
+
         :param queries: The queries that will be used to search the studies.
+        :param deduplicate: If True, the equivalent queries are only searched once.
+        :param limit: The maximum number of queries checked, None to check all of them.
+        :param journal: The journal where each result is recorded as soon as it is
+        found. The queries already recorded in it are not searched again.
+        :param source: The name of the queries file in the journal.
+        :param writer: The writer where each result is appended as soon as it is found.
         :return: True if the queries are defined correctly
         """
         try:
-            results = {}
+            recorded = journal.get(source) if journal is not None else {}
+            deduplicator = QueryDeduplicator()
+            equivalents = {}
+            counts = {}
+            inferred = {}
+            pending = []
             for num, query in enumerate(queries):
-                if num >= 3:
+                if limit is not None and num >= limit:
                     break
-                
-                results[num] = self.count_studies_by_search(query)   
+
+                self.metrics.counter("queries_total").inc()
+                equivalent = deduplicator.add(query, num) if deduplicate else None
+                if equivalent is not None:
+                    equivalents[num] = (equivalent, query)
+                    continue
+
+                if num in recorded and recorded[num][0] == query:
+                    self.metrics.counter("queries_resumed_total").inc()
+                    counts[num] = recorded[num][1]
+                    if self.pruner is not None:
+                        self.pruner.record(query, counts[num])
+                    if writer is not None:
+                        writer.write(num, query, counts[num])
+                    continue
+
+                pending.append((num, query))
+
+            def infer(num: int, query: str) -> int | None:
+                total = self.pruner.infer(source, num, query) if self.pruner is not None else None
+                if total is not None:
+                    # The total of a core with studies is only an upper bound
+                    self.metrics.counter("queries_inferred_total").inc()
+                    inferred[num] = True if self.pruner.is_exact(total) else "bound"
+                    if writer is not None:
+                        writer.write(num, query, total, inferred=inferred[num])
+                return total
+
+            def search(item: tuple[int, str]) -> int:
+                num, query = item
+                total = infer(num, query)
+                if total is not None:
+                    return total
+
+                total = self.count_studies_by_search(query)
+                if self.pruner is not None:
+                    self.pruner.record(query, total)
+                if journal is not None:
+                    journal.record(source, num, query, total)
+                if writer is not None:
+                    writer.write(num, query, total)
+                return total
+
+            # Search the unique queries (concurrently if there are several workers), or
+            # evaluate them at once if the backend can share their sub-expressions
+            if self.backend.supports_subexpressions:
+                # The queries that extend a core without studies are inferred before
+                # the batch, the rest are evaluated together
+                batch = []
+                for num, query in pending:
+                    total = infer(num, query)
+                    if total is None:
+                        batch.append((num, query))
+                    else:
+                        counts[num] = total
+
+                totals = self.count_studies_batch([query for _, query in batch])
+                results = [(num, query, total) for (num, query), total in zip(batch, totals)]
+                for num, query, total in results:
+                    counts[num] = total
+                    if self.pruner is not None:
+                        self.pruner.record(query, total)
+                    if writer is not None:
+                        writer.write(num, query, total)
+                if journal is not None:
+                    journal.record_many(source, results)
+            else:
+                totals = self.run_searches(search, pending)
+                counts.update(zip([num for num, _ in pending], totals))
+
+            for num, (equivalent, query) in equivalents.items():
+                counts[num] = counts[equivalent]
+                if writer is not None:
+                    writer.write(num, query, counts[num], inferred=inferred.get(equivalent, False))
+
+            results = {num: counts[num] for num in sorted(counts)}
+
+            self.metrics.counter("queries_deduplicated_total").inc(deduplicator.saved)
+            if deduplicator.saved:
+                self.log.info(f"{deduplicator.saved} of {deduplicator.total} requests saved by equivalent queries")
 
             if results:
                 return results
@@ -125,40 +340,295 @@ class ScrapperService:
             self.log.error(f"Error: {e}")
 
     
+    def harvest_queries(self, origin_pth: Path | str, target_pth: Path | str,
+                        max_records: int | None = MAX_RECORDS_PER_QUERY,
+                        prefetch_size: int = PREFETCH_SIZE) -> dict | None:
+        """
+        Gets the records of the studies found by all the queries of the folder. The
+        files are processed by importance and the records are stored only once
+        across all the queries (identified by DOI, Scholar cluster id or title):
+            - harvest-records.jsonl: one line per unique record (id, first query, record).
+            - harvest-queries.jsonl: one line per query with the ids of its records.
+        A query equivalent to a previous one is not searched, its line refers to it.
+
+        :param origin_pth: The folder of the queries files.
+        :param target_pth: The folder where the records are stored.
+        :param max_records: The maximum number of records of each query.
+        :param prefetch_size: The maximum number of records requested ahead.
+        :return: The total of queries, records found and unique records.
+        """
+        if not self.backend.supports_search:
+            self.log.error(f"The backend {self.backend.name} can only count the studies, "
+                           f"it can not harvest their records.")
+            return None
+
+        origin_pth, target_pth = Path(origin_pth), Path(target_pth)
+        if not origin_pth.exists():
+            self.log.error(f"The folder {origin_pth} does not exist.")
+            return None
+
+        target_pth.mkdir(parents=True, exist_ok=True)
+        self.metrics.reset()
+        start = time.perf_counter()
+        seen = CompactKeyMap()
+        summary = {"queries": 0, "records": 0, "unique_records": 0}
+
+        try:
+            with open(target_pth.joinpath(self.HARVEST_RECORDS_FILE_NAME), "w") as records_file, \
+                 open(target_pth.joinpath(self.HARVEST_QUERIES_FILE_NAME), "w") as queries_file:
+                deduplicator = QueryDeduplicator()
+
+                for file in sorted(origin_pth.iterdir(), key=self.query_file_order):
+                    if not file.is_file() or file.suffix not in (".json", ".jsonl"):
+                        continue
+
+                    for num, query in enumerate(iter_query_file(file)):
+                        self.metrics.counter("queries_total").inc()
+                        query_id = summary["queries"]
+                        summary["queries"] += 1
+                        line = {"id": query_id, "file": file.name, "num": num, "query": query}
+
+                        equivalent = deduplicator.add(query, query_id)
+                        if equivalent is not None:
+                            line["equivalent"] = equivalent
+                            queries_file.write(json.dumps(line) + "\n")
+                            continue
+
+                        record_ids = []
+                        for record in self.harvest_query(query, max_records, prefetch_size):
+                            keys = record_keys(record)
+                            record_id = next((seen.get(key) for key in keys if key in seen), None)
+                            if record_id is None:
+                                record_id = summary["unique_records"]
+                                summary["unique_records"] += 1
+                                records_file.write(json.dumps({"id": record_id, "query_id": query_id,
+                                                               "record": record}, default=str) + "\n")
+                            for key in keys:
+                                seen.add(key, record_id)
+                            record_ids.append(record_id)
+
+                        summary["records"] += len(record_ids)
+                        line["records"] = record_ids
+                        queries_file.write(json.dumps(line) + "\n")
+                        records_file.flush()
+                        queries_file.flush()
+
+            self.log.info(f"{summary['unique_records']} unique records of {summary['records']} found by "
+                          f"{summary['queries']} queries ({seen.nbytes} bytes of keys)")
+            self.metrics.counter("records_total").inc(summary["records"])
+            self.metrics.counter("unique_records_total").inc(summary["unique_records"])
+            self.export_metrics(start, sum(target_pth.joinpath(name).stat().st_size for name in
+                                           (self.HARVEST_RECORDS_FILE_NAME, self.HARVEST_QUERIES_FILE_NAME)))
+            return summary
+        except Exception as e:
+            self.log.error(f"Error: {e}")
+            return None
+
+
+    def analyze_overlap(self, target_pth: Path | str, queries: any = None, threshold: float = 0.8,
+                        permutations: int = DEFAULT_PERMUTATIONS) -> dict | None:
+        """
+        Estimates the overlap between the studies found by the queries, using MinHash
+        sketches (see `query_overlap`), and finds the clusters of near-duplicate
+        queries. The studies of each query are the harvested records of the target
+        folder or, if the queries are given, the records of the local corpus backend.
+        Stores the clusters and redundant queries (all the queries of a cluster except
+        the one with more studies) in queries-overlap.json and the approximate Jaccard
+        matrix in queries-overlap.npy.
+
+        :param target_pth: The folder of the harvest, where the analysis is stored.
+        :param queries: The queries to evaluate against the local corpus.
+        :param threshold: The Jaccard similarity from which two queries are near-duplicates.
+        :param permutations: The size of the sketches.
+        :return: The clusters and redundant queries.
+        """
+        target_pth = Path(target_pth)
+        try:
+            if queries is None:
+                queries, sets = load_harvested_sets(target_pth.joinpath(self.HARVEST_QUERIES_FILE_NAME))
+            elif self.backend.supports_subexpressions:
+                queries, sets = evaluate_sets(self.backend, queries)
+            else:
+                self.log.error(f"The backend {self.backend.name} can not evaluate the queries locally.")
+                return None
+
+            signatures = MinHasher(permutations).sketches(sets)
+            clusters = lsh_clusters(signatures, threshold)
+            redundant = redundant_queries(clusters, [len(ids) for ids in sets])
+
+            target_pth.mkdir(parents=True, exist_ok=True)
+            np.save(target_pth.joinpath(self.OVERLAP_MATRIX_FILE_NAME),
+                    jaccard_matrix(signatures))
+
+            analysis = {
+                "_comment": "This file contains the clusters of queries that find nearly the same studies.",
+                "info": {
+                    "total_queries": len(queries),
+                    "threshold": threshold,
+                    "permutations": permutations
+                },
+                "clusters": [[{"id": position, "query": queries[position], "total": len(sets[position])}
+                              for position in cluster] for cluster in clusters],
+                "redundant": [{"id": position, "query": queries[position]} for position in redundant]
+            }
+            with open(target_pth.joinpath(self.OVERLAP_FILE_NAME), "w") as file:
+                json.dump(analysis, file, indent=4)
+
+            self.log.info(f"{len(redundant)} of {len(queries)} queries are redundant ({len(clusters)} clusters)")
+            return analysis
+        except Exception as e:
+            self.log.error(f"Error: {e}")
+            return None
+
+
+    def harvest_query(self, query: str, max_records: int | None = MAX_RECORDS_PER_QUERY,
+                      prefetch_size: int = PREFETCH_SIZE) -> Iterator[dict]:
+        """
+        Gets the records of the studies found by a query, lazily. The results are
+        requested in a background thread, at most `prefetch_size` ahead, and every
+        page of results takes a token of the rate limiter. The results after
+        `max_records` are never requested.
+
+        :param query: The query.
+        :param max_records: The maximum number of records, None to get all of them.
+        :param prefetch_size: The maximum number of records requested ahead.
+        :return: The records.
+        """
+        def take_token(position: int) -> None:
+            if self.rate_limiter is not None and position % self.PAGE_SIZE == 0 \
+                    and (max_records is None or position < max_records):
+                self.metrics.histogram("rate_limit_wait_seconds").observe(self.rate_limiter.acquire())
+
+        with closing(prefetch(islice(self.backend.search(query), max_records), prefetch_size, take_token)) as records:
+            yield from records
+
+
+    def count_studies(self, queries: any) -> list[int]:
+        """
+        Gets the total of studies of several queries.
+
+        :param queries: The queries that will be used to search the studies.
+        :return: The total of studies of each query.
+        """
+        return self.run_searches(self.count_studies_by_search, queries)
+
+
+    def count_studies_batch(self, queries: list[str]) -> list[int]:
+        """
+        Gets the total of studies of several queries evaluating each of their common
+        sub-expressions only once (see `query_planner`). As in `count_studies_by_search`,
+        the queries are taken from the cache if possible, and every call to the
+        backend takes a token of the rate limiter.
+
+        :param queries: The queries that will be used to search the studies.
+        :return: The total of studies of each query.
+        """
+        totals: list[int | None] = [None] * len(queries)
+        missing = []
+        for position, query in enumerate(queries):
+            total = self.cache.get(query, self.backend.name) if self.cache is not None else None
+            if total is None:
+                missing.append(position)
+            else:
+                totals[position] = total
+        if self.cache is not None:
+            self.metrics.counter("cache_hits_total").inc(len(queries) - len(missing))
+            self.metrics.counter("cache_misses_total").inc(len(missing))
+        if not missing:
+            return totals
+
+        def take_token() -> None:
+            self.metrics.histogram("rate_limit_wait_seconds").observe(self.rate_limiter.acquire())
+
+        plan = QueryPlan([queries[position] for position in missing])
+        with self.metrics.timer("backend_latency_seconds", backend=self.backend.name):
+            evaluated = plan.evaluate(self.backend, take_token if self.rate_limiter is not None else None)
+        self.metrics.counter("backend_operations_total", backend=self.backend.name).inc(plan.evaluations)
+        self.log.info(f"{len(missing)} queries evaluated with {plan.evaluations} operations "
+                      f"({plan.total_nodes} nodes, {plan.reused} results reused)")
+
+        for position, total in zip(missing, evaluated):
+            totals[position] = total
+            if self.cache is not None:
+                self.cache.set(queries[position], self.backend.name, total)
+        return totals
+
+
+    def run_searches(self, search: Callable[[any], any], items: any) -> list:
+        """
+        Runs a search function over several items. With more than one worker the
+        items are searched concurrently by a pool of threads, all of them limited
+        by the rate limiter of the backend. The results keep the order of the items.
+
+        :param search: The function that searches an item.
+        :param items: The items to search.
+        :return: The result of each item.
+        """
+        if self.workers == 1:
+            return [search(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(search, items))
+
+    
     def count_studies_by_search(self, query: any) -> int:
         """
-        Gets the total of studies that are found by a specific search query.
+        Gets the total of studies that are found by a specific search query. The
+        result is taken from the cache if the query (or an equivalent one) has
+        already been counted by the same backend. A failed search is retried up to
+        `max_retries` times.
 
         :param query: The query that will be used to search the studies.
         :return: The total of studies that are found by the search query.
         """ 
-        search_results = scho.search_pubs(query)
-        return search_results.total_results
+        if self.cache is not None:
+            total = self.cache.get(query, self.backend.name)
+            if total is not None:
+                self.metrics.counter("cache_hits_total").inc()
+                return total
+            self.metrics.counter("cache_misses_total").inc()
+
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                self.metrics.histogram("rate_limit_wait_seconds").observe(self.rate_limiter.acquire())
+
+            try:
+                with self.metrics.timer("backend_latency_seconds", backend=self.backend.name):
+                    total = self.backend.count(query)
+                break
+            except Exception as e:
+                self.metrics.counter("backend_errors_total", backend=self.backend.name).inc()
+                if attempt == self.max_retries:
+                    raise
+                self.metrics.counter("retries_total").inc()
+                self.log.warning(f"Retrying the search of {query}: {e}")
+                time.sleep(self.RETRY_DELAY * 2 ** attempt)
+
+        if self.cache is not None:
+            self.cache.set(query, self.backend.name, total)
+        return total
         
                                 
 
-def main(func: str, origin_pth: Path | str, target_pth: Path | str) -> None:
+def main(func: str, origin_pth: Path | str | None, target_pth: Path | str,
+         corpus_pth: Path | str | None = None) -> None:
     """
     Main function to execute the script
-    """
-    # Create the object of the class
-    scrapper_service = ScrapperService()
-    search_service = SearchService()
-
-    # Get the total of studies by search
-    for x in range(1, 2):
 
-        origin_pth = origin_pth.joinpath(f"trial-search-queries-{x}.json")
-        with open(origin_pth) as file:
-            data = json.load(file)
+    :param func: The function to execute (check_all_queries, harvest_queries, analyze_overlap...).
+    :param origin_pth: The folder of the queries files (the generated queries by default).
+    :param target_pth: The folder where the results are stored.
+    :param corpus_pth: Corpus file(s) (BibTeX/JSON) to count the studies offline
+    instead of searching them in Google Scholar.
+    """
+    if origin_pth is None:
+        origin_pth = QueryGenerator.TRIAL_SEARCHES_QUERIES_FOLDER
 
-        queries = pd.Series(data.get("data"))
-        
+    # Create the object of the class
+    backend = LocalCorpusBackend.from_files(corpus_pth) if corpus_pth is not None else ScholarlyBackend()
+    scrapper_service = ScrapperService(backend=backend, cache=ResultCache(ScrapperService.RESULTS_CACHE_FILE_PATH),
+                                       pruner=QueryPruner())
 
-        response = scrapper_service.check_queries(queries)
-        scrapper_service.log.info(f"The total of studies found by the search query is: {response}")
-        print(f"The total of studies found by the search query is: {response}")
-    
     try:
         match(func):
 
@@ -170,13 +640,17 @@ def main(func: str, origin_pth: Path | str, target_pth: Path | str) -> None:
 
 
             case "check_all_queries":
+                response = scrapper_service.check_all_queries(origin_pth, target_pth)
+                return response
+
+
+            case "harvest_queries":
+                response = scrapper_service.harvest_queries(origin_pth, target_pth)
+                return response
 
-                total_query_files = os.listdir(origin_pth)
-                if total_query_files == 0:
-                    logging.error("There are no queries defined in the queries.csv file.")
-                    exit(1)
 
-                response = scrapper_service.check_all_queries(SearchService.TRIAL_SEARCHES_QUERIES_FOLDER)
+            case "analyze_overlap":
+                response = scrapper_service.analyze_overlap(target_pth)
                 return response
 
 
@@ -0,0 +1,448 @@
+"""
+This script defines the backends used by the scrapper to count the studies found by a
+search query. `ScholarlyBackend` searches Google Scholar through the `scholarly`
+library, while `LocalCorpusBackend` evaluates the Boolean queries offline against a
+corpus of records (e.g. the BibTeX export of our own library) using an inverted index.
+"""
+
+# Packages to import
+import re
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
+
+from query_canonical import TERM, AND, OR, tokenize, parse_query, canonicalize
+
+
+# Constants
+WORD_PATTERN = re.compile(r"[^\W_]+")
+RECORD_FIELDS = ("title", "abstract", "keywords")
+
+
+# Functions
+def tokenize_text(text: str) -> list[str]:
+    """
+    Splits a text into case folded words (letters and digits).
+
+    :param text: The text to split.
+    :return: The words of the text.
+    """
+    return WORD_PATTERN.findall(text.casefold())
+
+
+def parse_bibtex(text: str) -> list[dict]:
+    """
+    Parses the entries of a BibTeX file. The values can be delimited by braces
+    (nested braces are kept as text) or quotes, or be a bare number / macro.
+
+    :param text: The content of the BibTeX file.
+    :return: The fields of each entry (lower case names), with its key in "ID".
+    """
+    entries = []
+    position = 0
+    while True:
+        start = text.find("@", position)
+        if start == -1:
+            return entries
+
+        opening = start + 1
+        while opening < len(text) and text[opening] not in "{(":
+            opening += 1
+        if opening >= len(text):
+            return entries
+
+        entry_type = text[start + 1:opening].strip().lower()
+        closing = "}" if text[opening] == "{" else ")"
+        end = _find_entry_end(text, opening, closing)
+        position = end + 1
+        if entry_type in ("comment", "preamble", "string"):
+            continue
+
+        body = text[opening + 1:end]
+        key, _, fields = body.partition(",")
+        entry = _parse_bibtex_fields(fields)
+        entry["ID"] = key.strip()
+        entry["ENTRYTYPE"] = entry_type
+        entries.append(entry)
+
+
+def _find_entry_end(text: str, opening: int, closing: str) -> int:
+    """
+    Gets the position of the character that closes a BibTeX entry.
+
+    :return: The position of the closing character (the end of the text if missing).
+    """
+    depth = 0
+    for position in range(opening + 1, len(text)):
+        character = text[position]
+        if character == "{":
+            depth += 1
+        elif character == "}":
+            if depth == 0 and closing == "}":
+                return position
+            depth -= 1
+        elif character == closing and depth == 0:
+            return position
+    return len(text)
+
+
+def _parse_bibtex_fields(text: str) -> dict:
+    """
+    Parses the `name = value` fields of a BibTeX entry.
+
+    :param text: The fields of the entry.
+    :return: The value of each field.
+    """
+    fields = {}
+    position = 0
+    while position < len(text):
+        equals = text.find("=", position)
+        if equals == -1:
+            break
+
+        name = text[position:equals].strip(" \t\r\n,").lower()
+        position = equals + 1
+        while position < len(text) and text[position].isspace():
+            position += 1
+        if position >= len(text):
+            break
+
+        if text[position] == "{":
+            depth = 0
+            for end in range(position, len(text)):
+                if text[end] == "{":
+                    depth += 1
+                elif text[end] == "}":
+                    depth -= 1
+                    if depth == 0:
+                        break
+            value = text[position + 1:end]
+            position = end + 1
+        elif text[position] == '"':
+            end = text.find('"', position + 1)
+            end = len(text) if end == -1 else end
+            value = text[position + 1:end]
+            position = end + 1
+        else:
+            end = text.find(",", position)
+            end = len(text) if end == -1 else end
+            value = text[position:end].strip()
+            position = end
+
+        fields[name] = " ".join(value.replace("{", "").replace("}", "").split())
+    return fields
+
+
+def load_corpus(path: Path | str) -> list[dict]:
+    """
+    Loads the records of a corpus file: BibTeX (.bib), JSON (a list of records or a
+    `data` list) or JSON Lines (.jsonl, one record per line).
+
+    :param path: The path of the corpus file.
+    :return: The records of the corpus.
+    """
+    path = Path(path)
+    with open(path, "r", encoding="utf-8") as file:
+        match path.suffix.lower():
+            case ".bib":
+                return parse_bibtex(file.read())
+            case ".jsonl":
+                return [json.loads(line) for line in file if line.strip()]
+            case ".json":
+                data = json.load(file)
+                return data.get("data", []) if isinstance(data, dict) else data
+            case _:
+                raise ValueError(f"The format of the corpus file {path} is not supported.")
+
+
+# Classes
+class SearchBackend(ABC):
+    """
+    This class is created to define the interface of the search engines that count
+    the studies found by a query. The backends that can evaluate sub-expressions
+    (see `query_planner`) also provide `term_postings`, `intersect`, `union` and
+    `size`, and the ones that can return the studies of a query (to harvest them)
+    provide `search`, which gets them lazily (the next pages of results are only
+    requested when they are needed).
+    """
+    name = "backend"
+    supports_subexpressions = False
+    supports_search = False
+
+    @abstractmethod
+    def count(self, query: str) -> int:
+        """
+        Gets the total of studies found by a query.
+
+        :param query: The query.
+        :return: The total of studies.
+        """
+
+
+class ScholarlyBackend(SearchBackend):
+    """
+    This class is created to search the studies in Google Scholar.
+
+    Library utilised: scholarly (imported the first time a query is searched)
+    """
+    name = "scholarly"
+    supports_search = True
+
+    def count(self, query: str) -> int:
+        from scholarly import scholarly as scho
+
+        return scho.search_pubs(query).total_results
+
+    def search(self, query: str) -> Iterator[dict]:
+        # The first request is sent when the first record is requested (after taking
+        # its token of the rate limiter), not when the search is created
+        from scholarly import scholarly as scho
+
+        yield from scho.search_pubs(query)
+
+
+class FunctionBackend(SearchBackend):
+    """
+    This class is created to use any function as a backend (e.g. a fake backend
+    with a fixed latency to test or benchmark the scrapper).
+    """
+
+    def __init__(self, name: str, function: Callable[[str], int],
+                 search_function: Callable[[str], Iterable[dict]] | None = None):
+        """
+        Constructor of the class.
+
+        :param name: The name of the backend.
+        :param function: The function that counts the studies of a query.
+        :param search_function: The function that returns the studies of a query,
+        None if the backend can only count them.
+        """
+        self.name = name
+        self.function = function
+        self.search_function = search_function
+        self.supports_search = search_function is not None
+
+    def count(self, query: str) -> int:
+        return self.function(query)
+
+    def search(self, query: str) -> Iterator[dict]:
+        yield from self.search_function(query)
+
+
+class LocalCorpusBackend(SearchBackend):
+    """
+    This class is created to evaluate the queries against a local corpus of records.
+    The words of the title, abstract and keywords of each record are stored in an
+    inverted index, and the queries are evaluated intersecting (AND) and merging (OR)
+    the records of each word. A term with several words matches the records that
+    contain all of them.
+
+    The records of a word are stored as a sorted array of record ids (int32) or, when
+    the word appears in more than 1/32 of the records (so the array would be larger),
+    as a bitmap with a bit per record (uint8).
+    """
+    name = "local"
+    supports_subexpressions = True
+    supports_search = True
+
+    def __init__(self, records: Iterable[dict], fields: tuple[str, ...] = RECORD_FIELDS):
+        """
+        Constructor of the class. Builds the inverted index of the records.
+
+        :param records: The records of the corpus.
+        :param fields: The fields of the records that are indexed.
+        """
+        vocabulary: dict[str, int] = {}
+        word_ids = []
+        record_ids = []
+
+        self.records: list[dict] = []
+        for record_id, record in enumerate(records):
+            self.records.append(record)
+            words = set()
+            for field in fields:
+                value = record.get(field)
+                if isinstance(value, (list, tuple)):
+                    value = " ".join(map(str, value))
+                if value:
+                    words.update(tokenize_text(str(value)))
+
+            word_ids.extend([vocabulary.setdefault(word, len(vocabulary)) for word in words])
+            record_ids.extend([record_id] * len(words))
+
+        self.total_records = len(self.records)
+        self.postings: dict[str, np.ndarray] = {}
+        self._empty = np.empty(0, dtype=np.int32)
+
+        if not word_ids:
+            return
+
+        # Group the record ids by word, sorted (record ids are already increasing)
+        word_ids = np.asarray(word_ids, dtype=np.int32)
+        record_ids = np.asarray(record_ids, dtype=np.int32)
+        order = np.argsort(word_ids, kind="stable")
+        bounds = np.searchsorted(word_ids[order], np.arange(len(vocabulary) + 1))
+        sorted_records = record_ids[order]
+        for word, word_id in vocabulary.items():
+            posting = sorted_records[bounds[word_id]:bounds[word_id + 1]]
+            self.postings[word] = self._to_bitmap([posting]) if self._is_dense(len(posting)) else posting.copy()
+
+    @classmethod
+    def from_files(cls, paths: Iterable[Path | str] | Path | str, **kwargs) -> "LocalCorpusBackend":
+        """
+        Builds the backend from one or several corpus files (see `load_corpus`).
+
+        :param paths: The paths of the corpus files.
+        :return: The backend.
+        """
+        if isinstance(paths, (str, Path)):
+            paths = [paths]
+
+        def records():
+            for path in paths:
+                yield from load_corpus(path)
+
+        return cls(records(), **kwargs)
+
+    @staticmethod
+    def parse(query: str) -> tuple:
+        """
+        Parses a query into its canonical tree. A query that can not be parsed (e.g. a
+        keyterm with parentheses) is evaluated as a single term made of its words,
+        without the operators, so it matches the records that contain all of them.
+
+        :param query: The query.
+        :return: The root node of the query.
+        """
+        try:
+            return canonicalize(parse_query(query))
+        except ValueError:
+            return TERM, " ".join(token for token in tokenize(query) if token not in (AND, OR, "(", ")"))
+
+    def count(self, query: str) -> int:
+        return self.size(self.evaluate(self.parse(query)))
+
+    def search(self, query: str) -> Iterator[dict]:
+        for record_id in self.record_ids(self.evaluate(self.parse(query))):
+            yield self.records[record_id]
+
+    def evaluate(self, node: tuple) -> np.ndarray:
+        """
+        Gets the records that match a node of a query (see `query_canonical`).
+
+        :param node: The node.
+        :return: The records, as sorted ids or as a bitmap.
+        """
+        if node[0] == TERM:
+            return self.term_postings(node[1])
+
+        postings = [self.evaluate(operand) for operand in node[1]]
+        if node[0] == AND:
+            return self.intersect(postings)
+        return self.union(postings)
+
+    def term_postings(self, term: str) -> np.ndarray:
+        """
+        Gets the records that contain all the words of a term.
+
+        :param term: The term.
+        :return: The records, as sorted ids or as a bitmap.
+        """
+        words = tokenize_text(term)
+        if not words:
+            return self._empty
+        return self.intersect([self.postings.get(word, self._empty) for word in words])
+
+    @staticmethod
+    def size(posting: np.ndarray) -> int:
+        """
+        Gets the total of records of a posting.
+
+        :param posting: The records, as sorted ids or as a bitmap.
+        :return: The total of records.
+        """
+        if posting.dtype == np.uint8:
+            return int(np.bitwise_count(posting).sum())
+        return len(posting)
+
+    def record_ids(self, posting: np.ndarray) -> np.ndarray:
+        """
+        Gets the ids of the records of a posting.
+
+        :param posting: The records, as sorted ids or as a bitmap.
+        :return: The sorted ids of the records.
+        """
+        if posting.dtype != np.uint8:
+            return posting
+        return np.flatnonzero(np.unpackbits(posting, count=self.total_records, bitorder="little"))
+
+    def intersect(self, postings: list[np.ndarray]) -> np.ndarray:
+        """
+        Intersects several postings. The arrays of ids are intersected starting with
+        the shortest one, and the result is then filtered with the bitmaps.
+
+        :param postings: The records, as sorted ids or as bitmaps.
+        :return: The records in all the postings.
+        """
+        ids = sorted((posting for posting in postings if posting.dtype != np.uint8), key=len)
+        bitmaps = [posting for posting in postings if posting.dtype == np.uint8]
+
+        if not ids:
+            result = bitmaps[0]
+            for bitmap in bitmaps[1:]:
+                result = result & bitmap
+            return result
+
+        result = ids[0]
+        for posting in ids[1:]:
+            if not len(result):
+                return result
+            result = np.intersect1d(result, posting, assume_unique=True)
+
+        for bitmap in bitmaps:
+            if not len(result):
+                return result
+            result = result[(bitmap[result >> 3] >> (result & 7)) & 1 == 1]
+        return result
+
+    def union(self, postings: list[np.ndarray]) -> np.ndarray:
+        """
+        Merges several postings. The result is a bitmap if any of them is a bitmap
+        or if the result is large, and an array of ids otherwise.
+
+        :param postings: The records, as sorted ids or as bitmaps.
+        :return: The records in any of the postings.
+        """
+        ids = [posting for posting in postings if posting.dtype != np.uint8 and len(posting)]
+        bitmaps = [posting for posting in postings if posting.dtype == np.uint8]
+
+        if not bitmaps and not self._is_dense(sum(map(len, ids))):
+            if not ids:
+                return self._empty
+            return ids[0] if len(ids) == 1 else np.unique(np.concatenate(ids))
+
+        result = self._to_bitmap(ids)
+        for bitmap in bitmaps:
+            result |= bitmap
+        return result
+
+    def _is_dense(self, total: int) -> bool:
+        """
+        Checks if a posting of a total of records is smaller as a bitmap.
+        """
+        return total * 32 > self.total_records
+
+    def _to_bitmap(self, ids: list[np.ndarray]) -> np.ndarray:
+        """
+        Gets the bitmap of several arrays of record ids.
+
+        :param ids: The arrays of record ids.
+        :return: The bitmap, with the bit of record i at bit i % 8 of byte i // 8.
+        """
+        bits = np.zeros(self.total_records, dtype=bool)
+        for posting in ids:
+            bits[posting] = True
+        return np.packbits(bits, bitorder="little")
@@ -0,0 +1,130 @@
+"""
+This script defines the interning of the terms used in the search queries. Every
+keyterm and thesaurus term is mapped to a small integer, so the combinations can be
+stored as compact rows of integers (instead of lists of strings), deduplicated on
+those rows and converted back to strings only when the queries are written.
+"""
+
+# Packages to import
+from array import array
+
+import numpy as np
+
+from thesaurus_index import ThesaurusIndex
+
+
+# Classes
+class TermInterner:
+    """
+    This class is created to map the terms to integer ids and back. The ids follow
+    the alphabetical order of the terms, so sorting rows of ids gives the same order
+    as sorting the tuples of terms.
+    """
+
+    def __init__(self, terms: any):
+        """
+        Constructor of the class.
+
+        :param terms: All the terms that can appear in a combination.
+        """
+        self.terms: list[str] = sorted(set(terms))
+        self._ids: dict[str, int] = {term: i for i, term in enumerate(self.terms)}
+        self.typecode = "H" if len(self.terms) <= 0xFFFF else "I"
+        self.dtype = np.uint16 if self.typecode == "H" else np.uint32
+
+    @classmethod
+    def from_slots(cls, slots: list[list[str]], thesaurus: any) -> "TermInterner":
+        """
+        Builds the interner of the terms of the keyterms of each slot and of their
+        thesaurus expansions.
+
+        :param slots: The keyterms of each slot of the query structure.
+        :param thesaurus: The thesaurus of the search (or its ThesaurusIndex).
+        :return: The interner of the terms.
+        """
+        thesaurus = ThesaurusIndex.build(thesaurus)
+
+        terms = set()
+        for keyterms in slots:
+            for keyterm in keyterms:
+                terms.add(keyterm)
+                terms.update(thesaurus.expand(keyterm) or [])
+        return cls(terms)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def id(self, term: str) -> int:
+        """
+        Gets the id of a term.
+
+        :param term: The term.
+        :return: The id of the term.
+        """
+        return self._ids[term]
+
+    def encode(self, items: any) -> tuple[int, ...]:
+        """
+        Gets the ids of the terms of a combination.
+
+        :param items: The terms of the combination.
+        :return: The ids of the terms.
+        """
+        return tuple(self._ids[item] for item in items)
+
+    def decode(self, row: any) -> list[str]:
+        """
+        Gets the terms of a row of ids.
+
+        :param row: The ids of the terms.
+        :return: The terms of the combination.
+        """
+        terms = self.terms
+        return [terms[i] for i in row]
+
+    def new_buffer(self) -> array:
+        """
+        Gets an empty buffer to store rows of ids one after another.
+
+        :return: The buffer.
+        """
+        return array(self.typecode)
+
+    def to_rows(self, buffer: array, width: int) -> np.ndarray:
+        """
+        Gets the rows stored in a buffer as a 2D array (without copying them).
+
+        :param buffer: The buffer with the rows of ids.
+        :param width: The number of ids of each row.
+        :return: The rows of ids.
+        """
+        return np.frombuffer(buffer, dtype=self.dtype).reshape(-1, width)
+
+    def unique_rows(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Removes the duplicated rows and sorts them. When a row fits in 64 bits it is
+        packed into a single integer (keeping the order), which is much faster to sort
+        than the rows themselves.
+
+        :param rows: The rows of ids.
+        :return: The sorted unique rows.
+        """
+        if rows.size == 0:
+            return rows
+
+        width = rows.shape[1]
+        base = max(len(self.terms), 1)
+        if base ** width > np.iinfo(np.uint64).max:
+            return np.unique(rows, axis=0)
+
+        # Pack each row into a single number in base len(terms)
+        keys = np.zeros(len(rows), dtype=np.uint64)
+        for column in range(width):
+            keys = keys * np.uint64(base) + rows[:, column].astype(np.uint64)
+        keys = np.unique(keys)
+
+        unique = np.empty((len(keys), width), dtype=rows.dtype)
+        for column in range(width - 1, -1, -1):
+            unique[:, column] = keys % np.uint64(base)
+            keys = keys // np.uint64(base)
+        return unique
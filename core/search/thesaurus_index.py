@@ -0,0 +1,117 @@
+"""
+This script defines an index over the thesaurus of the search, so the thesaurus of a
+keyterm can be obtained in constant time instead of scanning the whole thesaurus each
+time a combination of keyterms is expanded.
+"""
+
+# Packages to import
+from itertools import product
+
+
+# Classes
+class ThesaurusIndex:
+    """
+    This class is created to index the thesaurus of the search by keyterm. The keys
+    are normalized (whitespace collapsed + case folded), and the keyterms made of a
+    single word are also stored in a token-level sub-index, used when a multi-word
+    keyterm has to be separated to find the thesaurus of each of its words.
+
+    The index is built once (from `get_thesaurus` or `create_thesaurus`) and reused
+    during the whole generation of the queries.
+    """
+
+    def __init__(self, thesaurus: any):
+        """
+        Constructor of the class.
+
+        :param thesaurus: The thesaurus of the search (pd.Series or list of dicts with
+        the keys "keyterm" and "thesaurus").
+        """
+        self._keyterms: dict[str, list[str]] = {}
+        self._tokens: dict[str, list[str]] = {}
+        self._expansions: dict[str, list[str] | None] = {}
+
+        for thes in thesaurus:
+            terms = list(thes["thesaurus"])
+            keyterms = thes["keyterm"] if isinstance(thes["keyterm"], list) else [thes["keyterm"]]
+
+            for keyterm in keyterms:
+                key = self.normalize(keyterm)
+
+                # The first entry of a keyterm wins, as in the linear scan
+                self._keyterms.setdefault(key, terms)
+                if " " not in key:
+                    self._tokens.setdefault(key, terms)
+
+    @classmethod
+    def build(cls, thesaurus: any) -> "ThesaurusIndex":
+        """
+        Gets the index of the thesaurus, building it only if it is not already one.
+
+        :param thesaurus: The thesaurus of the search or its index.
+        :return: The index of the thesaurus.
+        """
+        if isinstance(thesaurus, cls):
+            return thesaurus
+        return cls(thesaurus)
+
+    @staticmethod
+    def normalize(keyterm: str) -> str:
+        """
+        Normalizes a keyterm to be used as key of the index.
+
+        :param keyterm: The keyterm to normalize.
+        :return: The normalized keyterm.
+        """
+        return " ".join(keyterm.split()).casefold()
+
+    def __contains__(self, keyterm: str) -> bool:
+        return self.normalize(keyterm) in self._keyterms
+
+    def __len__(self) -> int:
+        return len(self._keyterms)
+
+    def get(self, keyterm: str, default: any = None) -> list[str] | None:
+        """
+        Gets the thesaurus of a keyterm.
+
+        :param keyterm: The keyterm to get the thesaurus.
+        :param default: The value returned if the keyterm has no thesaurus.
+        :return: The thesaurus of the keyterm.
+        """
+        return self._keyterms.get(self.normalize(keyterm), default)
+
+    def get_token(self, token: str, default: any = None) -> list[str] | None:
+        """
+        Gets the thesaurus of a single word of a separated keyterm.
+
+        :param token: The word to get the thesaurus.
+        :param default: The value returned if the word has no thesaurus.
+        :return: The thesaurus of the word.
+        """
+        return self._tokens.get(token.casefold(), default)
+
+    def expand(self, keyterm: str) -> list[str] | None:
+        """
+        Gets the terms that replace a keyterm when the thesaurus is added to a
+        combination: the thesaurus of the keyterm if it has one, otherwise (multi-word
+        keyterms) all the combinations of the thesaurus of each of its words. The
+        result is memoized, as the same keyterms appear in many combinations.
+
+        :param keyterm: The keyterm to expand.
+        :return: The terms of the expansion, None if the keyterm can not be expanded.
+        """
+        if keyterm in self._expansions:
+            return self._expansions[keyterm]
+
+        expansion = self.get(keyterm)
+        if expansion is not None:
+            expansion = expansion if expansion else [keyterm]
+        else:
+            tokens = keyterm.split()
+            if len(tokens) > 1:
+                token_terms = [self.get_token(token) or [token] for token in tokens]
+                expansion = [" ".join(x) for x in product(*token_terms)]
+
+        self._expansions[keyterm] = expansion
+        return expansion
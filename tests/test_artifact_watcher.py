@@ -0,0 +1,50 @@
+"""
+Tests of the watchers of the files created in the directories of the project.
+"""
+
+# Packages to import
+import os
+import time
+
+import pytest
+
+import artifact_watcher
+from artifact_watcher import InotifyWatcher
+
+
+# Fixtures
+@pytest.fixture
+def watcher():
+    try:
+        watcher = InotifyWatcher()
+    except OSError:
+        pytest.skip("inotify is not available")
+    yield watcher
+    watcher.close()
+
+
+# Functions
+def test_read_returns_an_empty_list_only_after_the_timeout(watcher, tmp_path):
+    watcher.add_directory(str(tmp_path))
+
+    start = time.monotonic()
+    assert watcher.read(0.2) == []
+    assert time.monotonic() - start >= 0.2
+
+
+def test_spurious_wakeup_keeps_waiting(watcher, tmp_path, monkeypatch):
+    watcher.add_directory(str(tmp_path))
+    tmp_path.joinpath("main.aux").write_text("")
+
+    reads = []
+    os_read = os.read
+
+    def read(fd: int, size: int) -> bytes:
+        reads.append(fd)
+        if len(reads) == 1:
+            raise BlockingIOError
+        return os_read(fd, size)
+
+    monkeypatch.setattr(artifact_watcher.os, "read", read)
+    assert watcher.read(1.0) == [str(tmp_path / "main.aux")]
+    assert len(reads) == 2
@@ -0,0 +1,24 @@
+"""
+Tests of the plan used to delete the files ignored by the .gitignore file.
+"""
+
+# Packages to import
+from cleanup_plan import DeletionPlan
+
+
+# Functions
+def test_dry_run_and_deletion_report_the_same_quantities(tmp_path):
+    for num in range(3):
+        tmp_path.joinpath(f"main{num}.aux").write_text("aux")
+    for folder in ("build", "out"):
+        tmp_path.joinpath(folder, "nested").mkdir(parents=True)
+        for num in range(4):
+            tmp_path.joinpath(folder, "nested", f"{num}.log").write_text("log")
+
+    plan = DeletionPlan.from_paths([(str(path), path.is_dir()) for path in tmp_path.iterdir()])
+    assert plan.summary() == "3 files and 2 directories (11 files in total), 33 B"
+
+    result = plan.execute(workers=2, batch_size=2)
+    assert (result["files"], result["directories"], result["total_files"]) == (3, 2, plan.total_files)
+    assert result["errors"] == []
+    assert list(tmp_path.iterdir()) == []
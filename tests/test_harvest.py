@@ -0,0 +1,46 @@
+"""
+Tests of the harvest of the records found by the search queries.
+"""
+
+# Packages to import
+from scrapper_googlescholar import ScrapperService
+from search_backends import FunctionBackend
+
+
+# Functions
+def records_backend(requested: list, total: int = 1000) -> FunctionBackend:
+    # As scholarly.search_pubs, the search sends its first request when it is created
+    def search(query: str):
+        requested.append("search")
+
+        def records():
+            for num in range(total):
+                requested.append(num)
+                yield {"title": f"{query} {num}"}
+        return records()
+
+    return FunctionBackend("fake-harvest", lambda query: total, search)
+
+
+def test_harvest_does_not_request_records_after_the_maximum(monkeypatch):
+    requested = []
+    service = ScrapperService(backend=records_backend(requested), requests_per_second=1000, burst=1000)
+    acquired = []
+    acquire = service.rate_limiter.acquire
+    monkeypatch.setattr(service.rate_limiter, "acquire", lambda: acquired.append(1) or acquire())
+
+    records = list(service.harvest_query("llm", max_records=20, prefetch_size=50))
+
+    assert [record["title"] for record in records] == [f"llm {num}" for num in range(20)]
+    assert requested == ["search"] + list(range(20))
+    assert len(acquired) == 20 // ScrapperService.PAGE_SIZE
+
+
+def test_search_is_lazy():
+    requested = []
+    backend = records_backend(requested)
+
+    records = backend.search("llm")
+    assert requested == []
+    next(records)
+    assert requested == ["search", 0]
@@ -0,0 +1,45 @@
+"""
+Tests of the canonical form and the deduplication of the search queries.
+"""
+
+# Packages to import
+import pytest
+
+from query_canonical import QueryDeduplicator, canonical_query, parse_query
+from scrapper_googlescholar import ScrapperService
+from search_backends import FunctionBackend
+
+
+# Constants
+PARENTHESIZED_QUERY = "(Large Language Model (LLM) AND testing)"
+
+
+# Functions
+def test_equivalent_queries_have_the_same_canonical_form():
+    assert canonical_query("(b AND a) AND (c OR d)") == canonical_query("a AND b AND (d OR c OR d)")
+
+
+def test_quoted_phrase_is_not_the_unquoted_words():
+    assert canonical_query('"fault detection" AND llm') != canonical_query("fault detection AND llm")
+
+
+def test_parenthesized_keyterm_can_not_be_parsed():
+    with pytest.raises(ValueError):
+        parse_query(PARENTHESIZED_QUERY)
+
+
+def test_deduplicator_falls_back_to_the_normalized_query():
+    deduplicator = QueryDeduplicator()
+
+    assert deduplicator.add(PARENTHESIZED_QUERY, 0) is None
+    assert deduplicator.add("(large  language model (LLM) and TESTING)", 1) == 0
+    assert deduplicator.add("(LLM AND testing)", 2) is None
+    assert deduplicator.saved == 1
+
+
+def test_check_queries_with_a_parenthesized_keyterm():
+    service = ScrapperService(backend=FunctionBackend("fake", lambda query: 5))
+    queries = [PARENTHESIZED_QUERY, PARENTHESIZED_QUERY]
+
+    assert service.check_queries(queries, deduplicate=True) == {0: 5, 1: 5}
+    assert service.check_queries(queries, deduplicate=False) == {0: 5, 1: 5}
@@ -0,0 +1,51 @@
+"""
+Tests of the evaluation of a batch of queries sharing their sub-expressions.
+"""
+
+# Packages to import
+from query_planner import QueryPlan
+from scrapper_googlescholar import ScrapperService
+from search_backends import FunctionBackend, LocalCorpusBackend
+
+
+# Constants
+RECORDS = [
+    {"title": "Large Language Model (LLM) testing"},
+    {"title": "Software testing with agents"},
+    {"title": "LLM agents for software"},
+]
+QUERIES = [
+    "(LLM AND software)",
+    "(LLM AND software) AND (agents OR testing)",
+    "(Large Language Model (LLM) AND testing)",
+    "(software AND testing)",
+]
+
+
+# Functions
+def test_batch_matches_the_individual_counts():
+    backend = LocalCorpusBackend(RECORDS)
+    plan = QueryPlan(QUERIES)
+
+    assert plan.evaluate(backend) == [backend.count(query) for query in QUERIES] == [1, 1, 1, 1]
+    assert plan.unparsed == {2: QUERIES[2]}
+
+
+def test_unparsable_query_is_counted_individually():
+    calls = []
+    backend = FunctionBackend("fake", lambda query: calls.append(query) or len(query))
+    plan = QueryPlan(QUERIES + [QUERIES[0]])
+
+    tokens = []
+    totals = plan.evaluate(backend, before_call=lambda: tokens.append(1))
+
+    assert len(calls) == len(tokens) == len(QUERIES)
+    assert QUERIES[2] in calls
+    assert totals[2] == len(QUERIES[2])
+    assert totals[0] == totals[4]
+
+
+def test_batch_path_of_the_scrapper_with_an_unparsable_query():
+    service = ScrapperService(backend=LocalCorpusBackend(RECORDS))
+
+    assert service.check_queries(QUERIES) == {0: 1, 1: 1, 2: 1, 3: 1}
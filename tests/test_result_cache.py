@@ -0,0 +1,50 @@
+"""
+Tests of the persistent cache of the results of the search queries.
+"""
+
+# Packages to import
+import result_cache
+from result_cache import ResultCache
+
+
+# Functions
+def test_hits_and_equivalent_queries(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite")
+    cache.set("(LLM AND software)", "fake", 5)
+
+    assert cache.get("software AND LLM", "fake") == 5
+    assert cache.get("software AND LLM", "other") is None
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+    cache.close()
+
+
+def test_running_count_survives_reopening(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite")
+    for num in range(5):
+        cache.set(f"term{num}", "fake", num)
+    cache.set("term0", "fake", 10)
+    assert len(cache) == 5
+    cache.close()
+
+    cache = ResultCache(tmp_path / "cache.sqlite")
+    assert len(cache) == 5
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "TOUCH_BATCH_SIZE", 100)
+    clock = iter(range(1, 100))
+    monkeypatch.setattr(result_cache.time, "time", lambda: next(clock))
+    cache = ResultCache(tmp_path / "cache.sqlite", ttl=None, max_entries=3)
+    for num in range(3):
+        cache.set(f"term{num}", "fake", num)
+
+    # The hit of term0 is not stored yet, but it is before evicting
+    assert cache.get("term0", "fake") == 0
+    cache.set("term3", "fake", 3)
+
+    assert len(cache) == 3
+    assert cache.evictions == 1
+    assert cache.get("term1", "fake") is None
+    assert [cache.get(f"term{num}", "fake") for num in (0, 2, 3)] == [0, 2, 3]
+    cache.close()
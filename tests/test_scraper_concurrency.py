@@ -0,0 +1,94 @@
+"""
+Tests of the concurrent search of the queries against a local fake backend. The
+clock of the rate limiter is replaced by a virtual one (sleeping advances it), so the
+tests are deterministic and do not wait.
+"""
+
+# Packages to import
+import time
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import rate_limiter
+from scrapper_googlescholar import ScrapperService
+from search_backends import FunctionBackend
+
+
+# Constants
+RATE = 10.0
+BURST = 3.0
+WORKERS = 4
+QUERIES = [f"(LLM AND term{num})" for num in range(40)]
+
+
+# Classes
+class VirtualClock:
+    """
+    This class is created to replace the clock of the rate limiter.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self._lock = threading.Lock()
+
+    def monotonic(self) -> float:
+        with self._lock:
+            return self.now
+
+    def sleep(self, seconds: float) -> None:
+        with self._lock:
+            self.now += seconds
+
+
+# Fixtures
+@pytest.fixture
+def clock(monkeypatch):
+    clock = VirtualClock()
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(monotonic=clock.monotonic, sleep=clock.sleep))
+    monkeypatch.setattr(rate_limiter, "_BUCKETS", {})
+    return clock
+
+
+@pytest.fixture
+def calls(clock):
+    return []
+
+
+@pytest.fixture
+def service(clock, calls):
+    lock = threading.Lock()
+
+    def count(query: str) -> int:
+        # The first queries take longer, so the searches finish out of order
+        time.sleep(0.002 * (len(QUERIES) - int(query[12:-1])) / len(QUERIES))
+        with lock:
+            calls.append((clock.monotonic(), query))
+        return int(query[12:-1]) * 7
+
+    return ScrapperService(workers=WORKERS, requests_per_second=RATE, burst=BURST,
+                           backend=FunctionBackend("fake-concurrency", count))
+
+
+# Functions
+def test_results_are_mapped_to_their_queries(service):
+    results = service.check_queries(QUERIES, deduplicate=False)
+
+    assert results == {num: num * 7 for num in range(len(QUERIES))}
+    assert list(results) == list(range(len(QUERIES)))
+
+
+def test_run_searches_keeps_the_order_of_the_items(service):
+    assert service.run_searches(service.count_studies_by_search, QUERIES) == [num * 7 for num in range(len(QUERIES))]
+
+
+def test_token_bucket_is_never_exceeded(service, calls):
+    service.check_queries(QUERIES, deduplicate=False)
+
+    assert sorted(query for _, query in calls) == sorted(QUERIES)
+    times = sorted(moment for moment, _ in calls)
+    for first in range(len(times)):
+        for last in range(first, len(times)):
+            assert last - first + 1 <= BURST + RATE * (times[last] - times[first]) + 1e-6
+    assert times[-1] >= (len(QUERIES) - BURST) / RATE - 1e-6